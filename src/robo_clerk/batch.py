@@ -0,0 +1,155 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import json
+import os
+import time
+
+from robo_clerk.doc_processors.doc_master import process_documents
+from robo_clerk.doc_processors.extraction_cache import get_extraction_cache
+from robo_clerk.doc_processors.llm_cache import get_llm_cache
+from robo_clerk.utils.file import get_file_name, list_files_in_folder
+from robo_clerk.utils.jsonl_sink import JSONLFeatureSink
+
+MANIFEST_FILE = ".manifest.jsonl"
+
+
+def get_client_id(folder: str) -> str:
+    return get_file_name(os.path.normpath(folder)).split("_")[-1]
+
+
+class CheckpointManifest:
+    """
+    Append-only record of finished clients, one JSON line each.
+    A line is only written once the client's output is on disk, so a rerun
+    can skip everything listed here.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, "r") as manifest_file:
+                for line in manifest_file:
+                    try:
+                        self.done.add(json.loads(line)["client_id"])
+                    except (ValueError, KeyError):
+                        # a torn last line from an interrupted run
+                        continue
+
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self.done
+
+    def mark_done(self, client_id: str, **info):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as manifest_file:
+            manifest_file.write(json.dumps({"client_id": client_id, **info}) + "\n")
+        self.done.add(client_id)
+
+
+def process_client_folder(folder: str, output_folder: str | None) -> dict:
+    """
+    Worker: extract one client folder, sequentially, inside a pool process.
+    Without an output folder the features are returned for the parent to sink.
+    """
+    cache = get_extraction_cache()
+    hits, misses = cache.store.hits, cache.store.misses
+    llm_cache = get_llm_cache()
+    llm_hits, llm_misses = (llm_cache.store.hits, llm_cache.store.misses) if llm_cache else (0, 0)
+    client_id = get_client_id(folder)
+    documents = len(list(list_files_in_folder(folder)))
+    start = time.perf_counter()
+    features = process_documents(folder, output_folder, output_file=f"client_data_{client_id}.json", cache=cache)
+    return {
+        "client_id": client_id,
+        "documents": documents,
+        "seconds": round(time.perf_counter() - start, 3),
+        "cache_hits": cache.store.hits - hits,
+        "cache_misses": cache.store.misses - misses,
+        "llm_cache_hits": llm_cache.store.hits - llm_hits if llm_cache else 0,
+        "llm_cache_misses": llm_cache.store.misses - llm_misses if llm_cache else 0,
+        "features": features if output_folder is None else None,
+    }
+
+
+class Throughput:
+    def __init__(self, total: int, report_every: float = 5.0):
+        self.total = total
+        self.report_every = report_every
+        self.clients = 0
+        self.documents = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.llm_cache_hits = 0
+        self.llm_cache_lookups = 0
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def add(self, result: dict):
+        self.clients += 1
+        self.documents += result["documents"]
+        self.cache_hits += result["cache_hits"]
+        self.llm_cache_hits += result["llm_cache_hits"]
+        self.llm_cache_lookups += result["llm_cache_hits"] + result["llm_cache_misses"]
+        now = time.perf_counter()
+        if now - self.last_report >= self.report_every:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        print(
+            f"{self.clients}/{self.total} clients ({self.failed} failed), "
+            f"{self.clients / elapsed:.2f} clients/sec, {self.documents / elapsed:.2f} docs/sec, "
+            f"{self.cache_hits} cache hits"
+            + (f", LLM cache hit rate {self.llm_cache_hits / self.llm_cache_lookups:.0%}" if self.llm_cache_lookups else "")
+        )
+
+
+def run_batch(folders, output_folder="out", workers=None, manifest_path=None, resume=True, sink_path=None):
+    """
+    Process client folders across a pool of worker processes.
+
+    Finished clients are recorded in the checkpoint manifest; with resume,
+    clients already in it are skipped. At most a few jobs per worker are
+    in flight, so huge corpora do not queue up tens of thousands of futures.
+    With a sink_path, features are streamed into one JSONL file instead of a
+    client_data_<id>.json per client.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    manifest = CheckpointManifest(manifest_path or os.path.join(output_folder, MANIFEST_FILE))
+    todo = [folder for folder in folders if not (resume and get_client_id(folder) in manifest)]
+    skipped = len(folders) - len(todo)
+    if skipped:
+        print(f"skipping {skipped} clients already in {manifest.path}")
+
+    throughput = Throughput(total=len(todo))
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    sink = JSONLFeatureSink(sink_path) if sink_path else None
+    client_output_folder = None if sink else output_folder
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        remaining = iter(todo)
+        while True:
+            for folder in remaining:
+                pending[executor.submit(process_client_folder, folder, client_output_folder)] = folder
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                folder = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"failed to process {folder}: {e}")
+                    throughput.failed += 1
+                    continue
+                if sink is not None:
+                    sink.write(result["client_id"], result["features"], timing={"seconds": result["seconds"], "documents": result["documents"]})
+                manifest.mark_done(result["client_id"], documents=result["documents"], seconds=result["seconds"])
+                throughput.add(result)
+    if sink is not None:
+        sink.close()
+    throughput.report()
+    return throughput
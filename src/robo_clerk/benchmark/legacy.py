@@ -0,0 +1,704 @@
+"""
+Previous implementations kept as references for the benchmarks: their
+output is what the current code must reproduce, and their timings are what
+it is measured against.
+"""
+
+
+def python_docx_table_text(source) -> str:
+    """DOCX table text through the python-docx object model (DOCXProcessor before the streaming parser)."""
+    from docx import Document
+
+    all_text = []
+    for table in Document(source).tables:
+        for row in table.rows:
+            row_text = []
+            for cell in row.cells:
+                full_cell_text = "".join(run.text for paragraph in cell.paragraphs for run in paragraph.runs).strip()
+                if full_cell_text:
+                    row_text.append(full_cell_text)
+            if row_text:
+                all_text.append(" | ".join(row_text))
+    return "\n".join(all_text)
+
+
+def regex_profile_fields(cleaned_text: str) -> tuple:
+    """Personal and communication fields of a cleaned profile text, one lookahead regex per field (DOCXProcessor before label segmentation)."""
+    import re
+
+    personal_info_patterns = {
+        "last_name": r"last name\s*([\w\-]+)(?=\s*(first/ middle name \(s\)|address|country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
+        "first_name": r"first/ middle name \(s\)\s*([\w\s]+)(?=\s*(address|country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
+        "address": r"address\s*([\w\s,.-]+?)(?=\s*(country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
+        "country_of_domicile": r"country of domicile\s*([\w\s]+)(?=\s*(date of birth|nationality|passport no|id type|id issue date|id expiry date))",
+        "date_of_birth": r"date of birth\s*(\d{4}-\d{2}-\d{2})(?=\s*(nationality|passport no|id type|id issue date|id expiry date))",
+        "nationality": r"nationality\s*([\w\s]+)(?=\s*(passport no|id type|id issue date|id expiry date))",
+        "passport_no": r"passport no/ unique id\s*([\w\d]+)(?=\s*(id type|id issue date|id expiry date))",
+        "id_type": r"id type\s*([\w\s]+)(?=\s*(id issue date|id expiry date))",
+        "id_issue_date": r"id issue date\s*(\d{4}-\d{2}-\d{2})(?=\s*id expiry date)",
+        "id_expiry_date": r"id expiry date\s*(\d{4}-\d{2}-\d{2})",
+        "telephone": r"telephone\s*(\+[\d\s]+)(?=\s*(e-mail|email))",
+        "email": r"(e[-\s]*mail|email)\s*([\w\.-]+@[\w\.-]+)(?=\s*(telephone|country of domicile|date of birth|nationality|passport no|id type))",
+    }
+    personal_info = {}
+    for key, pattern in personal_info_patterns.items():
+        match = re.search(pattern, cleaned_text)
+        if match:
+            if key == "first_name":
+                names = match.group(1).strip().split()
+                personal_info["first_name"] = names[0]
+                personal_info["middle_name"] = " ".join(names[1:]) if len(names) > 1 else ""
+            else:
+                personal_info[key] = match.group(1)
+
+    communication_patterns = {
+        "telephone": r"telephone\s*([\+0-9\s\-\(\)]+)(?=\s*(e[-\s]*mail|email))",
+        "email": r"(e[-\s]*mail|email)\s*([\w\.-]+@[\w\.-]+)",
+    }
+    communication_info = {}
+    for key, pattern in communication_patterns.items():
+        match = re.search(pattern, cleaned_text)
+        if match:
+            communication_info[key] = match.group(2).strip()
+    return personal_info, communication_info
+
+
+def pil_preprocess_image(image_path):
+    """Passport preprocessing as a chain of PIL images (png.preprocess_image before the NumPy pipeline)."""
+    from PIL import Image, ImageEnhance, ImageFilter
+
+    image = Image.open(image_path).convert("L")
+    image = ImageEnhance.Contrast(image).enhance(2)
+    image = image.resize((1200, 900))
+    return image.filter(ImageFilter.SHARPEN)
+
+
+def regex_client_info_from_text(text) -> dict:
+    """Client info of a description, one uncompiled search over the whole text per pattern (text_extractor before the rule set)."""
+    import re
+
+    result = {
+        "client_info": {
+            "account_name": "",
+            "account_holder_name": "",
+            "account_holder_surname": "",
+            "chf": "/Off",
+            "eur": "/Off",
+            "usd": "/Off",
+            "other_ccy": "",
+            "city": "",
+            "country": "",
+            "name": "",
+            "signature_image_found": False,
+
+            # Personal information
+            "age": "",
+            "occupation": "",
+            "marital_status": "",
+            "children": [],
+
+            # Financial information
+            "last_salary": {
+                "amount": "",
+                "currency": ""
+            },
+            "savings": {
+                "amount": "",
+                "currency": ""
+            },
+            "real_estate": [],
+            "inheritance_details": {
+                "amount": "",
+                "currency": "",
+                "year": "",
+                "relation": "",
+                "relative_occupation": ""
+            },
+
+            # Education information
+            "education": {
+                "secondary_school": "",
+                "secondary_graduation_year": "",
+                "university": [],
+                "university_graduation_years": []
+            },
+
+            # Career information
+            "career_history": []
+        }
+    }
+
+    # EXTRACT NAME
+    # Try multiple patterns for full name extraction
+    name_patterns = [
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) is (\d+) years old",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) and the RM",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) and (\w+) have been",
+        r"The RM (?:is|was|has) .* ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)'s",
+        r"introduced to ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) brings a wealth of",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) is currently",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) has been",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) crossed paths",
+        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) launched his career"
+    ]
+
+    full_name = None
+    for pattern in name_patterns:
+        match = re.search(pattern, text)
+        if match:
+            full_name = match.group(1).strip()
+            break
+
+    # If still not found, try to find repeated names in the text
+    if not full_name:
+        # Look for common 3-part name pattern
+        potential_names = re.findall(r'([A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+)', text)
+        if potential_names:
+            # Find the most frequently occurring name
+            name_counts = {}
+            for name in potential_names:
+                name_counts[name] = name_counts.get(name, 0) + 1
+            full_name = max(name_counts, key=name_counts.get)
+        else:
+            # Try 2-part names
+            potential_names = re.findall(r'([A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+)(?!\w)', text)
+            if potential_names:
+                name_counts = {}
+                for name in potential_names:
+                    name_counts[name] = name_counts.get(name, 0) + 1
+                full_name = max(name_counts, key=name_counts.get)
+
+    if full_name:
+        result["client_info"]["account_name"] = full_name
+        result["client_info"]["name"] = full_name
+
+        # Split name into first and last names
+        name_parts = full_name.split()
+        if len(name_parts) >= 2:
+            # For multi-part names
+            if len(name_parts) >= 3:
+                result["client_info"]["account_holder_name"] = " ".join(name_parts[:-1])
+                result["client_info"]["account_holder_surname"] = name_parts[-1]
+            else:
+                result["client_info"]["account_holder_name"] = name_parts[0]
+                result["client_info"]["account_holder_surname"] = name_parts[-1]
+
+    # EXTRACT AGE
+    age_patterns = [
+        r"is (\d+) years old",
+        r"is a (\d+) year old",
+        r"is a (\d+)-year-old",
+        r"is a (\d+) year old \w+",
+        r"(\d+) year old \w+ from"
+    ]
+
+    for pattern in age_patterns:
+        match = re.search(pattern, text)
+        if match:
+            result["client_info"]["age"] = match.group(1)
+            break
+
+    # EXTRACT COUNTRY
+    country_patterns = [
+        r"from ([A-Za-z\s]+)\.(?!\w)",
+        r"comes from ([A-Za-z\s]+)\.(?!\w)",
+        r"comes from ([A-Za-z\s]+)(?=\s)",
+        r"from ([A-Za-z\s]+)(?=\s|\.|$)",
+        r"(\d+) year old .+ from ([A-Za-z\s]+)"
+    ]
+
+    for pattern in country_patterns:
+        match = re.search(pattern, text)
+        if match:
+            if "year old" in pattern and len(match.groups()) > 1:
+                country = match.group(2).strip()
+            else:
+                country = match.group(1).strip()
+
+            # Standardize country names
+            country_standardization = {
+                "Czech": "Czech Republic",
+                "USA": "United States",
+                "UK": "United Kingdom",
+                "UAE": "United Arab Emirates"
+            }
+            result["client_info"]["country"] = country_standardization.get(country, country)
+            break
+
+    # EXTRACT CITY
+    # Try to find cities from property locations first
+    property_city_matches = re.findall(r"(?:apartment|property|townhouse|flat|house|condo|villa) (?:located |situated |)in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)(?:,|\.|\s|$)", text)
+    property_cities = [city.strip() for city in property_city_matches]
+
+    # Also look for cities mentioned in location lists
+    location_matches = re.findall(r"locations across ([^\.]+)", text)
+    for match in location_matches:
+        # Split by 'and' or commas
+        locations = re.split(r' and |, ', match)
+        property_cities.extend([loc.strip() for loc in locations])
+
+    # If we found property cities, use the first one as the client's city
+    if property_cities:
+        result["client_info"]["city"] = property_cities[0]
+    else:
+        # Otherwise try direct city mentions
+        city_patterns = [
+            r"retreat in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)[,\.]",
+            r"conference in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)[,\.]",
+            r"in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)\. They",
+            r"lives in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)",
+            r"residing in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)"
+        ]
+
+        for pattern in city_patterns:
+            match = re.search(pattern, text)
+            if match:
+                result["client_info"]["city"] = match.group(1).strip()
+                break
+
+    # EXTRACT MARITAL STATUS
+    if re.search(r"currently divorced", text, re.IGNORECASE):
+        result["client_info"]["marital_status"] = "Divorced"
+    elif re.search(r"currently widowed", text, re.IGNORECASE):
+        result["client_info"]["marital_status"] = "Widowed"
+    elif re.search(r"(married|tied the knot|have been married)", text, re.IGNORECASE):
+        result["client_info"]["marital_status"] = "Married"
+    elif re.search(r"currently single", text, re.IGNORECASE):
+        result["client_info"]["marital_status"] = "Single"
+
+    # EXTRACT CHILDREN
+    children_pattern1 = re.search(r"(?:has|have) (\d+) (?:kids|children)", text)
+    if children_pattern1:
+        # Try to find child names
+        child_names_match = re.search(r"called ([^\.]+)", text)
+        if child_names_match:
+            names_text = child_names_match.group(1)
+            # Split names by 'and' or commas
+            names = re.split(r' and |, ', names_text)
+            result["client_info"]["children"] = [name.strip() for name in names]
+        else:
+            # Just record the number
+            result["client_info"]["children"] = [f"Child {i+1}" for i in range(int(children_pattern1.group(1)))]
+    elif "parents of" in text.lower():
+        children_match = re.search(r"parents of (\d+) children: ([^\.]+)", text)
+        if children_match:
+            names_text = children_match.group(2)
+            # Split names by 'and' or commas
+            names = re.split(r' and |, ', names_text)
+            result["client_info"]["children"] = [name.strip() for name in names]
+    elif "does not have any children" in text.lower():
+        result["client_info"]["children"] = []
+
+    # EXTRACT EDUCATION
+    # Secondary education
+    secondary_edu_patterns = [
+        r"(?:received|earned|completed) (?:his|her) secondary (?:school|education) (?:diploma |)from ([^\.]+) in (\d{4})",
+        r"graduated from ([^\.]+) in (\d{4})",
+        r"finished secondary school at ([^\.]+) in (\d{4})"
+    ]
+
+    for pattern in secondary_edu_patterns:
+        match = re.search(pattern, text)
+        if match:
+            result["client_info"]["education"]["secondary_school"] = match.group(1).strip()
+            result["client_info"]["education"]["secondary_graduation_year"] = match.group(2)
+            break
+
+    # University education - multiple universities possible
+    university_patterns = [
+        r"earned (?:his|her) (?:degree|additionally degree) from ([^\.]+) in (\d{4})",
+        r"graduated from ([^\.]+) (?:with|in) .* in (\d{4})",
+        r"study at ([^\.]+) until (\d{4})",
+        r"attended ([^,\.]+) (?:and|until|which he|which she) graduated in (\d{4})"
+    ]
+
+    # Find all universities
+    for pattern in university_patterns:
+        for match in re.finditer(pattern, text):
+            university = match.group(1).strip()
+            year = match.group(2)
+
+            # Only add if not already in the list
+            if university not in result["client_info"]["education"]["university"]:
+                result["client_info"]["education"]["university"].append(university)
+                result["client_info"]["education"]["university_graduation_years"].append(year)
+
+    # EXTRACT OCCUPATION
+    # Try to find current/last occupation
+    occupation_patterns = [
+        r"retired ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
+        r"(\d+) year old retired ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
+        r"(\d+) year old ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
+        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
+        r"role of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at"
+    ]
+
+    for pattern in occupation_patterns:
+        match = re.search(pattern, text)
+        if match and not result["client_info"]["occupation"]:
+            if "year old retired" in pattern:
+                result["client_info"]["occupation"] = match.group(2).strip()
+            elif "year old" in pattern and "retired" not in pattern:
+                result["client_info"]["occupation"] = match.group(2).strip()
+            else:
+                result["client_info"]["occupation"] = match.group(1).strip()
+
+    # EXTRACT CAREER HISTORY
+    # Look for all job positions mentioned
+    position_patterns = [
+        r"as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
+        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
+        r"worked as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)"
+    ]
+
+    career_entries = []
+
+    for pattern in position_patterns:
+        for match in re.finditer(pattern, text):
+            position = match.group(1).strip()
+            company = match.group(2).strip()
+            start_year = match.group(3)
+            end_year = match.group(4)
+
+            career_entries.append({
+                "position": position,
+                "company": company,
+                "start_year": start_year,
+                "end_year": end_year if end_year.isdigit() else "present"
+            })
+
+    # Also check for positions without explicit years
+    simpler_patterns = [
+        r"worked as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)",
+        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)",
+        r"role as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)"
+    ]
+
+    for pattern in simpler_patterns:
+        for match in re.finditer(pattern, text):
+            position = match.group(1).strip()
+            company = match.group(2).strip()
+
+            # Only add if we don't already have this position
+            if not any(entry["position"] == position and entry["company"] == company for entry in career_entries):
+                career_entries.append({
+                    "position": position,
+                    "company": company,
+                    "start_year": "",
+                    "end_year": ""
+                })
+
+    # Add career entries to result
+    if career_entries:
+        result["client_info"]["career_history"] = career_entries
+
+    # EXTRACT LAST SALARY
+    salary_match = re.search(r"(?:earned|remuneration of|compensated with|salary of) (\d+) ([A-Z]{3}) p\.A\.", text)
+    if salary_match:
+        result["client_info"]["last_salary"]["amount"] = salary_match.group(1)
+        result["client_info"]["last_salary"]["currency"] = salary_match.group(2)
+
+    # EXTRACT SAVINGS
+    savings_patterns = [
+        r"saved (?:approximately |)(\d+) ([A-Z]{3})",
+        r"saving (\d+) ([A-Z]{3})",
+        r"saved[^0-9]+(\d+) ([A-Z]{3})"
+    ]
+
+    for pattern in savings_patterns:
+        match = re.search(pattern, text)
+        if match:
+            result["client_info"]["savings"]["amount"] = match.group(1)
+            result["client_info"]["savings"]["currency"] = match.group(2)
+            break
+
+    # EXTRACT REAL ESTATE
+    # Method 1: Look for properties with locations and values
+    property_patterns = [
+        r"(?:has|purchased|owns|bought) (?:a |)([a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:located |situated |)in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+),?[^,\.]+?(?:worth|valued at) ([0-9,.]+) ([A-Z]{3})"
+    ]
+
+    for pattern in property_patterns:
+        for match in re.finditer(pattern, text):
+            property_type = match.group(1).strip()
+            location = match.group(2).strip()
+            value = match.group(3).replace(',', '')
+            currency = match.group(4)
+
+            result["client_info"]["real_estate"].append({
+                "type": property_type,
+                "location": location,
+                "value": value,
+                "currency": currency
+            })
+
+    # Method 2: Look for the "stunning properties" pattern
+    property_count_match = re.search(r"comprises (\d+) stunning properties[^\.]+ across ([^\.]+)", text)
+    if property_count_match:
+        count = int(property_count_match.group(1))
+        locations_text = property_count_match.group(2)
+
+        # Split locations by 'and' or commas
+        locations = re.split(r' and |, ', locations_text)
+
+        for i, location in enumerate(locations[:count]):  # Limit to the number mentioned
+            result["client_info"]["real_estate"].append({
+                "type": "Property",
+                "location": location.strip(),
+                "value": "",
+                "currency": ""
+            })
+
+    # EXTRACT INHERITANCE DETAILS
+    inheritance_patterns = [
+        r"(?:inheritance|inherited|received) (?:a |an |of |)(?:significant sum of |sum of |)(\d+) ([A-Z]{3}) from (?:her|his) (?:late |)([a-z]+),\s*(?:a |an |)(?:renowned |respected |prominent |well-known |)([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)[,\.].*?in (\d{4})",
+        r"inheritance of (\d+) ([A-Z]{3}) from (?:her|his) (?:late |)([a-z]+).*?([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)(?:,|\.) in (\d{4})"
+    ]
+
+    for pattern in inheritance_patterns:
+        match = re.search(pattern, text)
+        if match:
+            result["client_info"]["inheritance_details"]["amount"] = match.group(1)
+            result["client_info"]["inheritance_details"]["currency"] = match.group(2)
+            result["client_info"]["inheritance_details"]["relation"] = match.group(3)
+            result["client_info"]["inheritance_details"]["relative_occupation"] = match.group(4).strip()
+            result["client_info"]["inheritance_details"]["year"] = match.group(5)
+            break
+
+    # Check for no inheritance statement
+    if "does not have any inheritances" in text:
+        result["client_info"]["inheritance_details"] = {
+            "amount": "0",
+            "currency": "",
+            "year": "",
+            "relation": "",
+            "relative_occupation": ""
+        }
+
+    # EXTRACT CURRENCY INFORMATION (EUR/CHF/USD)
+    if any(result["client_info"]["last_salary"]["currency"] == currency or
+           result["client_info"]["savings"]["currency"] == currency or
+           (result["client_info"]["inheritance_details"].get("currency") == currency and
+            int(result["client_info"]["inheritance_details"].get("amount", 0)) > 0) or
+           any(prop["currency"] == currency for prop in result["client_info"]["real_estate"])
+           for currency in ["EUR", "CHF", "USD"]):
+
+        if "EUR" in [result["client_info"]["last_salary"]["currency"],
+                     result["client_info"]["savings"]["currency"],
+                     result["client_info"]["inheritance_details"].get("currency")] or \
+           any(prop["currency"] == "EUR" for prop in result["client_info"]["real_estate"]):
+            result["client_info"]["eur"] = "/Yes"
+
+        if "CHF" in [result["client_info"]["last_salary"]["currency"],
+                     result["client_info"]["savings"]["currency"],
+                     result["client_info"]["inheritance_details"].get("currency")] or \
+           any(prop["currency"] == "CHF" for prop in result["client_info"]["real_estate"]):
+            result["client_info"]["chf"] = "/Yes"
+
+        if "USD" in [result["client_info"]["last_salary"]["currency"],
+                     result["client_info"]["savings"]["currency"],
+                     result["client_info"]["inheritance_details"].get("currency")] or \
+           any(prop["currency"] == "USD" for prop in result["client_info"]["real_estate"]):
+            result["client_info"]["usd"] = "/Yes"
+
+    # Check for other currencies
+    all_currencies = [
+        result["client_info"]["last_salary"]["currency"],
+        result["client_info"]["savings"]["currency"],
+        result["client_info"]["inheritance_details"].get("currency", "")
+    ]
+
+    all_currencies.extend([prop["currency"] for prop in result["client_info"]["real_estate"] if "currency" in prop])
+
+    # Set other_ccy if any non-standard currency is found
+    for currency in all_currencies:
+        if currency and currency not in ["", "EUR", "CHF", "USD"]:
+            result["client_info"]["other_ccy"] = currency
+            break
+
+    # Clean up empty structures
+    if not any(result["client_info"]["education"].values()):
+        result["client_info"]["education"] = {}
+
+    if not any(result["client_info"]["inheritance_details"].values()):
+        result["client_info"]["inheritance_details"] = {}
+
+    if not result["client_info"]["last_salary"]["amount"]:
+        result["client_info"]["last_salary"] = {}
+
+    if not result["client_info"]["savings"]["amount"]:
+        result["client_info"]["savings"] = {}
+
+    if not result["client_info"]["real_estate"]:
+        result["client_info"]["real_estate"] = []
+
+    if not result["client_info"]["career_history"]:
+        result["client_info"]["career_history"] = []
+
+    return result
+
+
+def verify_personal_data_consistency(data) -> dict:
+    """Consistency checks of the judge, helpers and tables rebuilt on every call (judge.py before the Judge class)."""
+    import re
+    from datetime import datetime
+    from difflib import SequenceMatcher
+    import unicodedata
+
+    inconsistencies = []
+    invalid_data = []
+
+    def similar(a, b):
+        if a in b or b in a:
+            return 1.00
+        
+        # check for all synonyms
+        max_ratio = 0
+        
+        return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
+
+
+    def normalize_name(name):
+        name = name.strip().lower()
+        name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode()
+        return name
+
+    def normalize_date(value):
+        if not value:
+            return None
+        value = value.strip()
+        value = re.sub(r'\s+', ' ', value)  # normalize whitespace
+        formats = [
+            "%d-%b-%Y", "%d-%B-%Y", "%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y",
+            "%d %b %Y", "%d %B %Y", "%Y %b %d", "%Y %B %d"
+        ]
+        for fmt in formats:
+            try:
+                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+        # try to manually fix common lowercase month issues
+        try:
+            return datetime.strptime(value.title(), "%d-%b-%Y").strftime("%Y-%m-%d")
+        except:
+            return None
+
+    def normalize(key, value):
+        if "date" in key:
+            return normalize_date(value)
+        if "name" in key:
+            return normalize_name(value)
+        return value.lower().strip()
+
+    def is_valid_email(email):
+        return re.match(r"[^@]+@[^@]+\.[^@]+", email.strip())
+
+    def is_valid_passport_number(passport):
+        return re.match(r"^[A-Z]{2}[0-9]{7}$", passport.strip().upper())
+
+    def is_valid_phone_number(phone):
+        return re.match(r"^\+[\d\s\-()]{7,}$", phone.strip())
+
+    # Pairs or groups of keys we expect to be consistent
+    matches = [
+        # ("passport_number_account.pdf", "passport_number_passport.png", "passport_no_profile.docx"),
+        ("name_account.pdf", "account_name_account.pdf"),
+        ("account_holder_name_account.pdf", "first_name_profile.docx"),
+        ("account_holder_surname_account.pdf", "last_name_profile.docx"),
+        ("email_account.pdf", "email_profile.docx"),
+        # ("phone_number_account.pdf", "telephone_profile.docx"),
+        ("birth_date_passport.png", "date_of_birth_profile.docx"),
+        ("issue_date_passport.png", "id_issue_date_profile.docx"),
+        ("expiry_date_passport.png", "id_expiry_date_profile.docx"),
+        ("country_account.pdf", "country_of_domicile_profile.docx"),
+        ("citizenship_passport.png", "nationality_profile.docx"),
+        # ("country_account.pdf", "country_passport.png"),
+        ("postal_code_account.pdf", "address_profile.docx"),
+        # ("city_account.pdf", "address_profile.docx"),
+        ("building_number_account.pdf", "address_profile.docx"),
+    ]
+
+    total_checks = 0
+    consistent = 0
+
+    for group in matches:
+        values = [(k, data.get(k, "")) for k in group if k in data]
+        if len(values) > 1:
+            base_key, base_val = values[0]
+            base_val_norm = normalize(base_key, base_val)
+            for other_key, other_val in values[1:]:
+                other_val_norm = normalize(other_key, other_val)
+                if base_val_norm and other_val_norm and similar(base_val_norm, other_val_norm) >= 0.8:
+                    consistent += 1
+                else:
+                    inconsistencies.append((group, base_val, other_val))
+                total_checks += 1
+
+    # Validate known formats
+    date_fields = [
+        "birth_date_passport.png",
+        "date_of_birth_profile.docx",
+        "issue_date_passport.png",
+        "expiry_date_passport.png",
+        "id_issue_date_profile.docx",
+        "id_expiry_date_profile.docx",
+    ]
+    for field in date_fields:
+        if field in data and not normalize_date(data[field]):
+            invalid_data.append((field, data[field], "Invalid date format"))
+
+    if "email_account.pdf" in data and not is_valid_email(data["email_account.pdf"]):
+        invalid_data.append(("email_account.pdf", data["email_account.pdf"], "Invalid email"))
+
+    if "email_profile.docx" in data and not is_valid_email(data["email_profile.docx"]):
+        invalid_data.append(("email_profile.docx", data["email_profile.docx"], "Invalid email"))
+
+    if "passport_number_account.pdf" in data and not is_valid_passport_number(data["passport_number_account.pdf"]):
+        invalid_data.append(("passport_number_account.pdf", data["passport_number_account.pdf"], "Invalid passport number"))
+
+    # if "phone_number_account.pdf" in data and not is_valid_phone_number(data["phone_number_account.pdf"]):
+    #     invalid_data.append(("phone_number_account.pdf", data["phone_number_account.pdf"], "Invalid phone number"))
+
+    # if "investment risk profile_profile.docx" in data and data["investment risk profile_profile.docx"].lower().strip() in ["high"]:
+    #     invalid_data.append(("investment risk profile_profile.docx", data["investment risk profile_profile.docx"], "risk of investment too high"))
+
+    # if "investment experience_profile.docx" in data and data["investment experience_profile.docx"].lower().strip() in ["inexperienced"]:
+    #     invalid_data.append(("investment experience_profile.docx", data["investment experience_profile.docx"], "risk of investment too high"))
+
+    exposed = "is the client or associated person a politically exposed person as defined in the client acceptance policy?_profile.docx"
+    if exposed in data and data[exposed] != "no":
+        invalid_data.append((exposed, data[exposed], "politically exposed"))
+
+    consistency_percentage = round((consistent / total_checks) * 100, 2) if total_checks > 0 else 100.0
+
+    return {
+        "consistency_percentage": consistency_percentage,
+        "potential_inconsistencies": inconsistencies,
+        "invalid_data": invalid_data
+    }
+
+
+def normalize_date(value):
+    """A date as YYYY-MM-DD, every format tried with strptime in order (the judge before DateNormalizer)."""
+    import re
+    from datetime import datetime
+
+    if not value:
+        return None
+    value = value.strip()
+    value = re.sub(r'\s+', ' ', value)  # normalize whitespace
+    formats = [
+        "%d-%b-%Y", "%d-%B-%Y", "%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y",
+        "%d %b %Y", "%d %B %Y", "%Y %b %d", "%Y %B %d"
+    ]
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    # try to manually fix common lowercase month issues
+    try:
+        return datetime.strptime(value.title(), "%d-%b-%Y").strftime("%Y-%m-%d")
+    except:
+        return None
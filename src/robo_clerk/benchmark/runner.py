@@ -0,0 +1,636 @@
+"""
+Processor and pipeline benchmarks over synthetic corpora.
+
+Usage from project root:
+    poetry run robo-benchmark --sizes 10,50 --baseline benchmarks/baseline.json
+    poetry run robo-benchmark --sizes 10,50 --baseline benchmarks/baseline.json --save-baseline
+
+Each suite reports timings in milliseconds; every "median_ms" value is
+compared with the same value in the baseline and the run fails when one is
+slower than the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from robo_clerk.benchmark import legacy
+from robo_clerk.benchmark.synthetic import generate_corpus
+from robo_clerk.doc_processors import doc_master
+from robo_clerk.utils.file import FileType, list_files_in_folder, write_json_atomic
+
+PROCESSOR_FILES = {
+    "pdf": "account.pdf",
+    "docx": "profile.docx",
+    "png": "passport.png",
+    "txt": "description.txt",
+}
+
+
+def timing_summary(samples_ms: list) -> dict:
+    samples_ms = sorted(samples_ms)
+    return {
+        "count": len(samples_ms),
+        "median_ms": round(statistics.median(samples_ms), 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+        "max_ms": round(samples_ms[-1], 3),
+    }
+
+
+def time_call(function, *args, repeat=1, **kwargs) -> float:
+    """Best of `repeat` runs, in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def client_features(folders: list, args) -> list:
+    """The merged features of every client, from the documents of the selected processors only."""
+    clients = []
+    for folder in folders:
+        data = {}
+        for name in args.processors:
+            document_data = doc_master.process_document(os.path.join(folder, PROCESSOR_FILES[name]))
+            if document_data is not None:
+                data.update(document_data)
+        clients.append(data)
+    return clients
+
+
+def bench_processors(folders: list, args) -> dict:
+    """run_pipeline of every processor on its document of every client."""
+    results = {}
+    for name in args.processors:
+        file_name = PROCESSOR_FILES[name]
+        processor = doc_master.get_file_processor(file_name)
+        run_pipeline = lambda path: processor(path).run_pipeline()
+        try:
+            # the first call pays for imports and lazy set-up, keep it out of the numbers
+            run_pipeline(os.path.join(folders[0], file_name))
+            samples = [time_call(run_pipeline, os.path.join(folder, file_name), repeat=args.repeat) for folder in folders]
+        except Exception as e:
+            print(f"  {name}: skipped ({type(e).__name__}: {e})")
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        results[name] = timing_summary(samples)
+        print(f"  {name}: median {results[name]['median_ms']:.1f} ms/doc")
+    return results
+
+
+def bench_process_documents(folders: list, args) -> dict:
+    """The whole per-client path, sequential and with the parallel executors."""
+    results = {}
+    skip = {PROCESSOR_FILES[name] for name in PROCESSOR_FILES if name not in args.processors}
+    with tempfile.TemporaryDirectory() as bundles:
+        # copy only the documents of the selected processors into per-client folders
+        client_folders = []
+        for folder in folders:
+            client_folder = os.path.join(bundles, os.path.basename(folder))
+            os.makedirs(client_folder)
+            for file_path in list_files_in_folder(folder):
+                if os.path.basename(file_path) in skip:
+                    continue
+                with open(file_path, "rb") as source, open(os.path.join(client_folder, os.path.basename(file_path)), "wb") as target:
+                    target.write(source.read())
+            client_folders.append(client_folder)
+
+        for mode, parallel in (("sequential", False), ("parallel", True)):
+            try:
+                # warm-up also starts the worker pools of the parallel mode
+                doc_master.process_documents(client_folders[0], None, parallel=parallel)
+                samples = [time_call(doc_master.process_documents, folder, None, parallel=parallel) for folder in client_folders]
+            except Exception as e:
+                print(f"  process_documents {mode}: skipped ({type(e).__name__}: {e})")
+                results[mode] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            results[mode] = timing_summary(samples)
+            results[mode]["clients_per_sec"] = round(len(samples) * 1000 / sum(samples), 3)
+            print(f"  process_documents {mode}: median {results[mode]['median_ms']:.1f} ms/client")
+    return results
+
+
+def peak_memory_kb(function, *args) -> float:
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_docx_parse(folders: list, args) -> dict:
+    """Profile table text through python-docx and through the streaming parser."""
+    from robo_clerk.doc_processors.docx import iter_table_rows
+
+    parsers = {
+        "python_docx": legacy.python_docx_table_text,
+        "streaming": lambda path: "\n".join(iter_table_rows(path)),
+    }
+    paths = [os.path.join(folder, PROCESSOR_FILES["docx"]) for folder in folders]
+    results = {}
+    for name, parse in parsers.items():
+        parse(paths[0])
+        samples = [time_call(parse, path, repeat=args.repeat) for path in paths]
+        results[name] = timing_summary(samples)
+        results[name]["peak_kb"] = round(max(peak_memory_kb(parse, path) for path in paths), 1)
+        print(f"  docx {name}: median {results[name]['median_ms']:.2f} ms/doc, peak {results[name]['peak_kb']:.0f} KiB")
+    return results
+
+
+def bench_ocr_modes(folders: list, args) -> dict:
+    """Passport OCR with one tesseract run per page against one per box, with and without the MRZ first."""
+    from robo_clerk.doc_processors import png
+
+    paths = [os.path.join(folder, PROCESSOR_FILES["png"]) for folder in folders]
+    results = {}
+    settings = png.OCR_MODE, png.MRZ_FIRST
+    for mode, mrz in ((mode, mrz) for mrz in (False, True) for mode in png.OCR_MODES):
+        # the settings come from the environment; switched here for the timing only, nothing is cached
+        png.OCR_MODE, png.MRZ_FIRST = mode, mrz
+        mode = f"{mode}+mrz" if mrz else mode
+        try:
+            png.process_passport_image(paths[0])
+            samples = [time_call(png.process_passport_image, path, repeat=args.repeat) for path in paths]
+        except Exception as e:
+            print(f"  ocr {mode}: skipped ({type(e).__name__}: {e})")
+            results[mode] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        finally:
+            png.OCR_MODE, png.MRZ_FIRST = settings
+        results[mode] = timing_summary(samples)
+        print(f"  ocr {mode}: median {results[mode]['median_ms']:.1f} ms/passport")
+    return results
+
+
+def bench_ocr_pool(folders: list, args) -> dict:
+    """Passport page OCR throughput, a tesseract process per call against the persistent worker pool."""
+    import pytesseract
+    from robo_clerk.doc_processors.ocr_pool import OCRPool
+    from robo_clerk.doc_processors.png import ocr_image, preprocess_image
+
+    images = [ocr_image(preprocess_image(os.path.join(folder, PROCESSOR_FILES["png"]))) for folder in folders]
+    results = {}
+
+    def per_call(image):
+        pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+    try:
+        start = time.perf_counter()
+        samples = [time_call(per_call, image) for image in images]
+        elapsed = time.perf_counter() - start
+        results["per_call"] = timing_summary(samples)
+        results["per_call"]["passports_per_sec"] = round(len(images) / elapsed, 3)
+    except Exception as e:
+        results["per_call"] = {"error": f"{type(e).__name__}: {e}"}
+
+    try:
+        with OCRPool(workers=args.ocr_workers) as pool:
+            pool.image_to_data(images[0])  # wait for the workers to come up
+            samples = []
+            start = time.perf_counter()
+            jobs = []
+            for image in images:
+                submitted = time.perf_counter()
+                job = pool.submit("image_to_data", image)
+                job.add_done_callback(lambda _, submitted=submitted: samples.append((time.perf_counter() - submitted) * 1000))
+                jobs.append(job)
+            for job in jobs:
+                job.result()
+            elapsed = time.perf_counter() - start
+        results["pool"] = timing_summary(samples)
+        results["pool"]["passports_per_sec"] = round(len(images) / elapsed, 3)
+        results["pool"]["workers"] = len(pool.workers)
+    except Exception as e:
+        results["pool"] = {"error": f"{type(e).__name__}: {e}"}
+
+    for name, metrics in results.items():
+        if "error" in metrics:
+            print(f"  ocr {name}: skipped ({metrics['error']})")
+        else:
+            print(f"  ocr {name}: {metrics['passports_per_sec']:.1f} passports/s, median latency {metrics['median_ms']:.1f} ms")
+    return results
+
+
+# Peak memory of one call in a fresh interpreter: PIL allocates outside the
+# Python heap, so tracemalloc would only see half the picture. Writing 5 to
+# clear_refs resets the high-water mark (Linux) so imports do not count.
+PEAK_RSS_PROBE = """
+import sys
+from {module} import {function} as function
+def high_water_kb():
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+def current_kb():
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+with open("/proc/self/clear_refs", "w") as clear_refs:
+    clear_refs.write("5")
+before = current_kb()
+function(sys.argv[1])
+print(high_water_kb() - before)
+"""
+
+
+def peak_rss_kb(module: str, function: str, path: str) -> int:
+    output = subprocess.run(
+        [sys.executable, "-c", PEAK_RSS_PROBE.format(module=module, function=function), path],
+        capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    ).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+def bench_preprocess(folders: list, args) -> dict:
+    """Passport preprocessing, the PIL image chain against the NumPy pipeline."""
+    from robo_clerk.doc_processors import png
+
+    pipelines = {
+        "pil": ("robo_clerk.benchmark.legacy", "pil_preprocess_image", legacy.pil_preprocess_image),
+        "numpy": ("robo_clerk.doc_processors.png", "preprocess_image", png.preprocess_image),
+    }
+    paths = [os.path.join(folder, PROCESSOR_FILES["png"]) for folder in folders]
+    results = {}
+    for name, (module, function_name, function) in pipelines.items():
+        function(paths[0])
+        results[name] = timing_summary([time_call(function, path, repeat=args.repeat) for path in paths])
+        results[name]["peak_rss_kb"] = peak_rss_kb(module, function_name, paths[0])
+        print(f"  preprocess {name}: median {results[name]['median_ms']:.1f} ms/passport, peak {results[name]['peak_rss_kb']} KiB")
+    return results
+
+
+# Labels whose value pattern also matches the labels after them, with none of
+# the labels the old lookaheads wait for: every occurrence scans to the end
+ADVERSARIAL_PROFILE_UNIT = "nationality german country of domicile germany id type passport "
+ADVERSARIAL_SIZES = (2000, 4000, 8000, 16000)
+
+
+def adversarial_profile_text(size: int) -> str:
+    return (ADVERSARIAL_PROFILE_UNIT * (size // len(ADVERSARIAL_PROFILE_UNIT) + 1))[:size]
+
+
+def bench_docx_labels(folders: list, args) -> dict:
+    """Profile field extraction on long adversarial texts, per-field regexes against label segmentation."""
+    from robo_clerk.doc_processors.docx import PROFILE_FIELDS, find_field_value, segment_profile
+
+    def segmented(text):
+        segments = segment_profile(text)
+        return {key: find_field_value(segments, key) for key in PROFILE_FIELDS}
+
+    results = {}
+    for name, extract in (("regex", legacy.regex_profile_fields), ("segmented", segmented)):
+        results[name] = {}
+        for size in ADVERSARIAL_SIZES:
+            text = adversarial_profile_text(size)
+            results[name][str(size)] = timing_summary([time_call(extract, text) for _ in range(args.repeat)])
+        smallest, largest = ADVERSARIAL_SIZES[0], ADVERSARIAL_SIZES[-1]
+        # 1.0 is linear, largest / smallest is quadratic
+        growth = results[name][str(largest)]["median_ms"] / max(results[name][str(smallest)]["median_ms"], 1e-6) / (largest / smallest)
+        results[name]["growth"] = round(growth, 2)
+        print(f"  docx labels {name}: {results[name][str(largest)]['median_ms']:.2f} ms at {largest} chars, growth x{growth:.2f} of linear")
+    return results
+
+
+def bench_txt_rules(folders: list, args) -> dict:
+    """Description extraction, a regex search over the whole text per pattern against the compiled rule set."""
+    from robo_clerk.doc_processors.text_extractor import extract_client_info_from_text
+
+    texts = []
+    for folder in folders:
+        with open(os.path.join(folder, PROCESSOR_FILES["txt"]), encoding="utf-8") as text_file:
+            texts.append(text_file.read())
+    results = {}
+    for name, extract in (("regex", legacy.regex_client_info_from_text), ("rules", extract_client_info_from_text)):
+        extract(texts[0])
+        results[name] = timing_summary([time_call(extract, text, repeat=args.repeat) for text in texts])
+        print(f"  txt {name}: median {results[name]['median_ms']:.3f} ms/description")
+    results["mismatches"] = sum(legacy.regex_client_info_from_text(text) != extract_client_info_from_text(text) for text in texts)
+    print(f"  txt rules: {results['mismatches']} descriptions extracted differently")
+    return results
+
+
+
+def bench_llm_client(folders: list, args) -> dict:
+    """
+    Description throughput against the local SambaNova stub, one request at a
+    time against the shared concurrent client, then a rerun served by the LLM cache.
+    """
+    from robo_clerk.doc_processors.llm_cache import LLMResponseCache
+    from robo_clerk.doc_processors.process_file_sambanova import TXTProcessorSambanova
+    from robo_clerk.doc_processors.sambanova_client import SambaNovaClient
+    from robo_clerk.sambanova_stub import start_stub_server
+
+    texts = []
+    for folder in folders:
+        with open(os.path.join(folder, PROCESSOR_FILES["txt"]), encoding="utf-8") as text_file:
+            texts.append(text_file.read())
+    prompts = [TXTProcessorSambanova.create_extraction_prompt(text) for text in texts]
+    # the stub answers with a fixed latency and rate limits a share of the requests
+    server = start_stub_server(latency=args.llm_latency, rate_limit=0.05, retry_after=0, seed=args.seed)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    results = {}
+    answers = []
+    try:
+        for name, concurrency in (("sequential", 1), ("concurrent", args.llm_concurrency)):
+            try:
+                with SambaNovaClient("stub", base_url, concurrency=concurrency) as client:
+                    samples = []
+                    start = time.perf_counter()
+                    futures = []
+                    for prompt in prompts:
+                        submitted = time.perf_counter()
+                        future = client.submit(prompt)
+                        future.add_done_callback(lambda _, submitted=submitted: samples.append((time.perf_counter() - submitted) * 1000))
+                        futures.append(future)
+                    failures = sum(future.exception() is not None for future in futures)
+                    elapsed = time.perf_counter() - start
+                    answers = [None if future.exception() else future.result() for future in futures]
+                    results[name] = timing_summary(samples)
+                    results[name].update(descriptions_per_sec=round(len(prompts) / elapsed, 3), concurrency=concurrency,
+                                         retries=client.stats["retries"], failures=failures)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if answers:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = LLMResponseCache(cache_dir)
+            for text, answer in zip(texts, answers):
+                if answer is not None:
+                    cache.put("stub", TXTProcessorSambanova.PROMPT_VERSION, text, TXTProcessorSambanova.parse_response(answer))
+            samples = []
+            start = time.perf_counter()
+            for text in texts:
+                samples.append(time_call(cache.get, "stub", TXTProcessorSambanova.PROMPT_VERSION, text))
+            elapsed = time.perf_counter() - start
+            results["cached"] = timing_summary(samples)
+            results["cached"].update(descriptions_per_sec=round(len(texts) / elapsed, 3), hit_rate=cache.stats()["hit_rate"])
+
+    for name, metrics in results.items():
+        if "error" in metrics:
+            print(f"  llm {name}: skipped ({metrics['error']})")
+        elif name == "cached":
+            print(f"  llm {name}: {metrics['descriptions_per_sec']:.1f} descriptions/s, hit rate {metrics['hit_rate']:.0%}")
+        else:
+            print(f"  llm {name}: {metrics['descriptions_per_sec']:.1f} descriptions/s at concurrency {metrics['concurrency']}, "
+                  f"{metrics['retries']} retries, {metrics['failures']} failures")
+    return results
+
+
+def bench_txt_hybrid(folders: list, args) -> dict:
+    """Descriptions through the LLM alone against the regex extractor with the LLM asked only for the fields it missed (on the stub)."""
+    from robo_clerk.doc_processors.hybrid_text import create_fields_prompt, extraction_from_client_info, missing_fields
+    from robo_clerk.doc_processors.process_file_sambanova import TXTProcessorSambanova
+    from robo_clerk.doc_processors.sambanova_client import SambaNovaClient
+    from robo_clerk.doc_processors.text_extractor import extract_client_info_from_text
+    from robo_clerk.sambanova_stub import start_stub_server
+
+    texts = []
+    for folder in folders:
+        with open(os.path.join(folder, PROCESSOR_FILES["txt"]), encoding="utf-8") as text_file:
+            texts.append(text_file.read())
+
+    def hybrid_prompts():
+        prompts = []
+        for text in texts:
+            fields = missing_fields(extraction_from_client_info(extract_client_info_from_text(text)["client_info"]))
+            if fields:
+                prompts.append(create_fields_prompt(text, fields))
+        return prompts
+
+    server = start_stub_server(latency=args.llm_latency, seed=args.seed)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    results = {}
+    try:
+        for name, build_prompts in (("llm", lambda: [TXTProcessorSambanova.create_extraction_prompt(text) for text in texts]),
+                                    ("hybrid", hybrid_prompts)):
+            try:
+                with SambaNovaClient("stub", base_url, concurrency=args.llm_concurrency) as client:
+                    start = time.perf_counter()
+                    prompts = build_prompts()
+                    client.complete_many(prompts)
+                    elapsed = time.perf_counter() - start
+                results[name] = {
+                    "descriptions_per_sec": round(len(texts) / elapsed, 3),
+                    "llm_calls": len(prompts),
+                    "mean_prompt_chars": round(statistics.mean(len(prompt) for prompt in prompts)) if prompts else 0,
+                }
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for name, metrics in results.items():
+        if "error" in metrics:
+            print(f"  txt {name}: skipped ({metrics['error']})")
+        else:
+            print(f"  txt {name}: {metrics['descriptions_per_sec']:.1f} descriptions/s, {metrics['llm_calls']}/{len(texts)} LLM calls "
+                  f"of {metrics['mean_prompt_chars']} chars on average")
+    return results
+
+
+def bench_judge(folders: list, args) -> dict:
+    """The judge on the merged features of every client: the old per-call closures, one decision per call, judge_many and the columnar judge_table."""
+    from robo_clerk.decider import judge
+    from robo_clerk.decider.columnar import ClientTable, judge_table
+    from robo_clerk.decider.dates import DateNormalizer
+
+    try:
+        clients = client_features(folders, args)
+    except Exception as e:
+        print(f"  judge: skipped ({type(e).__name__}: {e})")
+        return {"error": f"{type(e).__name__}: {e}"}
+    table = ClientTable.from_clients(enumerate(clients))
+
+    def legacy_decision(data):
+        result = legacy.verify_personal_data_consistency(data)
+        negative_result = result["consistency_percentage"] < 95 or len(result["invalid_data"]) > 0
+        return (judge.Decision.Reject if negative_result else judge.Decision.Accept), result
+
+    def run_each(decide):
+        return [decide(data) for data in clients]
+
+    results = {}
+    for name, function, arguments in (("legacy", run_each, (legacy_decision,)),
+                                      ("per_call", run_each, (judge.handcrafted_decision_from_data,)),
+                                      ("judge_many", judge.judge_many, (clients,)),
+                                      ("table_load", ClientTable.from_clients, (list(enumerate(clients)),)),
+                                      ("judge_table", judge_table, (table,))):
+        elapsed_ms = time_call(function, *arguments, repeat=args.repeat)
+        results[name] = {"median_ms": round(elapsed_ms, 3), "us_per_client": round(elapsed_ms * 1000 / len(clients), 1)}
+        print(f"  judge {name}: {results[name]['us_per_client']:.1f} us/client")
+    results["mismatches"] = sum(old != new for old, new in zip(run_each(legacy_decision), judge.judge_many(clients)))
+    print(f"  judge: {results['mismatches']} clients judged differently")
+    verdict = judge_table(table)
+    results["table_mismatches"] = sum(decided != verdict.decision(index) for index, decided in enumerate(judge.judge_many(clients)))
+    print(f"  judge: {results['table_mismatches']} clients judged differently by judge_table")
+
+    # date parsing alone, a fresh normalizer per run so nothing is memoized yet
+    dates = [(field, data[field]) for data in clients for field in judge.DATE_FIELDS if field in data]
+
+    def normalize_cold():
+        normalizer = DateNormalizer()
+        return [normalizer.normalize(value, field) for field, value in dates]
+
+    for name, function in (("dates_legacy", lambda: [legacy.normalize_date(value) for _, value in dates]),
+                           ("dates", normalize_cold)):
+        elapsed_ms = time_call(function, repeat=args.repeat)
+        results[name] = {"median_ms": round(elapsed_ms, 3), "us_per_date": round(elapsed_ms * 1000 / max(len(dates), 1), 2)}
+        print(f"  judge {name}: {results[name]['us_per_date']:.2f} us/date")
+    return results
+
+
+def bench_similarity(folders: list, args) -> dict:
+    """The judge's similarity check on its field pairs, difflib's full ratio against the bounded check, one pair at a time and batched."""
+    from difflib import SequenceMatcher
+    from robo_clerk.decider.judge import Judge
+    from robo_clerk.decider.similarity import SIMILARITY_THRESHOLD, is_similar, similar_many
+
+    try:
+        clients = client_features(folders, args)
+    except Exception as e:
+        print(f"  similarity: skipped ({type(e).__name__}: {e})")
+        return {"error": f"{type(e).__name__}: {e}"}
+    judge = Judge()
+    pairs = []
+    country_pairs = []
+    # each group's values within a client and against the next client, which is what an inconsistency looks like
+    for data, other in zip(clients, clients[1:] + clients[:1]):
+        for _, keys, compare in judge.groups:
+            values = [(normalize(data[key]), normalize(other[key])) for key, normalize in keys if key in data and key in other]
+            for (base, _), (same, different) in zip(values, values[1:]):
+                pairs += [(base, same), (base, different)]
+                if compare == judge.similar_country:
+                    country_pairs += [(base, same), (base, different)]
+    pairs = [(a, b) for a, b in pairs if a and b]
+    country_pairs = [(a, b) for a, b in country_pairs if a and b]
+
+    def difflib_similar(a, b):
+        if a in b or b in a:
+            return True
+        return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio() >= SIMILARITY_THRESHOLD
+
+    results = {}
+    for name, function in (("difflib", lambda: [difflib_similar(a, b) for a, b in pairs]),
+                           ("bounded", lambda: [is_similar(a, b) for a, b in pairs]),
+                           ("batched", lambda: similar_many(pairs))):
+        elapsed_ms = time_call(function, repeat=args.repeat)
+        results[name] = {"median_ms": round(elapsed_ms, 3), "us_per_pair": round(elapsed_ms * 1000 / max(len(pairs), 1), 2)}
+        print(f"  similarity {name}: {results[name]['us_per_pair']:.2f} us/pair")
+    results["pairs"] = len(pairs)
+    results["mismatches"] = sum(old != new for old, new in zip((difflib_similar(a, b) for a, b in pairs), similar_many(pairs)))
+    print(f"  similarity: {results['mismatches']} of {len(pairs)} pairs decided differently")
+
+    # countries and nationalities: fuzzy matching against the alias index
+    judge.similar_country("", "", SIMILARITY_THRESHOLD)  # load the index
+    for name, function in (("countries_fuzzy", lambda: [difflib_similar(a, b) for a, b in country_pairs]),
+                           ("countries_index", lambda: [judge.similar_country(a, b, SIMILARITY_THRESHOLD) for a, b in country_pairs])):
+        elapsed_ms = time_call(function, repeat=args.repeat)
+        results[name] = {"median_ms": round(elapsed_ms, 3), "us_per_pair": round(elapsed_ms * 1000 / max(len(country_pairs), 1), 2)}
+        print(f"  similarity {name}: {results[name]['us_per_pair']:.2f} us/pair")
+    results["countries_changed"] = sum(difflib_similar(a, b) != judge.similar_country(a, b, SIMILARITY_THRESHOLD) for a, b in country_pairs)
+    print(f"  similarity: {results['countries_changed']} of {len(country_pairs)} country pairs decided differently by the index")
+    return results
+
+
+# name -> function(folders, args) -> metrics
+SUITES = {
+    "processors": bench_processors,
+    "process_documents": bench_process_documents,
+    "docx_parse": bench_docx_parse,
+    "docx_labels": bench_docx_labels,
+    "txt_rules": bench_txt_rules,
+    "llm_client": bench_llm_client,
+    "txt_hybrid": bench_txt_hybrid,
+    "judge": bench_judge,
+    "similarity": bench_similarity,
+    "ocr_modes": bench_ocr_modes,
+    "ocr_pool": bench_ocr_pool,
+    "preprocess": bench_preprocess,
+}
+
+
+def compare(current, baseline, tolerance: float, path="") -> list:
+    """Paths of median_ms metrics that got slower than baseline * (1 + tolerance)."""
+    regressions = []
+    if isinstance(current, dict) and isinstance(baseline, dict):
+        for key, value in current.items():
+            if key in baseline:
+                regressions.extend(compare(value, baseline[key], tolerance, f"{path}/{key}"))
+    elif path.endswith("/median_ms") and isinstance(current, (int, float)) and isinstance(baseline, (int, float)) and baseline > 0:
+        if current > baseline * (1 + tolerance):
+            regressions.append((path, baseline, current))
+    return regressions
+
+
+def run(args) -> dict:
+    results = {"sizes": {}}
+    with tempfile.TemporaryDirectory() as corpus_root:
+        for size in args.sizes:
+            corpus = args.corpus or os.path.join(corpus_root, f"corpus_{size}")
+            if args.corpus:
+                folders = sorted(folder.path for folder in os.scandir(corpus) if folder.is_dir())[:size]
+            else:
+                folders = generate_corpus(corpus, size, seed=args.seed)
+            print(f"corpus of {len(folders)} clients")
+            results["sizes"][str(size)] = {
+                name: suite(folders, args) for name, suite in SUITES.items() if name in args.suites
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the document processors on synthetic clients")
+    parser.add_argument("--sizes", default="10,50", help="comma separated corpus sizes (clients)")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"comma separated, from: {', '.join(SUITES)}")
+    parser.add_argument("--processors", default="pdf,docx,png,txt", help="comma separated, from: pdf, docx, png, txt")
+    parser.add_argument("--txt-processor", default="robo_clerk.doc_processors.text_extractor:TXTProcessor",
+                        help="processor for descriptions; the regex one by default so no network is needed")
+    parser.add_argument("--corpus", default=None, help="use existing client folders instead of generating them")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ocr-workers", type=int, default=None, help="workers of the OCR pool suite, one per CPU by default")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="requests in flight in the LLM client suite")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per completion of the stub in the LLM client suite")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per document, the fastest one counts")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=None, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.suites = args.suites.split(",")
+    args.processors = args.processors.split(",")
+
+    doc_master.register_document_processor(FileType.TXT, args.txt_processor)
+    results = run(args)
+
+    if args.output:
+        write_json_atomic(args.output, results)
+    if args.baseline and args.save_baseline:
+        write_json_atomic(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for path, before, after in regressions:
+            print(f"REGRESSION {path}: {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            return 1
+        print("no regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
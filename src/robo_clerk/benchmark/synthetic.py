@@ -0,0 +1,459 @@
+"""
+Synthetic client bundles for benchmarks.
+
+Usage from project root:
+    poetry run python3 -m robo_clerk.benchmark.synthetic <output_folder> [clients] [seed]
+
+Every client gets a folder client_<id> with the four documents the game hands
+out: account.pdf (AcroForm fields, optional signature image), profile.docx
+(label/value and ☒/☐ tables), passport.png (the 1200x900 box layout
+png.process_passport_image crops, plus a TD3 machine readable zone) and
+description.txt. Like the real corpus, clients whose id % 1000 is above 500
+carry one inconsistency between documents and should be rejected.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+import io
+import math
+import os
+import random
+import sys
+import zlib
+
+from robo_clerk.doc_processors.mrz import mrz_check_digit
+
+COUNTRIES = [
+    {"name": "Austria", "demonym": "Austrian", "native": "OSTERREICH", "code": "AUT", "phone": "+43", "cities": ["Vienna", "Graz", "Linz", "Salzburg"], "streets": ["Hauptstrasse", "Ringstrasse", "Mariahilfer Strasse"]},
+    {"name": "Germany", "demonym": "German", "native": "DEUTSCHLAND", "code": "D", "phone": "+49", "cities": ["Berlin", "Munich", "Hamburg", "Cologne"], "streets": ["Bahnhofstrasse", "Schillerstrasse", "Goethestrasse"]},
+    {"name": "Switzerland", "demonym": "Swiss", "native": "SCHWEIZ", "code": "CHE", "phone": "+41", "cities": ["Zurich", "Geneva", "Basel", "Bern"], "streets": ["Limmatquai", "Rue du Rhone", "Marktgasse"]},
+    {"name": "France", "demonym": "French", "native": "FRANCE", "code": "FRA", "phone": "+33", "cities": ["Paris", "Lyon", "Marseille", "Nice"], "streets": ["Rue de Rivoli", "Avenue Foch", "Rue Victor Hugo"]},
+    {"name": "Italy", "demonym": "Italian", "native": "ITALIA", "code": "ITA", "phone": "+39", "cities": ["Rome", "Milan", "Turin", "Florence"], "streets": ["Via Roma", "Via Garibaldi", "Corso Italia"]},
+    {"name": "Finland", "demonym": "Finnish", "native": "SUOMI", "code": "FIN", "phone": "+358", "cities": ["Helsinki", "Oulu", "Tampere", "Turku"], "streets": ["Pyynikintie", "Mannerheimintie", "Hameenkatu"]},
+    {"name": "Belgium", "demonym": "Belgian", "native": "BELGIQUE", "code": "BEL", "phone": "+32", "cities": ["Brussels", "Namur", "Ghent", "Antwerp"], "streets": ["Rue de la Loi", "Avenue Louise", "Meir"]},
+    {"name": "Spain", "demonym": "Spanish", "native": "ESPANA", "code": "ESP", "phone": "+34", "cities": ["Madrid", "Barcelona", "Valencia", "Seville"], "streets": ["Gran Via", "Calle Mayor", "Paseo de Gracia"]},
+]
+
+FIRST_NAMES = {
+    "M": ["Lukas", "Jonas", "Simon", "Marco", "Joona", "Pierre", "Javier", "Felix", "Matteo", "Louis"],
+    "F": ["Anna", "Laura", "Sofia", "Emma", "Aino", "Claire", "Lucia", "Julia", "Giulia", "Marie"],
+}
+MIDDLE_NAMES = ["Maria", "Samuel", "Onni", "Elena", "Paul", "Theresa", "", "", ""]
+LAST_NAMES = ["Gruber", "Muller", "Sanders", "Rossi", "Niskanen", "Dubois", "Garcia", "Peeters", "Huber", "Weber", "Bianchi", "Virtanen"]
+OCCUPATIONS = ["Engineer", "Teacher", "Architect", "Doctor", "Lawyer", "Consultant", "Pharmacist", "Journalist"]
+COMPANIES = ["Siemens AG", "Nestle", "Roche", "Allianz", "Nokia", "Credit Agricole", "Telefonica", "Enel"]
+SCHOOLS = ["Gymnasium Neustadt", "Lycee Saint Louis", "Liceo Classico", "Helsingin Normaalilyseo"]
+UNIVERSITIES = ["University of Vienna", "ETH Zurich", "Sorbonne University", "University of Helsinki", "Bocconi University"]
+CURRENCIES = ["EUR", "CHF", "USD"]
+MARITAL_STATUSES = ["single", "married", "divorced", "widowed"]
+
+@dataclass
+class SyntheticClient:
+    client_id: int
+    sex: str
+    first_name: str
+    middle_name: str
+    last_name: str
+    birth_date: date
+    country: dict
+    city: str
+    street: str
+    building_number: str
+    postal_code: str
+    email: str
+    phone: str
+    passport_number: str
+    issue_date: date
+    expiry_date: date
+    marital_status: str
+    occupation: str
+    company: str
+    currency: str
+    salary: int
+    savings: int
+    signature: bool
+    politically_exposed: bool = False
+
+    @property
+    def given_names(self) -> str:
+        return f"{self.first_name} {self.middle_name}".strip()
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.given_names} {self.last_name}"
+
+    @property
+    def age(self) -> int:
+        return 2025 - self.birth_date.year
+
+
+def random_date(rng: random.Random, start: date, end: date) -> date:
+    return start + timedelta(days=rng.randrange((end - start).days))
+
+
+def make_client(rng: random.Random, client_id: int) -> SyntheticClient:
+    sex = rng.choice("MF")
+    country = rng.choice(COUNTRIES)
+    first_name = rng.choice(FIRST_NAMES[sex])
+    last_name = rng.choice(LAST_NAMES)
+    issue_date = random_date(rng, date(2016, 1, 1), date(2024, 12, 31))
+    return SyntheticClient(
+        client_id=client_id,
+        sex=sex,
+        first_name=first_name,
+        middle_name=rng.choice(MIDDLE_NAMES),
+        last_name=last_name,
+        birth_date=random_date(rng, date(1945, 1, 1), date(2002, 12, 31)),
+        country=country,
+        city=rng.choice(country["cities"]),
+        street=rng.choice(country["streets"]),
+        building_number=str(rng.randint(1, 120)),
+        postal_code=str(rng.randint(1000, 99999)),
+        email=f"{first_name.lower()}.{last_name.lower()}@{rng.choice(['gmail.com', 'outlook.com', 'proton.me'])}",
+        phone=f"{country['phone']} {rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+        passport_number=f"{rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}{rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}{rng.randint(0, 9999999):07d}",
+        issue_date=issue_date,
+        expiry_date=issue_date.replace(year=issue_date.year + 10) - timedelta(days=1),
+        marital_status=rng.choice(MARITAL_STATUSES),
+        occupation=rng.choice(OCCUPATIONS),
+        company=rng.choice(COMPANIES),
+        currency=rng.choice(CURRENCIES),
+        salary=rng.randrange(40000, 400000, 1000),
+        savings=rng.randrange(10000, 2000000, 5000),
+        signature=rng.random() > 0.1,
+    )
+
+
+def inject_inconsistency(rng: random.Random, client: SyntheticClient) -> dict:
+    """Values the profile states differently from the other documents."""
+    kind = rng.choice(["email", "birth_date", "expiry_date", "country", "last_name"])
+    if kind == "email":
+        return {"email": f"{client.last_name.lower()}{rng.randint(10, 99)}@example.org"}
+    if kind == "birth_date":
+        return {"birth_date": client.birth_date + timedelta(days=rng.randint(1, 400))}
+    if kind == "expiry_date":
+        return {"expiry_date": client.expiry_date + timedelta(days=rng.randint(30, 700))}
+    if kind == "country":
+        return {"country": rng.choice([country for country in COUNTRIES if country is not client.country])}
+    return {"last_name": rng.choice([name for name in LAST_NAMES if name != client.last_name])}
+
+
+# ---------------------------------------------------------------- account.pdf
+
+def _pdf_string(value: str) -> bytes:
+    try:
+        raw = value.encode("ascii")
+    except UnicodeEncodeError:
+        return b"<FEFF" + value.encode("utf-16-be").hex().upper().encode() + b">"
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _signature_image(width=160, height=50) -> bytes:
+    pixels = bytearray(b"\xff" * width * height)
+    for x in range(8, width - 8):
+        y = int(height / 2 + math.sin(x / 9.0) * height / 4 + math.sin(x / 3.7) * 3)
+        for dy in (-1, 0, 1):
+            pixels[(y + dy) * width + x] = 0
+    return bytes(pixels)
+
+
+def account_fields(client: SyntheticClient) -> dict:
+    return {
+        "account_name": client.full_name,
+        "account_holder_name": client.given_names,
+        "account_holder_surname": client.last_name,
+        "passport_number": client.passport_number,
+        "chf": "/Yes" if client.currency == "CHF" else "/Off",
+        "eur": "/Yes" if client.currency == "EUR" else "/Off",
+        "usd": "/Yes" if client.currency == "USD" else "/Off",
+        "other_ccy": "",
+        "building_number": client.building_number,
+        "street_name": client.street,
+        "postal_code": client.postal_code,
+        "city": client.city,
+        "country": client.country["name"],
+        "name": client.full_name,
+        "phone_number": client.phone,
+        "email": client.email,
+    }
+
+
+def build_account_pdf(client: SyntheticClient) -> bytes:
+    """A one page PDF with an AcroForm text/checkbox field per account value."""
+    fields = account_fields(client)
+    objects = {}
+    field_ids = []
+    next_id = 7
+    content = [b"BT /F1 16 Tf 50 790 Td (Account Opening Form) Tj ET"]
+    for index, (name, value) in enumerate(fields.items()):
+        y = 740 - index * 36
+        content.append(b"BT /F1 9 Tf 50 %d Td %s Tj ET" % (y + 4, _pdf_string(name.replace("_", " ").title())))
+        rect = b"[200 %d 540 %d]" % (y, y + 20)
+        if value.startswith("/"):
+            objects[next_id] = (
+                b"<< /Type /Annot /Subtype /Widget /FT /Btn /T %s /V %s /AS %s /Rect %s /P 3 0 R /F 4 >>"
+                % (_pdf_string(name), value.encode(), value.encode(), rect)
+            )
+        else:
+            objects[next_id] = (
+                b"<< /Type /Annot /Subtype /Widget /FT /Tx /T %s /V %s /Rect %s /P 3 0 R /F 4 >>"
+                % (_pdf_string(name), _pdf_string(value), rect)
+            )
+        field_ids.append(next_id)
+        next_id += 1
+
+    xobjects = b""
+    if client.signature:
+        content.append(b"q 160 0 0 50 380 60 cm /Im1 Do Q")
+        image = zlib.compress(_signature_image())
+        objects[6] = (
+            b"<< /Type /XObject /Subtype /Image /Width 160 /Height 50 /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(image)
+            + image + b"\nendstream"
+        )
+        xobjects = b" /XObject << /Im1 6 0 R >>"
+
+    refs = b" ".join(b"%d 0 R" % field_id for field_id in field_ids)
+    stream = b"\n".join(content)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [%s] /NeedAppearances true >> >>" % refs
+    objects[2] = b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>"
+    objects[3] = (
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >>%s >> "
+        b"/Contents 5 0 R /Annots [%s] >>" % (xobjects, refs)
+    )
+    objects[4] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    objects[5] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    size = max(objects) + 1
+    offsets = [0] * size
+    for object_id in range(1, size):
+        if object_id not in objects:
+            objects[object_id] = b"null"
+        offsets[object_id] = output.tell()
+        output.write(b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for object_id in range(1, size):
+        output.write(b"%010d 00000 n \n" % offsets[object_id])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+    return output.getvalue()
+
+
+# --------------------------------------------------------------- profile.docx
+
+def checkbox_cell(options, selected) -> str:
+    return "  ".join(f"{'☒' if option == selected else '☐'} {option}" for option in options)
+
+
+def build_profile_docx(client: SyntheticClient, overrides: dict) -> bytes:
+    from docx import Document
+
+    birth_date = overrides.get("birth_date", client.birth_date)
+    expiry_date = overrides.get("expiry_date", client.expiry_date)
+    country = overrides.get("country", client.country)
+    document = Document()
+    document.add_heading("Client Profile", level=1)
+
+    personal = document.add_table(rows=0, cols=2)
+    rows = [
+        ("Last Name", overrides.get("last_name", client.last_name)),
+        ("First/ Middle Name (s)", client.given_names),
+        ("Address", f"{client.street} {client.building_number}, {client.postal_code} {client.city}"),
+        ("Country of Domicile", country["name"]),
+        ("Date of birth", birth_date.isoformat()),
+        ("Nationality", client.country["demonym"]),
+        ("Passport No/ Unique ID", client.passport_number),
+        ("ID Type", "passport"),
+        ("ID Issue Date", client.issue_date.isoformat()),
+        ("ID Expiry Date", expiry_date.isoformat()),
+        ("Gender", checkbox_cell(["Female", "Male"], "Female" if client.sex == "F" else "Male")),
+    ]
+    for label, value in rows:
+        cells = personal.add_row().cells
+        cells[0].text = label
+        cells[1].text = value
+
+    contact = document.add_table(rows=0, cols=2)
+    for label, value in [("Telephone", client.phone), ("E-Mail", overrides.get("email", client.email))]:
+        cells = contact.add_row().cells
+        cells[0].text = label
+        cells[1].text = value
+
+    questions = document.add_table(rows=0, cols=2)
+    pep = "Yes" if client.politically_exposed else "No"
+    for label, value in [
+        ("Is the client or associated person a politically exposed person as defined in the client acceptance policy?", checkbox_cell(["Yes", "No"], pep)),
+        ("Marital Status", checkbox_cell([status.title() for status in MARITAL_STATUSES], client.marital_status.title())),
+        ("Current employment and function", checkbox_cell(["Employee", "Self-Employed", "Retired"], "Employee")),
+        ("Commercial Account", checkbox_cell(["Yes", "No"], "No")),
+        ("Investment Risk Profile", checkbox_cell(["Low", "Moderate", "High"], "Low")),
+        ("Type of Mandate", checkbox_cell(["Advisory", "Discretionary"], "Advisory")),
+        ("Investment Experience", checkbox_cell(["Inexperienced", "Experienced", "Expert"], "Experienced")),
+        ("Investment Horizon", checkbox_cell(["Short", "Medium", "Long-Term"], "Short")),
+    ]:
+        cells = questions.add_row().cells
+        cells[0].text = label
+        cells[1].text = value
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+# --------------------------------------------------------------- passport.png
+
+PASSPORT_SIZE = (1200, 900)
+# Where png.process_passport_image expects each value, in the 1200x900 layout
+PASSPORT_BOXES = {
+    "country": (50, 0, 1200, 120),
+    "surname": (50, 300, 300, 380),
+    "given_name": (300, 300, 900, 380),
+    "birth_date": (50, 420, 300, 480),
+    "citizenship": (300, 420, 900, 480),
+    "sex": (50, 540, 300, 600),
+    "issue_date": (300, 540, 900, 600),
+    "expiry_date": (300, 630, 800, 700),
+    "passport_number": (700, 160, 1100, 200),
+}
+MRZ_BAND = (0, 730, 1200, 900)
+
+
+def mrz_name(value: str) -> str:
+    return "".join(char if char.isalpha() else "<" for char in value.upper())
+
+
+def build_mrz(client: SyntheticClient) -> tuple:
+    """The two 44 character lines of a TD3 (passport) machine readable zone."""
+    code = client.country["code"].ljust(3, "<")
+    names = f"{mrz_name(client.last_name)}<<{mrz_name(client.given_names)}"
+    line1 = f"P<{code}{names}"[:44].ljust(44, "<")
+    number = client.passport_number.ljust(9, "<")
+    birth = client.birth_date.strftime("%y%m%d")
+    expiry = client.expiry_date.strftime("%y%m%d")
+    personal = "<" * 14
+    line2 = (
+        number + mrz_check_digit(number) + code + birth + mrz_check_digit(birth) + client.sex
+        + expiry + mrz_check_digit(expiry) + personal + mrz_check_digit(personal)
+    )
+    composite = line2[0:10] + line2[13:20] + line2[21:43]
+    return line1, line2 + mrz_check_digit(composite)
+
+
+def passport_values(client: SyntheticClient) -> dict:
+    return {
+        "country": f"PASSPORT  {client.country['name'].upper()} / {client.country['native']}",
+        "surname": client.last_name.upper(),
+        "given_name": client.given_names.upper(),
+        "birth_date": client.birth_date.strftime("%d-%b-%Y"),
+        "citizenship": f"{client.country['demonym']}/{client.country['native']}",
+        "sex": client.sex,
+        "issue_date": client.issue_date.strftime("%d-%b-%Y"),
+        "expiry_date": client.expiry_date.strftime("%d-%b-%Y"),
+        "passport_number": client.passport_number,
+    }
+
+
+def build_passport_png(client: SyntheticClient) -> bytes:
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", PASSPORT_SIZE, (236, 232, 220))
+    draw = ImageDraw.Draw(image)
+    value_font = ImageFont.load_default(size=30)
+    label_font = ImageFont.load_default(size=14)
+    mrz_font = ImageFont.load_default(size=30)
+
+    labels = {
+        "surname": "Surname", "given_name": "Given names", "birth_date": "Date of birth",
+        "citizenship": "Nationality", "sex": "Sex", "issue_date": "Date of issue",
+        "expiry_date": "Date of expiry", "passport_number": "Passport No.",
+    }
+    for key, value in passport_values(client).items():
+        left, top, right, bottom = PASSPORT_BOXES[key]
+        if key in labels:
+            # labels sit just above their box so crops only see the value
+            draw.text((left, top - 18), labels[key], fill=(90, 90, 90), font=label_font)
+        draw.text((left + 4, top + 8), value, fill=(10, 10, 10), font=value_font)
+
+    # monospaced MRZ: one fixed advance per character
+    for row, line in enumerate(build_mrz(client)):
+        for index, char in enumerate(line):
+            draw.text((40 + index * 25.5, MRZ_BAND[1] + 30 + row * 60), char, fill=(0, 0, 0), font=mrz_font)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+# ------------------------------------------------------------ description.txt
+
+def build_description(rng: random.Random, client: SyntheticClient) -> str:
+    pronoun = "his" if client.sex == "M" else "her"
+    start_year = rng.randint(1975, 2010)
+    end_year = min(2024, start_year + rng.randint(3, 15))
+    graduation = client.birth_date.year + 18
+    sentences = [
+        f"{client.full_name} is {client.age} years old and comes from {client.country['name']}.",
+        rng.choice([
+            f"{client.first_name} is currently {client.marital_status}.",
+            f"{client.first_name} has been {client.marital_status} for several years.",
+        ]),
+        f"{client.first_name} received {pronoun} secondary school diploma from {rng.choice(SCHOOLS)} in {graduation}.",
+        f"{client.first_name} earned {pronoun} degree from {rng.choice(UNIVERSITIES)} in {graduation + 5}.",
+        f"{client.first_name} worked as a {client.occupation} at {client.company} from {start_year} to {end_year}.",
+        f"In that role {client.first_name} earned {client.salary} {client.currency} p.A.",
+        f"Over the years {client.first_name} saved {client.savings} {client.currency}.",
+    ]
+    if rng.random() > 0.4:
+        sentences.append(
+            f"{client.first_name} owns a flat located in {client.city}, which is worth {rng.randrange(200000, 3000000, 10000)} {client.currency}."
+        )
+    if rng.random() > 0.5:
+        sentences.append(
+            f"{client.first_name} received an inheritance of {rng.randrange(50000, 900000, 1000)} {client.currency} from {pronoun} late father, a renowned doctor, in {rng.randint(2000, 2023)}."
+        )
+    else:
+        sentences.append(f"{client.first_name} does not have any inheritances.")
+    sentences.append(f"The RM met {client.first_name} at a conference in {client.city}.")
+    return " ".join(sentences) + "\n"
+
+
+# --------------------------------------------------------------------- corpus
+
+def is_rejected(client_id: int) -> bool:
+    # mirrors robo_processor.get_result, which the evaluation scripts score against
+    return client_id % 1000 > 500
+
+
+def write_client(rng: random.Random, client_id: int, output_folder: str) -> str:
+    client = make_client(rng, client_id)
+    overrides = inject_inconsistency(rng, client) if is_rejected(client_id) else {}
+    folder = os.path.join(output_folder, f"client_{client_id}")
+    os.makedirs(folder, exist_ok=True)
+    documents = {
+        "account.pdf": build_account_pdf(client),
+        "profile.docx": build_profile_docx(client, overrides),
+        "passport.png": build_passport_png(client),
+        "description.txt": build_description(rng, client).encode("utf-8"),
+    }
+    for file_name, content in documents.items():
+        with open(os.path.join(folder, file_name), "wb") as document:
+            document.write(content)
+    return folder
+
+
+def generate_corpus(output_folder: str, clients: int, seed: int = 0, first_id: int = 1) -> list:
+    """Write `clients` bundles; the same seed always gives the same corpus."""
+    rng = random.Random(seed)
+    return [write_client(rng, client_id, output_folder) for client_id in range(first_id, first_id + clients)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m robo_clerk.benchmark.synthetic <output_folder> [clients] [seed]")
+        sys.exit(1)
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    folders = generate_corpus(sys.argv[1], count, seed)
+    print(f"wrote {len(folders)} client folders to {sys.argv[1]}")
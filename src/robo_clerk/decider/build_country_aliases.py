@@ -0,0 +1,152 @@
+"""
+Builds country_aliases.json: every ISO 3166-1 country with its English,
+German, French and Italian names from the iso-codes project, its alpha-2
+and alpha-3 codes, and the demonyms, native names and other codes of
+EXTRA_ALIASES. Codes (up to three capital letters, dots allowed) are kept
+apart from names, CountryIndex only matches them against a whole value.
+
+Usage (needs the iso-codes package, installed under /usr on Debian):
+    python -m robo_clerk.decider.build_country_aliases [prefix]
+"""
+
+import gettext
+import json
+import os
+import sys
+
+from robo_clerk.decider.countries import COUNTRY_ALIASES_FILE
+
+LANGUAGES = ("de", "fr", "it")
+NAME_KEYS = ("name", "common_name", "official_name")
+
+# What iso-codes does not know: demonyms, names in the country's own language, codes in common use
+EXTRA_ALIASES = {
+    "AUT": "Austria|Austrian|Österreich|Österreichisch|Republik Österreich|AT|AUT",
+    "DEU": "Germany|German|Deutschland|Deutsch|Deutsche|Bundesrepublik Deutschland|Federal Republic of Germany|DE|DEU|D",
+    "CHE": "Switzerland|Swiss|Schweiz|Schweizer|Schweizerisch|Suisse|Svizzera|Svizzero|Svizra|Helvetia|Confoederatio Helvetica|Swiss Confederation|CH|CHE",
+    "FRA": "France|French|Français|Française|République française|FR|FRA",
+    "ITA": "Italy|Italian|Italia|Italiano|Italiana|Repubblica Italiana|IT|ITA",
+    "ESP": "Spain|Spanish|España|Español|Española|Reino de España|ES|ESP",
+    "PRT": "Portugal|Portuguese|Português|Portuguesa|PT|PRT",
+    "NLD": "Netherlands|The Netherlands|Holland|Dutch|Nederland|Nederlands|Nederlandse|Kingdom of the Netherlands|NL|NLD",
+    "BEL": "Belgium|Belgian|Belgique|België|Belgien|Belge|Belgisch|BE|BEL",
+    "LUX": "Luxembourg|Luxembourgish|Luxembourger|Lëtzebuerg|Luxemburg|LU|LUX",
+    "LIE": "Liechtenstein|Liechtensteiner|LI|LIE",
+    "MCO": "Monaco|Monégasque|Monacan|MC|MCO",
+    "GBR": "United Kingdom|United Kingdom of Great Britain and Northern Ireland|Great Britain|Britain|British|England|English|Scotland|Scottish|Wales|Welsh|Northern Ireland|UK|U.K.|GB|GBR",
+    "IRL": "Ireland|Irish|Éire|Republic of Ireland|IE|IRL",
+    "DNK": "Denmark|Danish|Danmark|Dansk|Dane|DK|DNK",
+    "SWE": "Sweden|Swedish|Sverige|Svensk|Swede|SE|SWE",
+    "NOR": "Norway|Norwegian|Norge|Noreg|Norsk|NO|NOR",
+    "FIN": "Finland|Finnish|Suomi|Suomen|Suomalainen|Finn|FI|FIN",
+    "ISL": "Iceland|Icelandic|Icelander|Ísland|IS|ISL",
+    "POL": "Poland|Polish|Polska|Polski|Polskie|Pole|PL|POL",
+    "CZE": "Czech Republic|Czechia|Czech|Česko|Česká republika|Český|Česká|CZ|CZE",
+    "SVK": "Slovakia|Slovak|Slovensko|Slovenská republika|Slovenský|SK|SVK",
+    "HUN": "Hungary|Hungarian|Magyarország|Magyar|HU|HUN",
+    "SVN": "Slovenia|Slovenian|Slovene|Slovenija|SI|SVN",
+    "HRV": "Croatia|Croatian|Croat|Hrvatska|HR|HRV",
+    "SRB": "Serbia|Serbian|Srbija|Србија|RS|SRB",
+    "BIH": "Bosnia and Herzegovina|Bosnia|Bosnian|Bosna i Hercegovina|BA|BIH",
+    "MNE": "Montenegro|Montenegrin|Crna Gora|ME|MNE",
+    "MKD": "North Macedonia|Macedonia|Macedonian|Severna Makedonija|MK|MKD",
+    "ALB": "Albania|Albanian|Shqipëria|Shqipëri|AL|ALB",
+    "GRC": "Greece|Greek|Hellas|Hellenic Republic|Ελλάδα|Ellada|GR|GRC",
+    "BGR": "Bulgaria|Bulgarian|България|Balgariya|BG|BGR",
+    "ROU": "Romania|Romanian|România|Român|Română|RO|ROU",
+    "MDA": "Moldova|Moldovan|Republic of Moldova|MD|MDA",
+    "UKR": "Ukraine|Ukrainian|Україна|Ukraina|UA|UKR",
+    "BLR": "Belarus|Belarusian|Беларусь|Byelorussia|BY|BLR",
+    "RUS": "Russia|Russian Federation|Russian|Россия|Rossiya|RU|RUS",
+    "EST": "Estonia|Estonian|Eesti|EE|EST",
+    "LVA": "Latvia|Latvian|Latvija|LV|LVA",
+    "LTU": "Lithuania|Lithuanian|Lietuva|LT|LTU",
+    "CYP": "Cyprus|Cypriot|Κύπρος|Kypros|Kıbrıs|CY|CYP",
+    "MLT": "Malta|Maltese|MT|MLT",
+    "AND": "Andorra|Andorran|AD",
+    "SMR": "San Marino|Sammarinese|SM|SMR",
+    "VAT": "Vatican City|Vatican|Holy See|VA|VAT",
+    "TUR": "Turkey|Türkiye|Turkish|Türk|TR|TUR",
+    "USA": "United States|United States of America|America|American|US|U.S.|USA|U.S.A.",
+    "CAN": "Canada|Canadian|CA|CAN",
+    "MEX": "Mexico|Mexican|México|Mexicano|Mexicana|MX|MEX",
+    "BRA": "Brazil|Brazilian|Brasil|Brasileiro|Brasileira|BR|BRA",
+    "ARG": "Argentina|Argentine|Argentinian|Argentino|Argentina|AR|ARG",
+    "CHL": "Chile|Chilean|Chileno|Chilena|CL|CHL",
+    "COL": "Colombia|Colombian|Colombiano|Colombiana|CO|COL",
+    "PER": "Peru|Peruvian|Perú|Peruano|Peruana|PE|PER",
+    "VEN": "Venezuela|Venezuelan|Venezolano|Venezolana|VE|VEN",
+    "URY": "Uruguay|Uruguayan|Uruguayo|Uruguaya|UY|URY",
+    "CHN": "China|Chinese|People's Republic of China|PRC|中国|Zhongguo|CN|CHN",
+    "JPN": "Japan|Japanese|日本|Nippon|Nihon|JP|JPN",
+    "KOR": "South Korea|Republic of Korea|Korea|Korean|South Korean|대한민국|KR|KOR",
+    "IND": "India|Indian|Bharat|भारत|IN|IND",
+    "PAK": "Pakistan|Pakistani|PK|PAK",
+    "IDN": "Indonesia|Indonesian|ID|IDN",
+    "THA": "Thailand|Thai|TH|THA",
+    "VNM": "Vietnam|Viet Nam|Vietnamese|VN|VNM",
+    "PHL": "Philippines|Philippine|Filipino|Filipina|Pilipinas|PH|PHL",
+    "SGP": "Singapore|Singaporean|SG|SGP",
+    "MYS": "Malaysia|Malaysian|MY|MYS",
+    "HKG": "Hong Kong|Hongkonger|HK|HKG",
+    "TWN": "Taiwan|Taiwanese|TW|TWN",
+    "ISR": "Israel|Israeli|IL|ISR",
+    "SAU": "Saudi Arabia|Saudi|Saudi Arabian|SA|SAU",
+    "ARE": "United Arab Emirates|UAE|Emirati|AE|ARE",
+    "QAT": "Qatar|Qatari|QA|QAT",
+    "EGY": "Egypt|Egyptian|مصر|Misr|EG|EGY",
+    "MAR": "Morocco|Moroccan|Maroc|Marocain|MA|MAR",
+    "TUN": "Tunisia|Tunisian|Tunisie|TN|TUN",
+    "DZA": "Algeria|Algerian|Algérie|DZ|DZA",
+    "ZAF": "South Africa|South African|ZA|ZAF",
+    "NGA": "Nigeria|Nigerian|NG|NGA",
+    "KEN": "Kenya|Kenyan|KE|KEN",
+    "AUS": "Australia|Australian|AU|AUS",
+    "NZL": "New Zealand|New Zealander|Aotearoa|NZ|NZL",
+    "IRN": "Iran|Iranian|Persia|Persian|IR|IRN",
+    "IRQ": "Iraq|Iraqi|IQ|IRQ",
+    "LBN": "Lebanon|Lebanese|Liban|LB|LBN",
+    "GEO": "Georgia|Georgian|Sakartvelo|GE|GEO",
+    "ARM": "Armenia|Armenian|Hayastan|AM|ARM",
+    "AZE": "Azerbaijan|Azerbaijani|Azeri|AZ|AZE",
+    "KAZ": "Kazakhstan|Kazakh|Kazakhstani|KZ|KAZ",
+}
+
+def is_code(alias: str) -> bool:
+    letters = alias.replace(".", "")
+    return letters.isascii() and letters.isalpha() and letters.isupper() and len(letters) <= 3
+
+
+def unique(values) -> list:
+    return list(dict.fromkeys(values))
+
+
+def build(prefix="/usr") -> dict:
+    with open(os.path.join(prefix, "share", "iso-codes", "json", "iso_3166-1.json"), encoding="utf-8") as iso_file:
+        countries = json.load(iso_file)["3166-1"]
+    translations = [
+        gettext.translation("iso_3166-1", os.path.join(prefix, "share", "locale"), [language], fallback=True)
+        for language in LANGUAGES
+    ]
+    aliases = {}
+    for country in countries:
+        english = [country[key] for key in NAME_KEYS if key in country]
+        extra = EXTRA_ALIASES.get(country["alpha_3"], "").split("|")
+        names = english + [translation.gettext(name) for translation in translations for name in english]
+        aliases[country["alpha_3"]] = {
+            "names": unique(names + [alias for alias in extra if alias and not is_code(alias)]),
+            "codes": unique([country["alpha_2"], country["alpha_3"]] + [alias for alias in extra if is_code(alias)]),
+        }
+    return aliases
+
+
+def main():
+    aliases = build(*sys.argv[1:2])
+    lines = [f"  {json.dumps(code)}: {json.dumps(entry, ensure_ascii=False)}" for code, entry in aliases.items()]
+    with open(COUNTRY_ALIASES_FILE, "w", encoding="utf-8") as aliases_file:
+        aliases_file.write("{\n" + ",\n".join(lines) + "\n}\n")
+    print(f"{len(aliases)} countries, {sum(len(entry['names']) + len(entry['codes']) for entry in aliases.values())} aliases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Archived clients as columns, judged one rule at a time.
+
+ClientTable keeps one NumPy object array per flattened feature key
+(email_account.pdf, birth_date_passport.png, ...) and a mask of the clients
+that have it. judge_table runs a Judge's rules over those columns: every
+distinct value of a column is normalized and validated once, each pair of
+keys of a match group is compared over all clients at once (countries by
+their code, the rest through similar_many), and the verdicts come back as
+boolean matrices with one column per rule, next to the decision array.
+
+Client by client, the decisions are the ones Judge.decide makes.
+"""
+
+from dataclasses import dataclass
+import json
+
+import numpy as np
+
+from robo_clerk.decider.judge import POLITICALLY_EXPOSED, Decision, Judge
+from robo_clerk.decider.similarity import similar_many
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import list_files_in_folder
+from robo_clerk.utils.jsonl_sink import JSONLFeatureReader
+
+
+def client_id_from_file(file_name) -> int:
+    return int(file_name.split("_")[-1].split(".")[0])
+
+
+def read_archive(archive):
+    """Yield (client_id, features) from a folder of client JSON files or a JSONL feature sink."""
+    if archive.endswith(".jsonl"):
+        for record in JSONLFeatureReader(archive):
+            yield int(record["client_id"]), record["features"]
+        return
+    for file_name in list_files_in_folder(archive):
+        with open(file_name) as json_file:
+            yield client_id_from_file(file_name), json.load(json_file)
+
+
+def object_array(values, count=None) -> np.ndarray:
+    # fromiter, so lists among the values stay single elements
+    return np.fromiter(values, dtype=object, count=len(values) if count is None else count)
+
+
+def truth(values) -> np.ndarray:
+    return np.fromiter(map(bool, values), dtype=bool, count=len(values))
+
+
+def map_distinct(function, values: np.ndarray) -> np.ndarray:
+    """function of every value, called once per distinct value."""
+    distinct = {value: index for index, value in enumerate(dict.fromkeys(values))}
+    inverse = np.fromiter(map(distinct.__getitem__, values), dtype=np.intp, count=len(values))
+    return object_array(map(function, distinct), count=len(distinct))[inverse]
+
+
+@dataclass
+class ClientTable:
+    client_ids: np.ndarray
+    # key -> the clients' values, None where a client lacks the key
+    columns: dict
+    # key -> which clients have the key
+    present: dict
+
+    @classmethod
+    def from_clients(cls, clients) -> "ClientTable":
+        """From (client_id, features) pairs."""
+        client_ids = []
+        rows_by_key = {}
+        for row, (client_id, features) in enumerate(clients):
+            client_ids.append(client_id)
+            for key, value in features.items():
+                rows, values = rows_by_key.setdefault(key, ([], []))
+                rows.append(row)
+                values.append(value)
+        count = len(client_ids)
+        columns = {}
+        present = {}
+        for key, (rows, values) in rows_by_key.items():
+            columns[key] = np.full(count, None, dtype=object)
+            columns[key][rows] = object_array(values)
+            present[key] = np.zeros(count, dtype=bool)
+            present[key][rows] = True
+        return cls(np.array(client_ids, dtype=np.int64), columns, present)
+
+    @classmethod
+    def from_archive(cls, archive) -> "ClientTable":
+        return cls.from_clients(read_archive(archive))
+
+    def __len__(self):
+        return len(self.client_ids)
+
+    def column(self, key) -> tuple:
+        """(values, present) of key, for every client."""
+        if key not in self.columns:
+            return np.full(len(self), None, dtype=object), np.zeros(len(self), dtype=bool)
+        return self.columns[key], self.present[key]
+
+    def row(self, index) -> dict:
+        """The features of one client, as they were loaded."""
+        return {key: values[index] for key, values in self.columns.items() if self.present[key][index]}
+
+
+@dataclass
+class TableVerdict:
+    table: ClientTable
+    # (group, base key, other key) of every consistency check, the columns of checked and consistent
+    comparisons: list
+    # clients x comparisons: the check applies to the client, it passed
+    checked: np.ndarray
+    consistent: np.ndarray
+    # (field, reason) of every validity rule, the columns of invalid
+    rules: list
+    invalid: np.ndarray
+    consistency_percentage: np.ndarray
+    reject: np.ndarray
+
+    @property
+    def decisions(self) -> np.ndarray:
+        return np.where(self.reject, Decision.Reject, Decision.Accept)
+
+    def result(self, index) -> dict:
+        """Judge.verify's result for one client."""
+        columns = self.table.columns
+        inconsistencies = [
+            (group, columns[base_key][index], columns[other_key][index])
+            for (group, base_key, other_key), checked, consistent in zip(self.comparisons, self.checked[index], self.consistent[index])
+            if checked and not consistent
+        ]
+        invalid_data = [
+            (field, columns[field][index], reason)
+            for (field, reason), invalid in zip(self.rules, self.invalid[index]) if invalid
+        ]
+        return {
+            "consistency_percentage": float(self.consistency_percentage[index]),
+            "potential_inconsistencies": inconsistencies,
+            "invalid_data": invalid_data,
+        }
+
+    def decision(self, index) -> tuple:
+        """Judge.decide's (decision, result) for one client."""
+        return (Decision.Reject if self.reject[index] else Decision.Accept), self.result(index)
+
+
+def normalize_column(table: ClientTable, key, normalize, rows=None) -> np.ndarray:
+    """normalize of key's value for the clients in rows (those that have key by default), None for the others."""
+    values, present = table.column(key)
+    if rows is None:
+        rows = present
+    normalized = np.full(len(table), None, dtype=object)
+    normalized[rows] = map_distinct(normalize, values[rows])
+    return normalized
+
+
+def compare_countries(judge: Judge, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """judge.similar_country for every pair: codes where both values name a country, the fuzzy check elsewhere."""
+    index = judge.country_index()
+    code_a = map_distinct(index.canonical, a)
+    code_b = map_distinct(index.canonical, b)
+    known = truth(code_a) & truth(code_b)
+    same = known & (code_a == code_b)
+    fuzzy = ~known
+    same[fuzzy] = similar_many(zip(a[fuzzy], b[fuzzy]), judge.threshold)
+    return same
+
+
+def stack(columns: list, count: int) -> np.ndarray:
+    if not columns:
+        return np.zeros((count, 0), dtype=bool)
+    return np.stack(columns, axis=1)
+
+
+def judge_table(table: ClientTable, judge: Judge = None) -> TableVerdict:
+    """Every client of table through judge's rules (a new Judge by default)."""
+    judge = judge or Judge()
+    count = len(table)
+    with tracing.span("judge.judge_table", clients=count):
+        normalized = {}
+        comparisons = []
+        checked_columns = []
+        consistent_columns = []
+        for group, keys, compare in judge.groups:
+            # like Judge.verify, only clients with two keys of the group or more have its values normalized
+            grouped = sum(table.column(key)[1].astype(np.intp) for key, _ in keys) > 1
+            for key, normalize in keys:
+                normalized[key] = normalize_column(table, key, normalize, table.column(key)[1] & grouped)
+            # the first key a client has is compared with each later one it has
+            earlier = np.zeros(count, dtype=bool)
+            for position, (base_key, _) in enumerate(keys):
+                base_present = table.column(base_key)[1]
+                for other_key, _ in keys[position + 1:]:
+                    checked = base_present & ~earlier & table.column(other_key)[1]
+                    a = normalized[base_key][checked]
+                    b = normalized[other_key][checked]
+                    passed = truth(a) & truth(b)
+                    if compare == judge.similar_country:
+                        passed[passed] = compare_countries(judge, a[passed], b[passed])
+                    else:
+                        passed[passed] = similar_many(zip(a[passed], b[passed]), judge.threshold)
+                    consistent = np.zeros(count, dtype=bool)
+                    consistent[checked] = passed
+                    comparisons.append((group, base_key, other_key))
+                    checked_columns.append(checked)
+                    consistent_columns.append(consistent)
+                earlier |= base_present
+
+        rules = []
+        invalid_columns = []
+        for field in judge.date_fields:
+            # normalized by the groups for some clients only; the memo makes the others cheap
+            dates = normalize_column(table, field, lambda value, field=field: judge.dates.normalize(value, field))
+            rules.append((field, "Invalid date format"))
+            invalid_columns.append(table.column(field)[1] & ~truth(dates))
+        for field, is_valid, reason in judge.format_checks:
+            rules.append((field, reason))
+            invalid_columns.append(table.column(field)[1] & ~truth(normalize_column(table, field, is_valid)))
+        values, present = table.column(POLITICALLY_EXPOSED)
+        rules.append((POLITICALLY_EXPOSED, "politically exposed"))
+        invalid_columns.append(present & (values != "no"))
+
+        checked = stack(checked_columns, count)
+        consistent = stack(consistent_columns, count)
+        invalid = stack(invalid_columns, count)
+        # rounded like Judge.verify, once per distinct (consistent, total) count
+        counts, inverse = np.unique(np.stack([consistent.sum(axis=1), checked.sum(axis=1)]), axis=1, return_inverse=True)
+        percentages = np.array([round((passed / total) * 100, 2) if total > 0 else 100.0 for passed, total in counts.T.tolist()])
+        consistency_percentage = percentages[inverse.reshape(-1)] if count else np.zeros(0)
+        reject = (consistency_percentage < judge.min_consistency) | invalid.any(axis=1)
+        return TableVerdict(table, comparisons, checked, consistent, rules, invalid, consistency_percentage, reject)
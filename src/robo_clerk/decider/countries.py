@@ -0,0 +1,96 @@
+"""
+Country names, demonyms, native names and ISO codes to one ISO 3166 alpha-3
+code, for comparing countries and nationalities across documents.
+
+The aliases ship in country_aliases.json (see build_country_aliases) and
+are folded (accents dropped, case folded, whitespace collapsed) into dicts
+when the index is first used, so canonicalizing a value is a dict lookup.
+Passport values such as "Austrian/OSTERREICH" or "Austrian'OSTERREICH" are
+looked up whole first, then part by part. Parts are only matched against
+names: a code ("D", "NO", "IS") counts when it is the whole value, never
+as a fragment of free text.
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+
+COUNTRY_ALIASES_FILE = os.path.join(os.path.dirname(__file__), "country_aliases.json")
+# what separates the demonym from the native name on passports
+PART_SEPARATORS = re.compile(r"[/'’|,;()]")
+WHITESPACE = re.compile(r"\s+")
+# values remembered before the memo starts over
+MEMO_SIZE = 65536
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def fold(text: str) -> str:
+    """Text without accents, case folded, single spaced."""
+    text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return WHITESPACE.sub(" ", text.casefold()).strip()
+
+
+def alias_index(aliases) -> dict:
+    """Folded alias -> alpha-3 code from (code, alias) pairs, without the aliases of two countries."""
+    index = {}
+    ambiguous = set()
+    for code, name in aliases:
+        alias = fold(name)
+        if alias in index and index[alias] != code:
+            ambiguous.add(alias)
+        index[alias] = code
+    # an alias of two countries says nothing
+    for alias in ambiguous:
+        del index[alias]
+    return index
+
+
+class CountryIndex:
+    def __init__(self, aliases: dict):
+        """aliases: alpha-3 code -> {"names": names and demonyms, "codes": ISO and other codes} of that country."""
+        self.names = alias_index((code, name) for code, entry in aliases.items() for name in entry["names"])
+        self.codes = alias_index((code, alias) for code, entry in aliases.items() for alias in entry["codes"])
+        self.memo = {}
+
+    @classmethod
+    def from_file(cls, path=COUNTRY_ALIASES_FILE) -> "CountryIndex":
+        with open(path, encoding="utf-8") as aliases_file:
+            return cls(json.load(aliases_file))
+
+    def canonical(self, value: str) -> str | None:
+        """The alpha-3 code value names, None when it names no known country or several."""
+        try:
+            return self.memo[value]
+        except KeyError:
+            pass
+        folded = fold(value)
+        codes = {self.names.get(folded), self.codes.get(folded)} - {None}
+        if not codes and PART_SEPARATORS.search(folded):
+            codes = {self.names.get(part.strip()) for part in PART_SEPARATORS.split(folded)} - {None}
+        code = codes.pop() if len(codes) == 1 else None
+        if len(self.memo) >= MEMO_SIZE:
+            self.memo.clear()
+        self.memo[value] = code
+        return code
+
+    def same_country(self, a: str, b: str) -> bool | None:
+        """Whether a and b name the same country, None unless both name one."""
+        code_a = self.canonical(a)
+        if code_a is None:
+            return None
+        code_b = self.canonical(b)
+        if code_b is None:
+            return None
+        return code_a == code_b
+
+
+def get_country_index() -> CountryIndex:
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = CountryIndex.from_file()
+        return _default_index
@@ -0,0 +1,127 @@
+"""
+Date normalization for the judge, to YYYY-MM-DD.
+
+The result is the one of the first DATE_FORMATS that parses the value.
+Trying them all in order costs a strptime call (and a ValueError) per miss,
+so DateNormalizer
+
+- reads canonical ISO (2020-03-05) and dd-Mon-yyyy (05-Mar-2020) values
+  with a hand-written tokenizer,
+- tries the format that last worked for the same field first,
+- remembers the result of every raw value it has seen.
+
+No two DATE_FORMATS parse the same text into different dates (their
+separators, or the width of the leading number, tell them apart), so the
+order formats are tried in does not change the result.
+"""
+
+from datetime import date, datetime
+import re
+import threading
+
+DATE_FORMATS = (
+    "%d-%b-%Y", "%d-%B-%Y", "%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y",
+    "%d %b %Y", "%d %B %Y", "%Y %b %d", "%Y %B %d"
+)
+# tried last, for month abbreviations the formats above cannot read
+TITLE_CASE_FORMAT = "%d-%b-%Y"
+
+MONTH_ABBREVIATIONS = {
+    month: number for number, month in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)
+}
+DIGITS = frozenset("0123456789")
+WHITESPACE = re.compile(r"\s+")
+# raw values remembered before the memo starts over
+MEMO_SIZE = 65536
+
+
+def iso_date(year: int, month: int, day: int) -> str | None:
+    """YYYY-MM-DD like strftime writes it, None for a day that does not exist."""
+    try:
+        value = date(year, month, day)
+    except ValueError:
+        return None
+    if year < 1000:
+        # strftime does not pad the year
+        return value.strftime("%Y-%m-%d")
+    return f"{year}-{month:02d}-{day:02d}"
+
+
+def parse_common(value: str) -> str | None:
+    """
+    Canonical ISO or dd-Mon-yyyy (any case) values, None for anything else;
+    these are read exactly as %Y-%m-%d and %d-%b-%Y would read them.
+    """
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        year, month, day = value[:4], value[5:7], value[8:]
+        if DIGITS.issuperset(year) and DIGITS.issuperset(month) and DIGITS.issuperset(day):
+            return iso_date(int(year), int(month), int(day))
+        return None
+    parts = value.split("-")
+    if len(parts) != 3:
+        return None
+    day, month, year = parts
+    if not (0 < len(day) <= 2 and len(year) == 4 and DIGITS.issuperset(day) and DIGITS.issuperset(year)):
+        return None
+    # %d reads "5" and "05", not "0" or "00"
+    if day == "0" * len(day):
+        return None
+    month_number = MONTH_ABBREVIATIONS.get(month.lower()) if len(month) == 3 and month.isascii() else None
+    if month_number is None:
+        return None
+    return iso_date(int(year), month_number, int(day))
+
+
+def strptime_date(value: str, date_format: str) -> str | None:
+    try:
+        return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+class DateNormalizer:
+    def __init__(self, formats=DATE_FORMATS, memo_size=MEMO_SIZE):
+        self.formats = tuple(formats)
+        self.memo_size = memo_size
+        self.memo = {}
+        # field -> the format that parsed its last value
+        self.learned = {}
+        self.lock = threading.Lock()
+
+    def normalize(self, value, field=None) -> str | None:
+        if not value:
+            return None
+        try:
+            return self.memo[value]
+        except (KeyError, TypeError):
+            pass
+        result = self.parse(value, field)
+        if isinstance(value, str):
+            with self.lock:
+                if len(self.memo) >= self.memo_size:
+                    self.memo.clear()
+                self.memo[value] = result
+        return result
+
+    def parse(self, value: str, field=None) -> str | None:
+        value = value.strip()
+        result = parse_common(value)
+        if result is not None:
+            return result
+        value = WHITESPACE.sub(" ", value)  # normalize whitespace
+        learned = self.learned.get(field)
+        if learned is not None:
+            result = strptime_date(value, learned)
+            if result is not None:
+                return result
+        for date_format in self.formats:
+            if date_format is learned:
+                continue
+            result = strptime_date(value, date_format)
+            if result is not None:
+                if field is not None:
+                    self.learned[field] = date_format
+                return result
+        # try to manually fix common lowercase month issues
+        return strptime_date(value.title(), TITLE_CASE_FORMAT)
@@ -1,10 +1,12 @@
 from enum import Enum
 import json
 import re
-from datetime import datetime
-from difflib import SequenceMatcher
 import unicodedata
-from nltk.corpus import wordnet as wn
+
+from robo_clerk.decider.countries import get_country_index
+from robo_clerk.decider.dates import DateNormalizer
+from robo_clerk.decider.similarity import SIMILARITY_THRESHOLD, is_similar
+from robo_clerk.utils import tracing
 
 class Decision(Enum):
     Accept="Accept"
@@ -16,143 +18,220 @@ def manual_decision():
     return Decision(decision)
 
 
-def verify_personal_data_consistency(data):
-    inconsistencies = []
-    invalid_data = []
-
-    def similar(a, b):
-        if a in b or b in a:
-            return 1.00
-        
-        # check for all synonyms
-        max_ratio = 0
-        
-        return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
-
-
-    def normalize_name(name):
-        name = name.strip().lower()
-        name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode()
-        return name
-
-    def normalize_date(value):
-        if not value:
-            return None
-        value = value.strip()
-        value = re.sub(r'\s+', ' ', value)  # normalize whitespace
-        formats = [
-            "%d-%b-%Y", "%d-%B-%Y", "%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y",
-            "%d %b %Y", "%d %B %Y", "%Y %b %d", "%Y %B %d"
+# Pairs or groups of keys we expect to be consistent
+MATCHES = [
+    # ("passport_number_account.pdf", "passport_number_passport.png", "passport_no_profile.docx"),
+    ("name_account.pdf", "account_name_account.pdf"),
+    ("account_holder_name_account.pdf", "first_name_profile.docx"),
+    ("account_holder_surname_account.pdf", "last_name_profile.docx"),
+    ("email_account.pdf", "email_profile.docx"),
+    # ("phone_number_account.pdf", "telephone_profile.docx"),
+    ("birth_date_passport.png", "date_of_birth_profile.docx"),
+    ("issue_date_passport.png", "id_issue_date_profile.docx"),
+    ("expiry_date_passport.png", "id_expiry_date_profile.docx"),
+    ("country_account.pdf", "country_of_domicile_profile.docx"),
+    ("citizenship_passport.png", "nationality_profile.docx"),
+    # ("country_account.pdf", "country_passport.png"),
+    ("postal_code_account.pdf", "address_profile.docx"),
+    # ("city_account.pdf", "address_profile.docx"),
+    ("building_number_account.pdf", "address_profile.docx"),
+]
+
+# Validate known formats
+DATE_FIELDS = [
+    "birth_date_passport.png",
+    "date_of_birth_profile.docx",
+    "issue_date_passport.png",
+    "expiry_date_passport.png",
+    "id_issue_date_profile.docx",
+    "id_expiry_date_profile.docx",
+]
+
+EMAIL = re.compile(r"[^@]+@[^@]+\.[^@]+")
+PASSPORT_NUMBER = re.compile(r"^[A-Z]{2}[0-9]{7}$")
+PHONE_NUMBER = re.compile(r"^\+[\d\s\-()]{7,}$")
+
+POLITICALLY_EXPOSED = "is the client or associated person a politically exposed person as defined in the client acceptance policy?_profile.docx"
+
+MIN_CONSISTENCY = 95
+
+
+def normalize_name(name):
+    name = name.strip().lower()
+    name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode()
+    return name
+
+
+_dates = DateNormalizer()
+
+
+def normalize_date(value, field=None):
+    return _dates.normalize(value, field)
+
+
+def normalize_text(value):
+    return value.lower().strip()
+
+
+def key_normalizer(key, dates=_dates):
+    if "date" in key:
+        return lambda value: dates.normalize(value, key)
+    if "name" in key:
+        return normalize_name
+    return normalize_text
+
+
+def is_country_key(key):
+    return "country" in key or "citizenship" in key or "nationality" in key
+
+
+def is_valid_email(email):
+    return EMAIL.match(email.strip())
+
+
+def is_valid_passport_number(passport):
+    return PASSPORT_NUMBER.match(passport.strip().upper())
+
+
+def is_valid_phone_number(phone):
+    return PHONE_NUMBER.match(phone.strip())
+
+
+class Judge:
+    """
+    The consistency and validity rules, compiled once: every key of a match
+    group comes with its normalizer and every group with how its values are
+    compared, so checking a client is a loop over prebuilt tables. Decide
+    one client with decide, many with judge_many.
+
+    Countries and nationalities are compared by the country they name
+    (Austrian/OSTERREICH and Austria match, Austria and Australia do not),
+    with the fuzzy check for values that name no known country. The index
+    knows every ISO 3166-1 country by its codes and English, German, French
+    and Italian names, but demonyms and native names only for the countries
+    listed in build_country_aliases.EXTRA_ALIASES; a nationality like
+    "Malagasy" falls back to the fuzzy check.
+    """
+
+    def __init__(self, matches=MATCHES, date_fields=DATE_FIELDS, threshold=SIMILARITY_THRESHOLD, min_consistency=MIN_CONSISTENCY):
+        # the judge's own formats learned per field
+        self.dates = DateNormalizer()
+        # loaded with the first country compared
+        self.countries = None
+        self.groups = [
+            (group, [(key, key_normalizer(key, self.dates)) for key in group],
+             self.similar_country if all(is_country_key(key) for key in group) else is_similar)
+            for group in matches
         ]
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        # try to manually fix common lowercase month issues
-        try:
-            return datetime.strptime(value.title(), "%d-%b-%Y").strftime("%Y-%m-%d")
-        except:
-            return None
-
-    def normalize(key, value):
-        if "date" in key:
-            return normalize_date(value)
-        if "name" in key:
-            return normalize_name(value)
-        return value.lower().strip()
-
-    def is_valid_email(email):
-        return re.match(r"[^@]+@[^@]+\.[^@]+", email.strip())
-
-    def is_valid_passport_number(passport):
-        return re.match(r"^[A-Z]{2}[0-9]{7}$", passport.strip().upper())
-
-    def is_valid_phone_number(phone):
-        return re.match(r"^\+[\d\s\-()]{7,}$", phone.strip())
-
-    # Pairs or groups of keys we expect to be consistent
-    matches = [
-        # ("passport_number_account.pdf", "passport_number_passport.png", "passport_no_profile.docx"),
-        ("name_account.pdf", "account_name_account.pdf"),
-        ("account_holder_name_account.pdf", "first_name_profile.docx"),
-        ("account_holder_surname_account.pdf", "last_name_profile.docx"),
-        ("email_account.pdf", "email_profile.docx"),
-        # ("phone_number_account.pdf", "telephone_profile.docx"),
-        ("birth_date_passport.png", "date_of_birth_profile.docx"),
-        ("issue_date_passport.png", "id_issue_date_profile.docx"),
-        ("expiry_date_passport.png", "id_expiry_date_profile.docx"),
-        ("country_account.pdf", "country_of_domicile_profile.docx"),
-        ("citizenship_passport.png", "nationality_profile.docx"),
-        # ("country_account.pdf", "country_passport.png"),
-        ("postal_code_account.pdf", "address_profile.docx"),
-        # ("city_account.pdf", "address_profile.docx"),
-        ("building_number_account.pdf", "address_profile.docx"),
-    ]
-
-    total_checks = 0
-    consistent = 0
-
-    for group in matches:
-        values = [(k, data.get(k, "")) for k in group if k in data]
-        if len(values) > 1:
-            base_key, base_val = values[0]
-            base_val_norm = normalize(base_key, base_val)
-            for other_key, other_val in values[1:]:
-                other_val_norm = normalize(other_key, other_val)
-                if base_val_norm and other_val_norm and similar(base_val_norm, other_val_norm) >= 0.8:
-                    consistent += 1
-                else:
-                    inconsistencies.append((group, base_val, other_val))
-                total_checks += 1
-
-    # Validate known formats
-    date_fields = [
-        "birth_date_passport.png",
-        "date_of_birth_profile.docx",
-        "issue_date_passport.png",
-        "expiry_date_passport.png",
-        "id_issue_date_profile.docx",
-        "id_expiry_date_profile.docx",
-    ]
-    for field in date_fields:
-        if field in data and not normalize_date(data[field]):
-            invalid_data.append((field, data[field], "Invalid date format"))
-
-    if "email_account.pdf" in data and not is_valid_email(data["email_account.pdf"]):
-        invalid_data.append(("email_account.pdf", data["email_account.pdf"], "Invalid email"))
-
-    if "email_profile.docx" in data and not is_valid_email(data["email_profile.docx"]):
-        invalid_data.append(("email_profile.docx", data["email_profile.docx"], "Invalid email"))
-
-    if "passport_number_account.pdf" in data and not is_valid_passport_number(data["passport_number_account.pdf"]):
-        invalid_data.append(("passport_number_account.pdf", data["passport_number_account.pdf"], "Invalid passport number"))
-
-    # if "phone_number_account.pdf" in data and not is_valid_phone_number(data["phone_number_account.pdf"]):
-    #     invalid_data.append(("phone_number_account.pdf", data["phone_number_account.pdf"], "Invalid phone number"))
-
-    # if "investment risk profile_profile.docx" in data and data["investment risk profile_profile.docx"].lower().strip() in ["high"]:
-    #     invalid_data.append(("investment risk profile_profile.docx", data["investment risk profile_profile.docx"], "risk of investment too high"))
-
-    # if "investment experience_profile.docx" in data and data["investment experience_profile.docx"].lower().strip() in ["inexperienced"]:
-    #     invalid_data.append(("investment experience_profile.docx", data["investment experience_profile.docx"], "risk of investment too high"))
-
-    exposed = "is the client or associated person a politically exposed person as defined in the client acceptance policy?_profile.docx"
-    if exposed in data and data[exposed] != "no":
-        invalid_data.append((exposed, data[exposed], "politically exposed"))
-
-    consistency_percentage = round((consistent / total_checks) * 100, 2) if total_checks > 0 else 100.0
-
-    return {
-        "consistency_percentage": consistency_percentage,
-        "potential_inconsistencies": inconsistencies,
-        "invalid_data": invalid_data
-    }
+        self.date_keys = {key for group in matches for key in group if "date" in key}
+        self.date_fields = list(date_fields)
+        # validated one by one after the dates, in this order
+        self.format_checks = [
+            ("email_account.pdf", is_valid_email, "Invalid email"),
+            ("email_profile.docx", is_valid_email, "Invalid email"),
+            ("passport_number_account.pdf", is_valid_passport_number, "Invalid passport number"),
+            # ("phone_number_account.pdf", is_valid_phone_number, "Invalid phone number"),
+        ]
+        self.threshold = threshold
+        self.min_consistency = min_consistency
+
+    def country_index(self):
+        if self.countries is None:
+            self.countries = get_country_index()
+        return self.countries
+
+    def similar_country(self, a, b, threshold):
+        same = self.country_index().same_country(a, b)
+        if same is None:
+            return is_similar(a, b, threshold)
+        return same
+
+    def verify(self, data: dict) -> dict:
+        inconsistencies = []
+        invalid_data = []
+        total_checks = 0
+        consistent = 0
+        threshold = self.threshold
+        # normalized values by key; the date checks reuse the dates parsed for the groups
+        normalized = {}
+        dates = {}
+
+        for group, keys, compare in self.groups:
+            values = [(key, data[key], normalize) for key, normalize in keys if key in data]
+            if len(values) > 1:
+                for key, value, normalize in values:
+                    normalized[key] = normalize(value)
+                    if key in self.date_keys:
+                        dates[key] = normalized[key]
+                base_key, base_val, _ = values[0]
+                base_val_norm = normalized[base_key]
+                for other_key, other_val, _ in values[1:]:
+                    other_val_norm = normalized[other_key]
+                    if base_val_norm and other_val_norm and compare(base_val_norm, other_val_norm, threshold):
+                        consistent += 1
+                    else:
+                        inconsistencies.append((group, base_val, other_val))
+                    total_checks += 1
+
+        for field in self.date_fields:
+            if field in data and not (dates[field] if field in dates else self.dates.normalize(data[field], field)):
+                invalid_data.append((field, data[field], "Invalid date format"))
+
+        for field, is_valid, reason in self.format_checks:
+            if field in data and not is_valid(data[field]):
+                invalid_data.append((field, data[field], reason))
+
+        # if "investment risk profile_profile.docx" in data and data["investment risk profile_profile.docx"].lower().strip() in ["high"]:
+        #     invalid_data.append(("investment risk profile_profile.docx", data["investment risk profile_profile.docx"], "risk of investment too high"))
+
+        # if "investment experience_profile.docx" in data and data["investment experience_profile.docx"].lower().strip() in ["inexperienced"]:
+        #     invalid_data.append(("investment experience_profile.docx", data["investment experience_profile.docx"], "risk of investment too high"))
+
+        if POLITICALLY_EXPOSED in data and data[POLITICALLY_EXPOSED] != "no":
+            invalid_data.append((POLITICALLY_EXPOSED, data[POLITICALLY_EXPOSED], "politically exposed"))
+
+        consistency_percentage = round((consistent / total_checks) * 100, 2) if total_checks > 0 else 100.0
+
+        return {
+            "consistency_percentage": consistency_percentage,
+            "potential_inconsistencies": inconsistencies,
+            "invalid_data": invalid_data
+        }
+
+    def decide(self, data: dict):
+        result = self.verify(data)
+        negative_result = result["consistency_percentage"] < self.min_consistency or len(result["invalid_data"]) > 0
+        return (Decision.Reject if negative_result else Decision.Accept), result
+
+    def judge_many(self, clients) -> list:
+        """(decision, result) for every client dict of an iterable, in order."""
+        with tracing.span("judge.judge_many") as span:
+            decide = self.decide
+            decisions = [decide(data) for data in clients]
+            span["clients"] = len(decisions)
+            return decisions
+
+
+_default_judge = Judge()
+
+
+@tracing.traced("judge.verify_personal_data_consistency")
+def verify_personal_data_consistency(data):
+    return _default_judge.verify(data)
+
+
+def judge_many(clients) -> list:
+    return _default_judge.judge_many(clients)
+
+
+def handcrafted_decision_from_data(customer_data: dict):
+    with tracing.span("judge.handcrafted_decision") as span:
+        decision, result = _default_judge.decide(customer_data)
+        span["decision"] = decision.value
+        return decision, result
+
 
 def handcrafted_decision(file_path: str):
     with open(file_path) as json_file:
         customer_data = json.load(json_file)
-        result = verify_personal_data_consistency(customer_data)
-        negative_result = result["consistency_percentage"] < 95 or len(result["invalid_data"]) > 0
-        decision = Decision.Reject if negative_result else Decision.Accept
-        return decision, result
+        return handcrafted_decision_from_data(customer_data)
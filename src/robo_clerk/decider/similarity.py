@@ -0,0 +1,103 @@
+"""
+"Are these two values similar enough" for the judge, without computing more
+of difflib's ratio than the answer needs.
+
+SequenceMatcher.ratio() is 2 * M / T, M being the characters of the
+matching blocks found by recursively taking the longest match and T the
+length of both strings. blocks_reach walks the same recursion, with
+SequenceMatcher's own find_longest_match, and stops as soon as the blocks
+found so far reach the threshold, or can no longer reach it even if every
+part still unsearched matched completely. Before that, the length and
+character count bounds difflib uses for real_quick_ratio and quick_ratio
+reject most dissimilar pairs without building a matcher at all.
+
+The answer is always ratio() >= threshold, only cheaper.
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+
+SIMILARITY_THRESHOLD = 0.8
+
+
+def reaches(matches: int, length: int, threshold: float) -> bool:
+    # the float expression of SequenceMatcher.ratio, so borderline pairs round the same way
+    return (2.0 * matches / length if length else 1.0) >= threshold
+
+
+def bounds_allow(a: str, b: str, threshold: float) -> bool:
+    """False when even real_quick_ratio or quick_ratio stays under threshold."""
+    length = len(a) + len(b)
+    if not reaches(min(len(a), len(b)), length, threshold):
+        return False
+    return reaches(sum((Counter(a) & Counter(b)).values()), length, threshold)
+
+
+def blocks_reach(matcher: SequenceMatcher, threshold: float) -> bool:
+    """ratio() >= threshold for the matcher's two strings, searching only as far as that takes."""
+    a, b = matcher.a, matcher.b
+    length = len(a) + len(b)
+    matches = 0
+    # the most the parts still to search can add: the shorter side of each
+    unsearched = min(len(a), len(b))
+    parts = [(0, len(a), 0, len(b))]
+    while parts:
+        a_low, a_high, b_low, b_high = parts.pop()
+        unsearched -= min(a_high - a_low, b_high - b_low)
+        i, j, size = matcher.find_longest_match(a_low, a_high, b_low, b_high)
+        if size:
+            matches += size
+            if reaches(matches, length, threshold):
+                return True
+            if a_low < i and b_low < j:
+                parts.append((a_low, i, b_low, j))
+                unsearched += min(i - a_low, j - b_low)
+            if i + size < a_high and j + size < b_high:
+                parts.append((i + size, a_high, j + size, b_high))
+                unsearched += min(a_high - i - size, b_high - j - size)
+        if not reaches(matches + unsearched, length, threshold):
+            return False
+    return reaches(matches, length, threshold)
+
+
+def ratio_at_least(a: str, b: str, threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """SequenceMatcher(None, a, b).ratio() >= threshold"""
+    return bounds_allow(a, b, threshold) and blocks_reach(SequenceMatcher(None, a, b), threshold)
+
+
+def is_similar(a: str, b: str, threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """One value contained in the other, or their ratio (lowercased, stripped) at least threshold."""
+    if a in b or b in a:
+        return True
+    return ratio_at_least(a.lower().strip(), b.lower().strip(), threshold)
+
+
+def similar_many(pairs, threshold: float = SIMILARITY_THRESHOLD) -> list:
+    """
+    is_similar for every (a, b) pair, in order. Pairs sharing the second
+    value share one matcher (difflib indexes that side), and repeated pairs
+    are only compared once.
+    """
+    pairs = list(pairs)
+    results = [None] * len(pairs)
+    by_second = {}
+    for index, (a, b) in enumerate(pairs):
+        if a in b or b in a:
+            results[index] = True
+        else:
+            by_second.setdefault(b.lower().strip(), []).append((index, a.lower().strip()))
+    for b, firsts in by_second.items():
+        # built for the first pair the bounds let through
+        matcher = None
+        seen = {}
+        for index, a in firsts:
+            if a not in seen:
+                seen[a] = bounds_allow(a, b, threshold)
+                if seen[a]:
+                    if matcher is None:
+                        matcher = SequenceMatcher(None, a, b)
+                    else:
+                        matcher.set_seq1(a)
+                    seen[a] = blocks_reach(matcher, threshold)
+            results[index] = seen[a]
+    return results
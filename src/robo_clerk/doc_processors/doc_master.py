@@ -1,28 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict
-import json
+import importlib
 import os
-from robo_clerk.doc_processors.docx import DOCXProcessor
-from robo_clerk.doc_processors.pdf import PDFProcessor
-from robo_clerk.doc_processors.png import PNGProcessor
-from robo_clerk.doc_processors.process_file_sambanova import TXTProcessorSambanova
-from robo_clerk.doc_processors.text_extractor import TXTProcessor
+import threading
+from typing import List
+from robo_clerk.doc_processors.extraction_cache import ExtractionCache
 from robo_clerk.doc_processors.types import Feature
-from robo_clerk.utils.file import FileType, get_file_name, get_file_type, list_files_in_folder
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import FileType, decode_client_documents, get_file_name, get_file_type, list_files_in_folder, save_documents, write_json_atomic
 
 # For simplicity define consts as the name of the docs
 
+# PDF parsing, DOCX parsing and OCR hold the GIL, so they go to worker processes.
+# Everything else (the LLM call for descriptions) is network bound and runs on threads.
+CPU_BOUND_FILE_TYPES = {FileType.PDF, FileType.DOCX, FileType.PNG}
+
+# Processors are referenced as "module:class" and only imported when a file of
+# that type first shows up, so PyPDF2, python-docx, PIL, pytesseract and openai
+# stay out of start-up.
+PROCESSOR_REGISTRY = {
+    FileType.PDF: "robo_clerk.doc_processors.pdf:PDFProcessor",
+    FileType.DOCX: "robo_clerk.doc_processors.docx:DOCXProcessor",
+    FileType.PNG: "robo_clerk.doc_processors.png:PNGProcessor",
+    # FileType.TXT: "robo_clerk.doc_processors.text_extractor:TXTProcessor",  # regex matching
+    # FileType.TXT: "robo_clerk.doc_processors.process_file_sambanova:TXTProcessorSambanova",  # LLM only
+    FileType.TXT: "robo_clerk.doc_processors.hybrid_text:TXTProcessorHybrid",  # regex, LLM for missing fields
+}
+
+_loaded_processors = {}
+_process_pool = None
+_thread_pool = None
+# the max_workers the pools were created with
+_pool_workers = None
+_pools_lock = threading.Lock()
+
+def register_document_processor(file_type: FileType, processor_path: str):
+    PROCESSOR_REGISTRY[file_type] = processor_path
+    _loaded_processors.pop(file_type, None)
+
 def get_document_processor(file_type: FileType):
-    if (file_type == FileType.PDF):
-        return PDFProcessor
-    if (file_type == FileType.DOCX):
-        return DOCXProcessor
-    if (file_type == FileType.PNG):
-        return PNGProcessor
-    if (file_type == FileType.TXT):
-        # return TXTProcessor   
-        return TXTProcessorSambanova
-    
-    return None
+    if file_type in _loaded_processors:
+        return _loaded_processors[file_type]
+    processor_path = PROCESSOR_REGISTRY.get(file_type)
+    if processor_path is None:
+        return None
+    module_name, class_name = processor_path.split(":")
+    processor = getattr(importlib.import_module(module_name), class_name)
+    _loaded_processors[file_type] = processor
+    return processor
 
 def flatten(feature: Feature):  
     return {
@@ -30,27 +55,60 @@ def flatten(feature: Feature):
     }
     
 
-def process_document(file_path: str, output_folder_path, output_file="client_data.json"):
-    file_name =get_file_name(file_path)
-    file_type = get_file_type(file_name)
-    file_processor = get_document_processor(file_type)
+def get_file_processor(file_path: str):
+    return get_document_processor(get_file_type(get_file_name(file_path)))
+
+def run_processor(file_processor, file_path: str, data: bytes | None = None) -> tuple:
+    """
+    (features, cacheable) of the document. A processor that fell back to a
+    partial result (a description read without the LLM, say) sets its
+    cacheable attribute to False, so the next run tries again.
+    """
+    processor = file_processor(file_path, buffer=data)
+    features = processor.run_pipeline()
+    return features, features is not None and getattr(processor, "cacheable", True)
+
+def extract_features_cacheable(file_path: str, cache: ExtractionCache | None = None, data: bytes | None = None) -> tuple:
+    """extract_features, and whether its result may be cached."""
+    file_processor = get_file_processor(file_path)
     if file_processor is None:
         print(f"no file processor for {file_path}")
-        return
-    features = file_processor(file_path).run_pipeline()
+        return None, False
+    with tracing.span("process_document", file=get_file_name(file_path), processor=file_processor.__name__) as span:
+        if cache is not None:
+            features = cache.get(file_processor, file_path, data)
+            span["cache_hit"] = features is not None
+            if features is not None:
+                return features, True
+        features, cacheable = run_processor(file_processor, file_path, data)
+        span["cacheable"] = cacheable
+        if cache is not None and cacheable:
+            cache.put(file_processor, file_path, features, data)
+        return features, cacheable
+
+def extract_features(file_path: str, cache: ExtractionCache | None = None, data: bytes | None = None) -> List[Feature] | None:
+    """With data, the document is read from those bytes and file_path only names it."""
+    return extract_features_cacheable(file_path, cache=cache, data=data)[0]
+
+def extract_features_in_worker(file_path: str, trace_context=None, data: bytes | None = None) -> tuple:
+    """(features, cacheable), see run_processor."""
+    with tracing.attach(trace_context):
+        try:
+            return extract_features_cacheable(file_path, data=data)
+        except Exception as e:
+            # Some processor errors (pytesseract's, for one) cannot be unpickled in
+            # the parent, which would break the whole process pool
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def features_to_data(features: List[Feature] | None) -> dict | None:
     try:
-        data = {f"{feature.key}_{get_file_name(feature.source)}": feature.value for feature in features}
+        return {f"{feature.key}_{get_file_name(feature.source)}": feature.value for feature in features}
     except:
         print("could not process features")
-        return
-    os.makedirs(output_folder_path, exist_ok=True)
-    
-    with open(os.path.join(output_folder_path, output_file), "r") as json_output:
-      existing_data = json.load(json_output)
-        
-    with open(os.path.join(output_folder_path, output_file), "w") as json_output:
-      data_pretty_json = json.dumps({**existing_data, **data}, indent=2)
-      json_output.write(data_pretty_json)
+        return None
+
+def process_document(file_path: str, cache: ExtractionCache | None = None, data: bytes | None = None) -> dict | None:
+    return features_to_data(extract_features(file_path, cache=cache, data=data))
 
 def list_files_in_folder(folder_path: str):
     for entry in os.listdir(folder_path):
@@ -61,10 +119,120 @@ def list_files_in_folder(folder_path: str):
 def get_file_name(file_path: str) -> str:
     return os.path.basename(file_path)
 
-def process_documents(input_folder_path, output_folder_path, output_file="client_data.json"):
-    os.makedirs(output_folder_path, exist_ok=True)
+def get_executors(max_workers=None):
+    """
+    Lazily create the pools shared by every parallel process_documents call,
+    so the game loop does not pay the worker start-up cost for every client.
+    A call with another max_workers replaces them (work already submitted
+    still finishes); None takes the pools as they are.
+    """
+    global _process_pool, _thread_pool, _pool_workers
+    with _pools_lock:
+        if max_workers is not None and max_workers != _pool_workers and _process_pool is not None:
+            _process_pool.shutdown(wait=False)
+            _thread_pool.shutdown(wait=False)
+            _process_pool = _thread_pool = None
+        if _process_pool is None:
+            _pool_workers = max_workers
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+            _thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        return _process_pool, _thread_pool
+
+def is_cpu_bound(file_path: str) -> bool:
+    """Processors may override the file type default with a CPU_BOUND attribute."""
+    file_type = get_file_type(get_file_name(file_path))
+    return getattr(get_document_processor(file_type), "CPU_BOUND", file_type in CPU_BOUND_FILE_TYPES)
+
+def submit_extraction(file_path: str, max_workers=None, data: bytes | None = None):
+    process_pool, thread_pool = get_executors(max_workers)
+    executor = process_pool if is_cpu_bound(file_path) else thread_pool
+    return executor.submit(extract_features_in_worker, file_path, tracing.current_context(), data)
+
+def extract_documents_parallel(file_paths: List[str], max_workers=None, cache: ExtractionCache | None = None, contents: dict | None = None) -> dict:
+    """
+    Run every document of a client at the same time and merge the results
+    in folder order, so the outcome matches the sequential run. A processor
+    error is raised, as in the sequential run, once the other documents are
+    cancelled.
+    The cache is consulted here, in the parent, so hits never reach a worker.
+    contents maps file names to in-memory documents, which are not read from disk.
+    """
+    contents = contents or {}
+    pending = {}
+    cached = {}
+    for file_path in file_paths:
+        data = contents.get(file_path)
+        file_processor = get_file_processor(file_path)
+        features = cache.get(file_processor, file_path, data) if cache is not None and file_processor is not None else None
+        if features is not None:
+            cached[file_path] = features
+        else:
+            pending[file_path] = submit_extraction(file_path, max_workers, data)
+
+    merged = {}
+    for file_path in file_paths:
+        if file_path in cached:
+            features = cached[file_path]
+        else:
+            try:
+                features, cacheable = pending[file_path].result()
+            except Exception as e:
+                print(f"failed to process {file_path}: {e}")
+                for future in pending.values():
+                    future.cancel()
+                raise
+            if cache is not None and cacheable:
+                cache.put(get_file_processor(file_path), file_path, features, contents.get(file_path))
+        data = features_to_data(features)
+        if data is not None:
+            merged.update(data)
+    return merged
+
+def process_documents(input_folder_path, output_folder_path, output_file="client_data.json", parallel=False, max_workers=None, cache: ExtractionCache | None = None) -> dict:
+    """
+    Extract every document of a client, merge the features in memory and
+    write them once. Returns the merged dict so callers can skip re-reading
+    the file; pass output_folder_path=None to skip writing altogether.
+    With a cache, documents whose bytes were already extracted are not reprocessed.
+    """
+    file_paths = list(list_files_in_folder(input_folder_path))
+
+    with tracing.span("process_documents", folder=input_folder_path, documents=len(file_paths), parallel=parallel):
+        if parallel:
+            data = extract_documents_parallel(file_paths, max_workers=max_workers, cache=cache)
+        else:
+            data = {}
+            for file_path in file_paths:
+                document_data = process_document(file_path, cache=cache)
+                if document_data is not None:
+                    data.update(document_data)
+
+        if output_folder_path is not None:
+            write_json_atomic(os.path.join(output_folder_path, output_file), data)
+    return data
+
+
+def process_client_documents(client_data: dict, output_folder_path=None, output_file="client_data.json", save_dir=None, parallel=True, max_workers=None, cache: ExtractionCache | None = None) -> dict:
+    """
+    Same as process_documents for the base64 documents of a game API response,
+    decoded and extracted in memory. Nothing touches the disk unless save_dir
+    (the decoded documents) or output_folder_path (the merged features) is given.
+    """
+    documents = decode_client_documents(client_data)
+    if save_dir is not None:
+        save_documents(documents, save_dir)
+
+    file_names = list(documents)
+    with tracing.span("process_documents", folder=None, documents=len(file_names), parallel=parallel):
+        if parallel:
+            data = extract_documents_parallel(file_names, max_workers=max_workers, cache=cache, contents=documents)
+        else:
+            data = {}
+            for file_name in file_names:
+                document_data = process_document(file_name, cache=cache, data=documents[file_name])
+                if document_data is not None:
+                    data.update(document_data)
 
-    with open(os.path.join(output_folder_path, output_file), "w") as output_json:
-        output_json.write("{}")
-    for file_path in list_files_in_folder(input_folder_path):
-        process_document(file_path, output_folder_path, output_file=output_file)
+        if output_folder_path is not None:
+            write_json_atomic(os.path.join(output_folder_path, output_file), data)
+    return data
@@ -1,22 +1,178 @@
 import os
 import re
 from typing import List
-from docx import Document
 import unicodedata
+from xml.etree import ElementTree
+import zipfile
 
 from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import document_source, to_bytes
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W14 = "{http://schemas.microsoft.com/office/word/2010/wordml}"
+RELATIONSHIPS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+# Run children that stand for a character, as python-docx's run.text maps them
+RUN_CHARACTERS = {f"{W}tab": "\t", f"{W}ptab": "\t", f"{W}cr": "\n", f"{W}noBreakHyphen": "-"}
+CHECKED_VALUES = {"1", "true", "on"}
+
+# Element paths from the root, python-docx only looks at top-level body tables
+TABLE_PATH = [f"{W}document", f"{W}body", f"{W}tbl"]
+ROW_PATH = TABLE_PATH + [f"{W}tr"]
+CELL_PATH = ROW_PATH + [f"{W}tc"]
+PARAGRAPH_PATH = CELL_PATH + [f"{W}p"]
+RUN_PATH = PARAGRAPH_PATH + [f"{W}r"]
+CHECKBOX_PATH = PARAGRAPH_PATH + [f"{W}sdt", f"{W}sdtPr", f"{W14}checkbox"]
+
+
+def main_document_part(archive: zipfile.ZipFile) -> str:
+    """Name of the main document part, from the package relationships."""
+    try:
+        relationships = ElementTree.fromstring(archive.read("_rels/.rels"))
+    except (KeyError, ElementTree.ParseError):
+        return DEFAULT_DOCUMENT_PART
+    for relationship in relationships.iter(RELATIONSHIPS):
+        if relationship.get("Type", "").endswith("/officeDocument"):
+            return relationship.get("Target", DEFAULT_DOCUMENT_PART).lstrip("/")
+    return DEFAULT_DOCUMENT_PART
+
+
+def iter_table_rows(source):
+    """
+    Yield the " | " joined cell texts of every row of the top-level tables,
+    streaming the document XML out of the zip instead of building a tree.
+
+    Cells are read the way python-docx's row.cells reads them: a cell spanning
+    several grid columns repeats its text, a vertically merged continuation
+    repeats the cell above, and only runs directly in the cell paragraphs count.
+    Content-control checkboxes in those paragraphs become ☒ or ☐.
+    """
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(main_document_part(archive)) as stream:
+            path = []
+            body = None
+            previous_row = {}  # grid offset -> texts of the cell starting there
+            for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    path.append(tag)
+                    if len(path) == 2:
+                        body = element
+                    elif path == TABLE_PATH:
+                        previous_row = {}
+                    elif path == ROW_PATH:
+                        row, row_texts, grid_offset = {}, [], 0
+                    elif path[:-1] == ROW_PATH + [f"{W}trPr"] and tag == f"{W}gridBefore":
+                        grid_offset += int(element.get(f"{W}val", 0))
+                    elif path == CELL_PATH:
+                        cell_runs, grid_span, vertical_merge, checkbox = [], 1, None, None
+                    elif path[:-1] == CELL_PATH + [f"{W}tcPr"]:
+                        if tag == f"{W}gridSpan":
+                            grid_span = int(element.get(f"{W}val", 1))
+                        elif tag == f"{W}vMerge":
+                            vertical_merge = element.get(f"{W}val", "continue")
+                    elif path == CHECKBOX_PATH:
+                        checkbox = False
+                    elif path[:-1] == CHECKBOX_PATH and tag == f"{W14}checked":
+                        checkbox = element.get(f"{W14}val", "1").lower() in CHECKED_VALUES
+                    continue
+
+                if path[:-1] == RUN_PATH:
+                    if tag == f"{W}t":
+                        cell_runs.append(element.text or "")
+                    elif tag == f"{W}br":
+                        cell_runs.append("\n" if element.get(f"{W}type", "textWrapping") == "textWrapping" else "")
+                    elif tag in RUN_CHARACTERS:
+                        cell_runs.append(RUN_CHARACTERS[tag])
+                elif path == PARAGRAPH_PATH + [f"{W}sdt"]:
+                    if checkbox is not None:
+                        cell_runs.append("☒" if checkbox else "☐")
+                    checkbox = None
+                elif path == CELL_PATH:
+                    if vertical_merge == "continue":
+                        texts = previous_row.get(grid_offset, [])
+                    else:
+                        texts = ["".join(cell_runs).strip()] * grid_span
+                    row[grid_offset] = texts
+                    row_texts.extend(text for text in texts if text)
+                    grid_offset += grid_span
+                elif path == ROW_PATH:
+                    previous_row = row
+                    element.clear()
+                    if row_texts:
+                        yield " | ".join(row_texts)
+                elif len(path) == 3 and body is not None:
+                    # done with this block, drop it so memory stays flat on long documents
+                    body.remove(element)
+                path.pop()
+
+
+# field -> (label, value pattern, whether the value has to fill the whole
+# space up to the next label or may be followed by unlabelled text)
+PROFILE_FIELDS = {
+    "last_name": (r"last name", r"[\w\-]+", True),
+    "first_name": (r"first/ middle name \(s\)", r"[\w\s]+", True),
+    "address": (r"address", r"[\w\s,.-]+", True),
+    "country_of_domicile": (r"country of domicile", r"[\w\s]+", True),
+    "date_of_birth": (r"date of birth", r"\d{4}-\d{2}-\d{2}", True),
+    "nationality": (r"nationality", r"[\w\s]+", True),
+    "passport_no": (r"passport no/ unique id", r"[\w\d]+", True),
+    "id_type": (r"id type", r"[\w\s]+", True),
+    "id_issue_date": (r"id issue date", r"\d{4}-\d{2}-\d{2}", True),
+    "id_expiry_date": (r"id expiry date", r"\d{4}-\d{2}-\d{2}", False),
+    "telephone": (r"telephone", r"\+[\d\s\-()]+", True),
+    "email": (r"e[-\s]*mail", r"[\w.-]+@[\w.-]+", False),
+}
+COMMUNICATION_FIELDS = ("telephone", "email")
+PERSONAL_FIELDS = tuple(key for key in PROFILE_FIELDS if key not in COMMUNICATION_FIELDS)
+
+# One pass over the text finds every label; the alternatives are literal enough
+# that the scan stays linear whatever sits between the labels
+LABEL_PATTERN = re.compile(r"\b(?:" + "|".join(f"(?P<{key}>{label})" for key, (label, _, _) in PROFILE_FIELDS.items()) + ")")
+VALUE_PATTERNS = {key: (re.compile(value), up_to_next_label) for key, (_, value, up_to_next_label) in PROFILE_FIELDS.items()}
+
+
+def segment_profile(text: str) -> dict:
+    """Field -> [(text between its label and the next label, whether a label follows)], in text order."""
+    segments = {}
+    labels = list(LABEL_PATTERN.finditer(text))
+    for label, next_label in zip(labels, labels[1:] + [None]):
+        end = next_label.start() if next_label is not None else len(text)
+        segments.setdefault(label.lastgroup, []).append((text[label.end():end].strip(), next_label is not None))
+    return segments
+
+
+def find_field_value(segments: dict, key: str) -> str | None:
+    """The value after the first occurrence of the field label that holds a valid one."""
+    pattern, up_to_next_label = VALUE_PATTERNS[key]
+    for segment, followed_by_label in segments.get(key, []):
+        if up_to_next_label:
+            if followed_by_label and pattern.fullmatch(segment):
+                return segment
+        else:
+            match = pattern.match(segment)
+            if match:
+                return match.group(0)
+    return None
+
 
 class DOCXProcessor:
-    def __init__(self, file_path):
+    VERSION = "3"
+
+    def __init__(self, file_path, buffer=None):
         self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
         self.text = ""
         self.cleaned_text = ""
         self.extracted_info = {}
         self.tickable_info = {}
+        self.segments = None
 
     # 1. Extract raw text
     def extract_text(self):
-        self.text = self.extract_docx_text_with_checkboxes(self.file_path)
+        self.text = self.extract_docx_text_with_checkboxes(document_source(self.file_path, self.data))
 
     # 2. Clean the extracted text
     def clean_text(self):
@@ -28,77 +184,40 @@ class DOCXProcessor:
 
     # 3. Extract text input
     def extract_info(self):
-        self.personal_info={}
-        personal_info_patterns = {
-            "last_name": r"last name\s*([\w\-]+)(?=\s*(first/ middle name \(s\)|address|country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
-            "first_name": r"first/ middle name \(s\)\s*([\w\s]+)(?=\s*(address|country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
-            "address": r"address\s*([\w\s,.-]+?)(?=\s*(country of domicile|date of birth|nationality|passport no|id type|id issue date|id expiry date))",
-            "country_of_domicile": r"country of domicile\s*([\w\s]+)(?=\s*(date of birth|nationality|passport no|id type|id issue date|id expiry date))",
-            "date_of_birth": r"date of birth\s*(\d{4}-\d{2}-\d{2})(?=\s*(nationality|passport no|id type|id issue date|id expiry date))",
-            "nationality": r"nationality\s*([\w\s]+)(?=\s*(passport no|id type|id issue date|id expiry date))",
-            "passport_no": r"passport no/ unique id\s*([\w\d]+)(?=\s*(id type|id issue date|id expiry date))",
-            "id_type": r"id type\s*([\w\s]+)(?=\s*(id issue date|id expiry date))",
-            "id_issue_date": r"id issue date\s*(\d{4}-\d{2}-\d{2})(?=\s*id expiry date)",
-            "id_expiry_date": r"id expiry date\s*(\d{4}-\d{2}-\d{2})",
-            "telephone": r"telephone\s*(\+[\d\s]+)(?=\s*(e-mail|email))",
-            "email": r"(e[-\s]*mail|email)\s*([\w\.-]+@[\w\.-]+)(?=\s*(telephone|country of domicile|date of birth|nationality|passport no|id type))",
-        }
-
-        # Extract personal information
-        for key, pattern in personal_info_patterns.items():
-            match = re.search(pattern, self.cleaned_text)
-            if match:
-                if key == "first_name":
-                    full_name = match.group(1).strip()
-                    names = full_name.split()
-                    self.personal_info["first_name"] = names[0]
-                    self.personal_info["middle_name"] = " ".join(names[1:]) if len(names) > 1 else ""
-                else:
-                    self.personal_info[key] = match.group(1)
+        self.segments = segment_profile(self.cleaned_text)
+        self.personal_info = {}
+        for key in PERSONAL_FIELDS:
+            value = find_field_value(self.segments, key)
+            if value is None:
+                continue
+            if key == "first_name":
+                names = value.split()
+                self.personal_info["first_name"] = names[0]
+                self.personal_info["middle_name"] = " ".join(names[1:]) if len(names) > 1 else ""
+            else:
+                self.personal_info[key] = value
 
         # Extract tickable fields
         self.tickable_info = self.extract_checked_options_from_text(self.text)
 
     # Extract communication fields (telephone, email)
     def extract_communication_info(self):
+        if self.segments is None:
+            self.segments = segment_profile(self.cleaned_text)
         self.communication_info = {}
-        communication_patterns = {
-            "telephone": r"telephone\s*([\+0-9\s\-\(\)]+)(?=\s*(e[-\s]*mail|email))",
-            "email": r"(e[-\s]*mail|email)\s*([\w\.-]+@[\w\.-]+)"
-        }
-
-        # Extract communication information
-        for key, pattern in communication_patterns.items():
-            match = re.search(pattern, self.cleaned_text)
-            if match:
-                self.communication_info[key] = match.group(2).strip()  # Adjusted to capture the email address correctly
+        for key in COMMUNICATION_FIELDS:
+            value = find_field_value(self.segments, key)
+            if value is not None:
+                self.communication_info[key] = value
 
     # Methods to extract the text options from checkboxes
     def extract_docx_text_with_checkboxes(self, file_path):
         try:
-            doc = Document(file_path)
-        except Exception as e:
+            return "\n".join(iter_table_rows(file_path))
+        except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
             print(f"Error reading DOCX file: {e}")
             return ""
 
-        all_text = []
-
-        for i, table in enumerate(doc.tables):
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    cell_runs = []
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            cell_runs.append(run.text)
-                    full_cell_text = "".join(cell_runs).strip()
-                    if full_cell_text:
-                        row_text.append(full_cell_text)
-                if row_text:
-                    all_text.append(" | ".join(row_text))
-
-        return "\n".join(all_text)
-
     # Function to extract the checked options from the text
     def extract_checked_options_from_text(self, text):
         checkbox_info = {}
@@ -122,12 +241,14 @@ class DOCXProcessor:
 
     # Run all steps
     def run_pipeline(self) -> List[Feature]:
-        self.extract_text()
-        self.clean_text()
-        self.extract_text()
-        self.clean_text()
-        self.extract_info()
-        self.extract_communication_info()
+        with tracing.span("docx.extract_text"):
+            self.extract_text()
+        with tracing.span("docx.clean_text"):
+            self.clean_text()
+        with tracing.span("docx.extract_info"):
+            self.extract_info()
+        with tracing.span("docx.extract_communication_info"):
+            self.extract_communication_info()
         
         final_info = {**self.personal_info, **self.tickable_info, **self.communication_info}
 
@@ -0,0 +1,64 @@
+import hashlib
+import os
+from typing import List
+
+from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils.disk_cache import DiskCache
+
+EXTRACTION_CACHE_DIR = os.getenv("ROBO_CLERK_CACHE_DIR", ".cache/extraction")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("ROBO_CLERK_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_default_cache = None
+
+
+def processor_cache_key(processor, file_bytes: bytes) -> str:
+    # Bumping a processor's VERSION invalidates everything it produced before
+    digest = hashlib.sha256()
+    digest.update(f"{processor.__module__}.{processor.__qualname__}:{getattr(processor, 'VERSION', '0')}\0".encode())
+    digest.update(file_bytes)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Features produced by a processor, keyed by the bytes of the input file.
+
+    The source path is not stored: cached features are re-attached to the
+    path they are looked up with, so a renamed copy of a file still hits.
+    """
+
+    def __init__(self, directory=EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+
+    def key(self, processor, file_path: str, data: bytes | None = None) -> str:
+        if data is not None:
+            return processor_cache_key(processor, data)
+        with open(file_path, "rb") as input_file:
+            return processor_cache_key(processor, input_file.read())
+
+    def get(self, processor, file_path: str, data: bytes | None = None) -> List[Feature] | None:
+        try:
+            key = self.key(processor, file_path, data)
+        except OSError:
+            return None
+        cached = self.store.get(key)
+        if cached is None:
+            return None
+        return [Feature(key=item["key"], value=item["value"], source=file_path) for item in cached]
+
+    def put(self, processor, file_path: str, features: List[Feature], data: bytes | None = None):
+        try:
+            key = self.key(processor, file_path, data)
+            self.store.put(key, [{"key": feature.key, "value": feature.value} for feature in features])
+        except (OSError, TypeError, ValueError) as e:
+            print(f"could not cache features of {file_path}: {e}")
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
@@ -0,0 +1,159 @@
+"""
+Descriptions read by the regex extractor, with the LLM asked only for what
+the regexes missed.
+
+The regex result is laid out like TXTProcessorSambanova's answer, so the
+features keep the keys of the LLM processor. When one of REQUIRED_FIELDS is
+still empty the LLM gets a short prompt asking for those fields alone; when
+none is, there is no call at all.
+"""
+
+import json
+from typing import List
+
+from robo_clerk.doc_processors.llm_cache import get_llm_cache
+from robo_clerk.doc_processors.text_extractor import extract_client_info_from_text
+from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import read_text, to_bytes
+
+# Fields checked against the other documents, with the hint the LLM gets for
+# each. Not the occupation: many clients (retired, between jobs) have no
+# current one, and asking would send most descriptions to the LLM for nothing.
+REQUIRED_FIELDS = {
+    "full_name": "Full Name",
+    "first_name": "First Name",
+    "surname": "Last Name",
+    "age": "Age as string",
+    "country_of_origin": "Country",
+    "current_city": "City",
+    "marital_status": "Marital Status",
+}
+
+
+def extraction_from_client_info(info: dict) -> dict:
+    """The regex extractor's client_info in the layout of the LLM extraction prompt."""
+    education = info["education"]
+    return {
+        "full_name": info["name"],
+        "first_name": info["account_holder_name"],
+        "surname": info["account_holder_surname"],
+        "age": info["age"],
+        "country_of_origin": info["country"],
+        "current_city": info["city"],
+        "marital_status": info["marital_status"],
+        "children_names": info["children"],
+        "children_count": len(info["children"]),
+        "current_occupation": info["occupation"],
+        "education_secondary_school": education.get("secondary_school", ""),
+        "education_secondary_graduation_year": education.get("secondary_graduation_year", ""),
+        "education_universities": education.get("university", []),
+        "education_university_graduation_years": education.get("university_graduation_years", []),
+        "career_history": info["career_history"],
+        "financial_details": {
+            "last_salary": info["last_salary"],
+            "savings": info["savings"],
+            "real_estate": info["real_estate"],
+            "inheritance": info["inheritance_details"],
+        },
+        "currency_preferences": {"chf": info["chf"], "eur": info["eur"], "usd": info["usd"]},
+    }
+
+
+def is_empty(value) -> bool:
+    if isinstance(value, str):
+        return not value.strip()
+    return value is None or value == [] or value == {}
+
+
+def missing_fields(extracted: dict) -> List[str]:
+    return [field for field in REQUIRED_FIELDS if is_empty(extracted.get(field))]
+
+
+def create_fields_prompt(client_description: str, fields: List[str]) -> str:
+    """
+    Ask for the given fields only
+    """
+    layout = ",\n".join(f'    "{field}": "{REQUIRED_FIELDS[field]}"' for field in fields)
+    return f"""Extract these fields of the client from the description, with exact values from the text.
+Answer with JSON only, use "" for a field the description does not mention.
+
+Client Description:
+{client_description}
+
+Extraction Rules:
+{{
+{layout}
+}}
+"""
+
+
+class TXTProcessorHybrid:
+    VERSION = "1"
+    # bump when create_fields_prompt changes, cached answers to the old prompt no longer apply
+    PROMPT_VERSION = "1"
+
+    def __init__(self, file_path, buffer=None):
+        self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
+        # False once the LLM could not fill the missing fields, so doc_master does not cache the regex-only result
+        self.cacheable = True
+
+    def fill_missing(self, client_description: str, fields: List[str]) -> dict:
+        """The LLM's values for fields; empty, and the result not cacheable, when it cannot be reached or answers nonsense."""
+        from robo_clerk.doc_processors.process_file_sambanova import TXTProcessorSambanova
+        from robo_clerk.doc_processors.sambanova_client import get_sambanova_client
+
+        try:
+            client = get_sambanova_client()
+        except Exception as e:
+            print(f"LLM unavailable, keeping the regex fields: {e}")
+            self.cacheable = False
+            return {}
+        # the fields asked for are part of the prompt, so part of the key
+        prompt_version = f"{self.PROMPT_VERSION}:{','.join(fields)}"
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            cached = llm_cache.get(client.model, prompt_version, client_description)
+            if cached is not None:
+                return cached
+
+        try:
+            with tracing.span("sambanova.chat_completion", model=client.model, fields=len(fields)):
+                response_text = client.complete(create_fields_prompt(client_description, fields), temperature=0.1, top_p=0.1)
+            answer = TXTProcessorSambanova.parse_response(response_text.strip())
+        except Exception as e:
+            print(f"Error filling {', '.join(fields)}: {e}")
+            self.cacheable = False
+            return {}
+        if not isinstance(answer, dict):
+            self.cacheable = False
+            return {}
+        filled = {field: answer[field] for field in fields if not is_empty(answer.get(field))}
+        if llm_cache is not None:
+            llm_cache.put(client.model, prompt_version, client_description, filled)
+        return filled
+
+    def extract_client_info(self, client_description: str) -> dict:
+        extracted = extraction_from_client_info(extract_client_info_from_text(client_description)["client_info"])
+        fields = missing_fields(extracted)
+        if fields:
+            extracted.update(self.fill_missing(client_description, fields))
+        return extracted
+
+    def run_pipeline(self) -> List[Feature]:
+        try:
+            client_info = self.extract_client_info(read_text(self.file_path, self.data))
+        except Exception as e:
+            print(f"Error processing client description: {e}")
+            return None
+        return [Feature(key=key, value=value, source=self.file_path) for key, value in client_info.items()]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        print(json.dumps(TXTProcessorHybrid(sys.argv[1]).extract_client_info(read_text(sys.argv[1])), indent=2, ensure_ascii=False))
+    else:
+        print("Usage: python hybrid_text.py [path_to_text_file]")
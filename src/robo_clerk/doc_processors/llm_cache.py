@@ -0,0 +1,57 @@
+import hashlib
+import os
+import threading
+
+from robo_clerk.utils.disk_cache import DiskCache
+
+LLM_CACHE_ENABLED = os.getenv("ROBO_CLERK_LLM_CACHE", "1") != "0"
+LLM_CACHE_DIR = os.getenv("ROBO_CLERK_LLM_CACHE_DIR", ".cache/llm")
+LLM_CACHE_MAX_BYTES = int(os.getenv("ROBO_CLERK_LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# seconds, 30 days by default; 0 keeps answers until they are evicted
+LLM_CACHE_TTL = float(os.getenv("ROBO_CLERK_LLM_CACHE_TTL", 30 * 24 * 3600))
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def llm_cache_key(model: str, prompt_version: str, text: str) -> str:
+    # A new model or prompt template gets its own answers
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{prompt_version}\0".encode())
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Parsed LLM answers, keyed by model, prompt template version and input text.
+
+    Only answers that parsed are stored, a failed call or unreadable answer
+    is asked again next time.
+    """
+
+    def __init__(self, directory=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL):
+        self.store = DiskCache(directory, max_bytes=max_bytes, ttl=ttl or None)
+
+    def get(self, model: str, prompt_version: str, text: str) -> dict | None:
+        return self.store.get(llm_cache_key(model, prompt_version, text))
+
+    def put(self, model: str, prompt_version: str, text: str, response: dict):
+        try:
+            self.store.put(llm_cache_key(model, prompt_version, text), response)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"could not cache LLM response: {e}")
+
+    def stats(self) -> dict:
+        return self.store.stats()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """The shared cache, None when ROBO_CLERK_LLM_CACHE=0."""
+    global _default_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
@@ -0,0 +1,149 @@
+"""
+Machine readable zone of TD3 (passport) documents: two lines of 44
+characters from A-Z, 0-9 and the "<" filler, with check digits over the
+document number, birth date, expiry date and the whole second line.
+
+No check digit covers the names on the first line, and they are
+transliterated (MÜLLER is written MUELLER), so they are only worth taking
+when the composite digit passes and names_agree with the name box.
+"""
+
+from datetime import date
+from difflib import SequenceMatcher
+import re
+import unicodedata
+
+MRZ_WEIGHTS = (7, 3, 1)
+MRZ_CHARACTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
+TD3_LINE_LENGTH = 44
+
+# OCR confusions that are safe to undo where only digits may stand
+DIGIT_FIXES = str.maketrans({"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "G": "6", "B": "8"})
+
+TD3_LINE_1 = re.compile(r"P[A-Z<]([A-Z<]{3})([A-Z<]+)")
+
+NAME_FIELDS = ("surname", "given_name")
+# ICAO 9303 transliterations that are not just the letter without its accent
+TRANSLITERATIONS = str.maketrans({
+    "Ä": "AE", "Å": "AA", "Æ": "AE", "Ö": "OE", "Ø": "OE", "Œ": "OE", "Ü": "UE",
+    "ß": "SS", "Þ": "TH", "Ĳ": "IJ", "Ð": "D", "Đ": "D", "Ł": "L", "Ħ": "H",
+})
+NOT_MRZ_LETTERS = re.compile(r"[^A-Z]+")
+# how close the box reading must be to the MRZ name, as a difflib ratio; OCR noise in the box passes, another name does not
+NAME_AGREEMENT = 0.8
+
+
+def mrz_check_digit(value: str) -> str:
+    total = 0
+    for index, char in enumerate(value):
+        if char.isdigit():
+            number = int(char)
+        elif char.isalpha():
+            number = ord(char) - ord("A") + 10
+        else:
+            number = 0
+        total += number * MRZ_WEIGHTS[index % 3]
+    return str(total % 10)
+
+
+def find_td3_lines(text: str) -> tuple | None:
+    """The last two lines of OCR output that look like TD3 lines, without spaces."""
+    lines = [line.replace(" ", "").upper() for line in text.splitlines()]
+    lines = [line for line in lines if len(line) >= TD3_LINE_LENGTH - 4]
+    if len(lines) < 2:
+        return None
+    return lines[-2], lines[-1]
+
+
+def mrz_date(value: str, expiry=False) -> str | None:
+    """YYMMDD as an ISO date; birth dates are in the past, expiry dates in this century."""
+    try:
+        year, month, day = int(value[0:2]), int(value[2:4]), int(value[4:6])
+        if expiry:
+            year += 2000
+        else:
+            year += 2000 if 2000 + year <= date.today().year else 1900
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def checked(field: str, check: str, digits_only=False) -> str | None:
+    """The field if its check digit matches, after undoing digit confusions where allowed."""
+    if digits_only:
+        field = field.translate(DIGIT_FIXES)
+    check = check.translate(DIGIT_FIXES)
+    if mrz_check_digit(field) == check:
+        return field
+    return None
+
+
+def composite_valid(line2: str) -> bool:
+    """The last digit of the second line checks number, birth date, expiry date and personal number with their digits."""
+    if len(line2) != TD3_LINE_LENGTH:
+        return False
+    composite = (
+        line2[0:9] + line2[9].translate(DIGIT_FIXES) + line2[13:20].translate(DIGIT_FIXES)
+        + line2[21:28].translate(DIGIT_FIXES) + line2[28:42] + line2[42].translate(DIGIT_FIXES)
+    )
+    return mrz_check_digit(composite) == line2[43].translate(DIGIT_FIXES)
+
+
+def mrz_letters(text: str, transliterate=True) -> str:
+    """text as the MRZ writes it, words separated by single spaces."""
+    text = text.upper()
+    if transliterate:
+        text = text.translate(TRANSLITERATIONS)
+    text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return NOT_MRZ_LETTERS.sub(" ", text).strip()
+
+
+def names_agree(mrz_name: str, box_text: str) -> bool:
+    """
+    Whether the name read from the MRZ is the one in the name box, the box
+    transliterated as ICAO prescribes or with accents simply dropped.
+    """
+    mrz_name = mrz_letters(mrz_name, transliterate=False)
+    if not mrz_name or not box_text:
+        return False
+    return any(
+        SequenceMatcher(None, mrz_name, mrz_letters(box_text, transliterate)).ratio() >= NAME_AGREEMENT
+        for transliterate in (True, False)
+    )
+
+
+def parse_td3(line1: str, line2: str) -> dict:
+    """
+    Fields of a TD3 zone that pass validation, named as the passport boxes are:
+    surname, given_name, passport_number, birth_date, sex and expiry_date
+    (dates in ISO format). Fields that fail are left out, and so are the
+    names unless the composite check digit passes; check those against the
+    boxes with names_agree before using them.
+    """
+    fields = {}
+    names = TD3_LINE_1.fullmatch(line1) if composite_valid(line2) else None
+    # without the "<<" separator there is no telling surname from given names
+    if names and "<<" in names.group(2):
+        surname, _, given_names = names.group(2).partition("<<")
+        surname = surname.replace("<", " ").strip()
+        if surname:
+            fields["surname"] = surname
+        # a line without trailing filler may have cut the given names short
+        given_names = given_names.replace("<", " ").strip()
+        if given_names and len(line1) == TD3_LINE_LENGTH and line1.endswith("<"):
+            fields["given_name"] = given_names
+
+    if len(line2) != TD3_LINE_LENGTH:
+        return fields
+    number = checked(line2[0:9], line2[9])
+    if number is not None and number.strip("<"):
+        fields["passport_number"] = number.replace("<", "")
+    birth = checked(line2[13:19], line2[19], digits_only=True)
+    if birth is not None and mrz_date(birth):
+        fields["birth_date"] = mrz_date(birth)
+    if line2[20] in "MF":
+        fields["sex"] = line2[20]
+    expiry = checked(line2[21:27], line2[27], digits_only=True)
+    if expiry is not None and mrz_date(expiry, expiry=True):
+        fields["expiry_date"] = mrz_date(expiry, expiry=True)
+    return fields
@@ -0,0 +1,242 @@
+"""
+Long-lived OCR worker processes.
+
+pytesseract starts a tesseract process (and loads the language model) for
+every call. The pool keeps a few workers alive, each holding an initialised
+engine, and feeds them images over a pipe. With tesserocr installed the
+engine lives inside the worker; without it the worker falls back to
+pytesseract, which still saves the interpreter and import start-up.
+
+Enable it with ROBO_CLERK_OCR_WORKERS=<n>. Jobs wait in a bounded queue (so
+callers block instead of piling up images in memory) and a worker that runs
+over ROBO_CLERK_OCR_TIMEOUT seconds on one job is killed and replaced.
+"""
+
+from concurrent.futures import Future
+import multiprocessing
+import os
+import queue
+import threading
+
+TESS_LANG = "eng"
+OCR_WORKERS = int(os.getenv("ROBO_CLERK_OCR_WORKERS", "0"))
+OCR_TIMEOUT = float(os.getenv("ROBO_CLERK_OCR_TIMEOUT", "30"))
+# queued jobs per worker before submit blocks
+QUEUE_FACTOR = 4
+
+TSV_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text"]
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def parse_tsv(tsv: str) -> dict:
+    """Tesseract TSV output as the column -> list dict pytesseract's image_to_data returns."""
+    data = {column: [] for column in TSV_COLUMNS}
+    for line in tsv.splitlines():
+        fields = line.split("\t")
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        fields += [""] * (len(TSV_COLUMNS) - len(fields))
+        for column, value in zip(TSV_COLUMNS, fields):
+            data[column].append(value if column == "text" else int(float(value)))
+    return data
+
+
+def parse_config(config: str) -> tuple:
+    """The page segmentation mode and -c variables of a tesseract command line config."""
+    page_segmentation_mode = None
+    variables = {}
+    arguments = config.split()
+    for flag, value in zip(arguments, arguments[1:]):
+        if flag == "--psm":
+            page_segmentation_mode = int(value)
+        elif flag == "-c" and "=" in value:
+            key, _, setting = value.partition("=")
+            variables[key] = setting
+    return page_segmentation_mode, variables
+
+
+class TesserocrEngine:
+    def __init__(self, lang):
+        import tesserocr
+        self.tesserocr = tesserocr
+        self.lang = lang
+        # one initialised engine per config, configs are few and fixed
+        self.apis = {}
+
+    def api(self, config: str):
+        if config not in self.apis:
+            api = self.tesserocr.PyTessBaseAPI(lang=self.lang)
+            page_segmentation_mode, variables = parse_config(config)
+            if page_segmentation_mode is not None:
+                api.SetPageSegMode(page_segmentation_mode)
+            for key, value in variables.items():
+                api.SetVariable(key, value)
+            self.apis[config] = api
+        return self.apis[config]
+
+    def image_to_string(self, image, config="") -> str:
+        api = self.api(config)
+        api.SetImage(image)
+        return api.GetUTF8Text()
+
+    def image_to_data(self, image, config="") -> dict:
+        api = self.api(config)
+        api.SetImage(image)
+        return parse_tsv(api.GetTSVText(0))
+
+
+class PytesseractEngine:
+    def __init__(self, lang):
+        import pytesseract
+        self.pytesseract = pytesseract
+        self.lang = lang
+
+    def image_to_string(self, image, config="") -> str:
+        return self.pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+    def image_to_data(self, image, config="") -> dict:
+        return self.pytesseract.image_to_data(image, lang=self.lang, config=config, output_type=self.pytesseract.Output.DICT)
+
+
+def create_engine(lang):
+    try:
+        return TesserocrEngine(lang)
+    except ImportError:
+        return PytesseractEngine(lang)
+
+
+def worker_main(connection, lang):
+    """Worker process: (kind, config, mode, size, pixels) in, ("ok", result) or ("error", message) out."""
+    from PIL import Image
+
+    engine = create_engine(lang)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        kind, config, mode, size, pixels = job
+        try:
+            image = Image.frombytes(mode, size, pixels)
+            # pytesseract writes the image to a temp file, uncompressed is cheaper
+            image.format = "BMP"
+            connection.send(("ok", getattr(engine, kind)(image, config)))
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class OCRWorker:
+    """One worker process and the parent end of its pipe."""
+
+    def __init__(self, context, lang):
+        self.context = context
+        self.lang = lang
+        self.start()
+
+    def start(self):
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(target=worker_main, args=(child_connection, self.lang), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def restart(self):
+        self.stop(kill=True)
+        self.start()
+
+    def stop(self, kill=False):
+        try:
+            if not kill:
+                self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.connection.close()
+        if kill:
+            self.process.kill()
+        self.process.join(timeout=5)
+
+    def run(self, kind, image, config, timeout):
+        if not self.process.is_alive():
+            self.restart()
+        self.connection.send((kind, config, image.mode, image.size, image.tobytes()))
+        if not self.connection.poll(timeout):
+            self.restart()
+            raise TimeoutError(f"OCR job took longer than {timeout}s")
+        status, result = self.connection.recv()
+        if status == "error":
+            raise RuntimeError(result)
+        return result
+
+
+class OCRPool:
+    def __init__(self, workers=None, timeout=OCR_TIMEOUT, max_queued=None, lang=TESS_LANG):
+        workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        # spawn: the parent runs threads, forking it is not safe
+        context = multiprocessing.get_context("spawn")
+        self.jobs = queue.Queue(maxsize=max_queued or workers * QUEUE_FACTOR)
+        self.workers = [OCRWorker(context, lang) for _ in range(workers)]
+        self.threads = [threading.Thread(target=self.dispatch, args=(worker,), daemon=True) for worker in self.workers]
+        for thread in self.threads:
+            thread.start()
+
+    def dispatch(self, worker: OCRWorker):
+        """Feed one worker, one job at a time, for as long as the pool is open."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                worker.stop()
+                return
+            future, kind, image, config = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(worker.run(kind, image, config, self.timeout))
+            except TimeoutError as e:
+                # run already replaced the stuck worker
+                future.set_exception(e)
+            except (EOFError, OSError) as e:
+                # the worker died under the job, the next one gets a fresh process
+                worker.restart()
+                future.set_exception(RuntimeError(f"OCR worker failed: {type(e).__name__}: {e}"))
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, kind: str, image, config="", block=True) -> Future:
+        """
+        kind is "image_to_string" or "image_to_data", config takes the --psm and
+        -c options of the tesseract command line; blocks while the queue is full.
+        """
+        future = Future()
+        self.jobs.put((future, kind, image, config), block=block)
+        return future
+
+    def image_to_string(self, image, config="") -> str:
+        return self.submit("image_to_string", image, config).result()
+
+    def image_to_data(self, image, config="") -> dict:
+        return self.submit("image_to_data", image, config).result()
+
+    def close(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_ocr_pool() -> OCRPool:
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = OCRPool(workers=OCR_WORKERS)
+        return _default_pool
@@ -2,40 +2,131 @@ import re
 from typing import List
 import unicodedata
 from PyPDF2 import PdfReader
-import pdfplumber
+from PyPDF2.generic import ArrayObject, ContentStream
 
 from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import document_source, to_bytes
+
+# Form XObjects can nest; real documents never go this deep
+MAX_XOBJECT_DEPTH = 5
+
+
+def has_image_xobject(resources, depth=0) -> bool:
+    """True if the resources, or a form XObject inside them, hold an image."""
+    if resources is None or depth > MAX_XOBJECT_DEPTH:
+        return False
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return False
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            return True
+        if subtype == "/Form" and has_image_xobject(xobject.get("/Resources"), depth + 1):
+            return True
+    return False
+
+
+def has_form_xobject(resources) -> bool:
+    """True if the resources declare a form XObject."""
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    if xobjects is None:
+        return False
+    return any(xobject.get_object().get("/Subtype") == "/Form" for xobject in xobjects.get_object().values())
+
+
+def content_data(contents) -> bytes:
+    """The decoded bytes of a page's /Contents, a stream or an array of them."""
+    contents = contents.get_object()
+    if isinstance(contents, ArrayObject):
+        return b"\n".join(stream.get_object().get_data() for stream in contents)
+    return contents.get_data()
+
+
+def draws_image(contents, resources, reader, depth=0) -> bool:
+    """
+    True if the content stream paints an image: an inline one (BI ... EI) or
+    an image XObject named by Do, directly or inside a form XObject it paints.
+    Resources that are declared but never painted do not count.
+    """
+    if contents is None or depth > MAX_XOBJECT_DEPTH:
+        return False
+    xobjects = resources.get_object().get("/XObject") if resources is not None else None
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    for operands, operator in ContentStream(contents, reader).operations:
+        if operator == b"INLINE IMAGE":
+            return True
+        if operator == b"Do" and operands and operands[0] in xobjects:
+            xobject = xobjects[operands[0]].get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                return True
+            # a form without resources of its own uses the page's
+            if subtype == "/Form" and draws_image(xobject, xobject.get("/Resources", resources), reader, depth + 1):
+                return True
+    return False
+
+
+def page_draws_image(page, reader) -> bool:
+    """What pdfplumber's page.images reported: images painted on the page, not the ones its resources merely declare."""
+    contents = page.get("/Contents")
+    if contents is None:
+        return False
+    resources = page.get("/Resources")
+    # most pages hold no image at all, the content stream is only parsed when one could be painted;
+    # a form XObject can paint an inline image of its own, so pages with forms are always parsed
+    if not has_form_xobject(resources) and not has_image_xobject(resources) and b"BI" not in content_data(contents):
+        return False
+    return draws_image(contents, resources, reader)
+
 
 class PDFProcessor:
-    def __init__(self, file_path):
+    VERSION = "4"
+
+    def __init__(self, file_path, buffer=None):
         self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
         self.text = ""
         self.form_fields = {}
         self.signature_found = False
+        self._reader = None
+
+    # 1. Parse the PDF once, every step below reads from the same document
+    @property
+    def reader(self) -> PdfReader:
+        if self._reader is None:
+            self._reader = PdfReader(document_source(self.file_path, self.data))
+        return self._reader
 
     # 2. Extracting text and form fields from PDF files
-    def extract_text_and_fields(self):
-        all_text = ""
+    def extract_fields(self):
         all_fields = {}
 
-        reader = PdfReader(self.file_path)
-
-        # Extract text
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                all_text += page_text + "\n"
-
-        # Extract form fields
-        fields = reader.get_fields()
+        fields = self.reader.get_fields()
         if fields:
             for key, field in fields.items():
                 value = field.get("/V")
                 all_fields[key] = str(value) if value is not None else None
 
-        self.text = all_text
         self.form_fields = all_fields
 
+    # Text is not part of the features, it is only extracted when asked for
+    def extract_text(self):
+        all_text = ""
+
+        for page in self.reader.pages:
+            page_text = page.extract_text()
+            if page_text:
+                all_text += page_text + "\n"
+
+        self.text = all_text
+
+    def extract_text_and_fields(self):
+        self.extract_text()
+        self.extract_fields()
+
     # 3. Cleaning the text
     def clean_text(self):
         text = unicodedata.normalize("NFKD", self.text)
@@ -56,21 +147,22 @@ class PDFProcessor:
 
     # 5. checking for signature
     def detect_signature_as_image(self):
-        with pdfplumber.open(self.file_path) as pdf:
-            page = pdf.pages[0] # We look only at the first page
-            images = page.images
-            self.signature_found = bool(images)
+        page = self.reader.pages[0] # We look only at the first page
+        self.signature_found = page_draws_image(page, self.reader)
 
-            if images:
-                print(f"Signature found.")
-                return True
-            else:
-                print(f"No signature found.")
-                return False
+        if self.signature_found:
+            print(f"Signature found.")
+            return True
+        else:
+            print(f"No signature found.")
+            return False
 
     def run_pipeline(self) -> List[Feature]:
-        self.extract_text_and_fields()
-        self.clean_text()
-        self.detect_signature_as_image()
+        with tracing.span("pdf.read"):
+            self.reader
+        with tracing.span("pdf.extract_fields"):
+            self.extract_fields()
+        with tracing.span("pdf.detect_signature_as_image"):
+            self.detect_signature_as_image()
 
         return self.extract_client_info()
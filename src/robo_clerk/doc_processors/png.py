@@ -1,50 +1,194 @@
 #-------------------------------------------------------------------------------------------------
 
 # # Fixed attempt 3 - improved
+import os
 from typing import List
-from PIL import Image, ImageEnhance, ImageFilter
+import numpy as np
+from PIL import Image
 import pytesseract
 
+from robo_clerk.doc_processors.mrz import MRZ_CHARACTERS, NAME_FIELDS, find_td3_lines, names_agree, parse_td3
+from robo_clerk.doc_processors.ocr_pool import OCR_WORKERS, get_ocr_pool
 from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import document_source, to_bytes
 
 # Supported OCR languages — include English
 TESS_LANG = "eng"
 
+# "crops" runs tesseract once per box, "page" runs it once on the whole passport
+# and sorts the words into the boxes by position; page is opt-in until its field
+# values have been checked against crops
+OCR_MODES = ("page", "crops")
+OCR_MODE = os.getenv("ROBO_CLERK_OCR_MODE", "crops")
 
-# Crop the image to remove the MRZ area
-def preprocess_image(image_path):
-    image = Image.open(image_path)
-    # Convert to grayscale
-    image = image.convert("L")
+# Read the machine readable zone first and only OCR the boxes for what it
+# does not hold or what fails its check digits; the name boxes are always
+# read, the MRZ names only replace them when the two agree
+MRZ_FIRST = os.getenv("ROBO_CLERK_PASSPORT_MRZ", "1") != "0"
+MRZ_BAND = (0, 730, 1200, 900)
+MRZ_CONFIG = f"--psm 6 -c tessedit_char_whitelist={MRZ_CHARACTERS}"
 
-    # Enhance contrast
-    image = ImageEnhance.Contrast(image).enhance(2)
+# Every passport is brought to this layout before the boxes are read
+PAGE_SIZE = (1200, 900)
+SHARPEN_BAND_ROWS = 128
+# ROBO_CLERK_OCR_BINARIZE=1 gives each OCR region its own Otsu threshold before
+# tesseract sees it; off until its accuracy on real passports has been measured
+BINARIZE = os.getenv("ROBO_CLERK_OCR_BINARIZE", "0") != "0"
 
-    # Apply sharpen filter
-    new_size = (1200, 900)  # e.g., (300, 200)
 
-    # Resize image
-    image = image.resize(new_size)  # ANTIALIAS gives better quality
-    # image = image.filter(ImageFilter.GaussianBlur)
-    image = image.filter(ImageFilter.SHARPEN)
-    
+# Crop the image to remove the MRZ area
+@tracing.traced("png.preprocess_image")
+def preprocess_image(image_path) -> np.ndarray:
+    """
+    Grayscale, contrast x2, resize to the passport layout and sharpen, as a
+    uint8 array. Same pixels as the PIL chain it replaces (convert("L"),
+    Contrast(2), resize, SHARPEN), but contrast is one lookup table, sharpen
+    works in place on a single array and the resize is skipped when the size
+    already fits.
+    """
+    # Convert to grayscale, the decoded page is dropped right away
+    gray = Image.open(image_path).convert("L")
+
+    # Enhance contrast: PIL blends with the rounded mean grey, 2 * value - mean
+    mean = int(np.asarray(gray).mean() + 0.5)
+    gray = gray.point([min(max(2 * value - mean, 0), 255) for value in range(256)])
+
+    if gray.size != PAGE_SIZE:
+        gray = gray.resize(PAGE_SIZE)
+
+    return sharpen(np.array(gray))
+
+
+def sharpen(pixels: np.ndarray) -> np.ndarray:
+    """
+    PIL's SHARPEN kernel (32 in the centre, -2 around it, scale 16), in place
+    and band by band so the int16 temporaries stay small. Border pixels are kept.
+    """
+    height = pixels.shape[0]
+    above = None
+    for start in range(1, height - 1, SHARPEN_BAND_ROWS):
+        stop = min(start + SHARPEN_BAND_ROWS, height - 1)
+        rows = pixels[start - 1:stop + 1].astype(np.int16)
+        if above is not None:
+            # the row above this band was already sharpened, use its original
+            rows[0] = above
+        above = rows[-2].copy()
+        # 3x3 box sum as two separable passes; the neighbours are the box minus the centre
+        across = rows[:, :-2] + rows[:, 1:-1] + rows[:, 2:]
+        box = across[:-2] + across[1:-1] + across[2:]
+        # (32 * centre - 2 * neighbours) / 16, rounded half up
+        band = (17 * rows[1:-1, 1:-1] - box + 4) >> 3
+        pixels[start:stop, 1:-1] = np.clip(band, 0, 255, out=band)
+    return pixels
+
+
+def otsu_threshold(pixels: np.ndarray) -> int:
+    """The grey level that best splits the pixels into ink and paper."""
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    weight_below = np.cumsum(histogram)
+    weight_above = weight_below[-1] - weight_below
+    sum_below = np.cumsum(histogram * np.arange(256))
+    mean_below = sum_below / np.maximum(weight_below, 1)
+    mean_above = (sum_below[-1] - sum_below) / np.maximum(weight_above, 1)
+    return int(np.argmax(weight_below * weight_above * (mean_below - mean_above) ** 2))
+
+
+def region_pixels(page: np.ndarray, box) -> np.ndarray:
+    left, top, right, bottom = box
+    pixels = page[top:bottom, left:right]
+    if BINARIZE:
+        pixels = np.where(pixels > otsu_threshold(pixels), 255, 0).astype(np.uint8)
+    return pixels
+
+
+def ocr_image(pixels: np.ndarray):
+    """A PIL view of the pixels that pytesseract hands over as an uncompressed BMP instead of a PNG."""
+    image = Image.fromarray(pixels)
+    image.format = "BMP"
     return image
 
 
+def ocr_page(page: np.ndarray, box_mapping: dict):
+    """The page for word-level OCR: with binarization only the boxes, each with its own threshold, on white."""
+    if not BINARIZE:
+        return ocr_image(page)
+    canvas = np.full_like(page, 255)
+    for left, top, right, bottom in box_mapping.values():
+        canvas[top:bottom, left:right] = region_pixels(page, (left, top, right, bottom))
+    return ocr_image(canvas)
+
+
+@tracing.traced("png.crop_and_get_text")
 def crop_and_get_text(image, box):
-    cropped_image = image.crop(box)
+    cropped_image = ocr_image(region_pixels(image, box))
     # cropped_image.save("cropped.png")
     text = pytesseract.image_to_string(cropped_image)
     return text.strip()
 
 
-# Main processing function
-def process_passport_image(image_path, output_path="./data/passport_data.json"):
-    image = preprocess_image(image_path)
-    # image.save("test.png")
-    
-    box_mapping = {
-        "country":(50, 0, image.width, 120),
+@tracing.traced("png.ocr_crops")
+def crops_to_text(image, box_mapping: dict) -> dict:
+    """All boxes at once on the OCR worker pool, one crop per job."""
+    pool = get_ocr_pool()
+    jobs = {key: pool.submit("image_to_string", ocr_image(region_pixels(image, box))) for key, box in box_mapping.items()}
+    return {key: job.result().strip() for key, job in jobs.items()}
+
+
+@tracing.traced("png.ocr_page")
+def ocr_words(image) -> List[dict]:
+    """Every word tesseract finds on the image, with its box, in reading order."""
+    if OCR_WORKERS:
+        data = get_ocr_pool().image_to_data(image)
+    else:
+        data = pytesseract.image_to_data(image, lang=TESS_LANG, output_type=pytesseract.Output.DICT)
+    words = []
+    for index, text in enumerate(data["text"]):
+        if not text.strip():
+            continue
+        words.append({
+            "text": text.strip(),
+            "line": (data["block_num"][index], data["par_num"][index], data["line_num"][index]),
+            "left": data["left"][index],
+            "top": data["top"][index],
+            "width": data["width"][index],
+            "height": data["height"][index],
+        })
+    return words
+
+
+def assign_words_to_boxes(words: List[dict], box_mapping: dict) -> dict:
+    """
+    Text of every box from page-level words: a word belongs to the box holding
+    its centre, words of one tesseract line are joined by spaces and lines by
+    newlines, the way image_to_string lays out a crop.
+    """
+    lines = {key: {} for key in box_mapping}
+    for word in words:
+        x = word["left"] + word["width"] / 2
+        y = word["top"] + word["height"] / 2
+        for key, (left, top, right, bottom) in box_mapping.items():
+            if left <= x < right and top <= y < bottom:
+                lines[key].setdefault(word["line"], []).append(word["text"])
+                break
+    return {key: "\n".join(" ".join(line) for line in box_lines.values()) for key, box_lines in lines.items()}
+
+
+@tracing.traced("png.read_mrz")
+def read_mrz(image) -> dict:
+    """The validated MRZ fields of the passport, an empty dict if there is no readable zone."""
+    band = ocr_image(region_pixels(image, MRZ_BAND))
+    if OCR_WORKERS:
+        text = get_ocr_pool().image_to_string(band, MRZ_CONFIG)
+    else:
+        text = pytesseract.image_to_string(band, lang=TESS_LANG, config=MRZ_CONFIG)
+    lines = find_td3_lines(text)
+    return parse_td3(*lines) if lines else {}
+
+
+def get_box_mapping(image) -> dict:
+    return {
+        "country":(50, 0, image.shape[1], 120),
         "surname":(50, 300, 300, 380),
         "given_name":(300, 300, 900, 380),
         "birth_date":(50, 420, 300, 480),
@@ -54,18 +198,46 @@ def process_passport_image(image_path, output_path="./data/passport_data.json"):
         "expiry_date":(300, 630, 800, 700),
         "passport_number":(700, 160, 1100, 200)
     }
+
+
+# Main processing function
+def process_passport_image(image_path, output_path="./data/passport_data.json"):
+    image = preprocess_image(image_path)
+    # image.save("test.png")
     
-    data = { key: crop_and_get_text(image, box) for key, box in box_mapping.items()}
+    box_mapping = get_box_mapping(image)
+
+    data = read_mrz(image) if MRZ_FIRST else {}
+    mrz_names = {key: data.pop(key) for key in NAME_FIELDS if key in data}
+    remaining = {key: box for key, box in box_mapping.items() if key not in data}
+
+    if remaining:
+        if OCR_MODE == "crops" and OCR_WORKERS:
+            data.update(crops_to_text(image, remaining))
+        elif OCR_MODE == "crops":
+            data.update({ key: crop_and_get_text(image, box) for key, box in remaining.items()})
+        else:
+            data.update(assign_words_to_boxes(ocr_words(ocr_page(image, remaining)), remaining))
+    for key, name in mrz_names.items():
+        if names_agree(name, data[key]):
+            data[key] = name
+    data = {key: data[key] for key in box_mapping}
     print(data)
     return data
 
 class PNGProcessor:
-    def __init__(self, file_path):
+    # the OCR settings are part of the version so cached results of different ones do not mix
+    VERSION = f"5-{OCR_MODE}" + ("-mrz" if MRZ_FIRST else "") + ("-binarized" if BINARIZE else "")
+    # with the OCR pool the work happens in its workers, the caller only waits
+    CPU_BOUND = not OCR_WORKERS
+
+    def __init__(self, file_path, buffer=None):
         self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
 
 
     def extract_client_info(self) -> List[Feature]:
-        data = process_passport_image(self.file_path)
+        data = process_passport_image(document_source(self.file_path, self.data))
         features: List[Feature] = [Feature(key=key, value=value, source=self.file_path) for key, value in data.items()]
         return features
         
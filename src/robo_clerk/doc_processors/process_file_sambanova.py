@@ -1,31 +1,29 @@
-import os
 import json
 import re
 from typing import List
-from dotenv import load_dotenv
-import openai
 
+from robo_clerk.doc_processors.llm_cache import get_llm_cache
+from robo_clerk.doc_processors.sambanova_client import get_sambanova_client
 from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import read_text, to_bytes
 
 
 class TXTProcessorSambanova:
-    def __init__(self, file_path):
-        # Load environment variables
-        load_dotenv()
+    VERSION = "1"
+    # bump when create_extraction_prompt changes, cached answers to the old prompt no longer apply
+    PROMPT_VERSION = "1"
 
+    def __init__(self, file_path, buffer=None):
         self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
 
-        # Initialize SambaNova API client
-        sambanova_api_key = os.getenv("SAMBANOVA_API_KEY")
-        if not sambanova_api_key:
-            raise ValueError("SAMBANOVA_API_KEY not found in environment variables")
+        # Shared SambaNova API client, created (and .env loaded) for the first file only
+        self.sambanova_client = get_sambanova_client()
+        self.llm_cache = get_llm_cache()
 
-        self.sambanova_client = openai.OpenAI(
-            api_key=sambanova_api_key,
-            base_url="https://api.sambanova.ai/v1"
-        )
-
-    def create_extraction_prompt(self, client_description):
+    @staticmethod
+    def create_extraction_prompt(client_description):
         """
         Create a detailed prompt for extracting comprehensive client information
         """
@@ -124,35 +122,49 @@ class TXTProcessorSambanova:
 
         """
 
+    @staticmethod
+    def parse_response(response_text):
+        """
+        The JSON object in the model's answer, raises json.JSONDecodeError
+        """
+        # Remove any code block markers or extra text
+        json_match = re.search(r'```json\n(.*?)```', response_text, re.DOTALL)
+        if json_match:
+            response_text = json_match.group(1)
+
+        # Parse the JSON
+        return json.loads(response_text)
+
     def extract_client_info(self, client_description):
         """
         Use SambaNova API to extract structured client information
         """
+        if self.llm_cache is not None:
+            cached = self.llm_cache.get(self.sambanova_client.model, self.PROMPT_VERSION, client_description)
+            if cached is not None:
+                return cached
+
         try:
             # Create extraction prompt
             prompt = self.create_extraction_prompt(client_description)
 
-            # Call SambaNova API
-            response = self.sambanova_client.chat.completions.create(
-                model='Meta-Llama-3.1-8B-Instruct',
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                top_p=0.1
-            )
+            # Call SambaNova API, retried and bounded by the shared client
+            with tracing.span("sambanova.chat_completion", model=self.sambanova_client.model):
+                response_text = self.sambanova_client.complete(
+                    prompt,
+                    temperature=0.1,
+                    top_p=0.1
+                )
 
             # Extract response content
-            response_text = response.choices[0].message.content.strip()
+            response_text = response_text.strip()
 
             # Attempt to parse JSON
             try:
-                # Remove any code block markers or extra text
-                json_match = re.search(r'```json\n(.*?)```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1)
-
-                # Parse the JSON
-                extracted_data = json.loads(response_text)
+                extracted_data = self.parse_response(response_text)
 
+                if self.llm_cache is not None:
+                    self.llm_cache.put(self.sambanova_client.model, self.PROMPT_VERSION, client_description, extracted_data)
                 return extracted_data
             except json.JSONDecodeError:
                 print("Failed to parse JSON. Raw response:")
@@ -169,8 +181,7 @@ class TXTProcessorSambanova:
         """
         try:
             # Read the file
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                client_description = file.read()
+            client_description = read_text(self.file_path, self.data)
 
             # Extract structured information
             client_info = self.extract_client_info(client_description)
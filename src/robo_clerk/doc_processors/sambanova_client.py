@@ -0,0 +1,157 @@
+"""
+One SambaNova (OpenAI-compatible) client shared by every description.
+
+Requests run on an event loop in a background thread, so processors stay
+synchronous while many descriptions are in flight: the async client keeps
+its connections pooled, a semaphore caps the requests in flight
+(SAMBANOVA_CONCURRENCY), 429 and 5xx answers and connection errors are
+retried with exponential backoff (honouring Retry-After, at most
+SAMBANOVA_MAX_RETRIES times) and every request, retries included, has to
+finish within SAMBANOVA_TIMEOUT seconds.
+
+SAMBANOVA_BASE_URL points the client somewhere else, e.g. the local stub
+of robo_clerk.sambanova_stub.
+"""
+
+import asyncio
+from concurrent.futures import Future
+import os
+import random
+import threading
+import time
+
+DEFAULT_BASE_URL = "https://api.sambanova.ai/v1"
+DEFAULT_MODEL = "Meta-Llama-3.1-8B-Instruct"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 5
+# full jitter backoff: a random wait up to BACKOFF_BASE * 2^attempt, capped
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+class SambaNovaClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        if not api_key:
+            raise ValueError("SAMBANOVA_API_KEY not found in environment variables")
+        self.model = model
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # only touched on the loop thread
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0}
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="sambanova-client", daemon=True)
+        self.thread.start()
+        # the semaphore and the connection pool belong to the loop, create them on it
+        try:
+            asyncio.run_coroutine_threadsafe(self.start(api_key, base_url), self.loop).result()
+        except BaseException:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            raise
+
+    async def start(self, api_key, base_url):
+        import openai
+
+        self.openai = openai
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        # retries and deadlines are handled here, not by the SDK
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=self.timeout)
+
+    def retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Seconds to wait before retrying after error, None if retrying would not help."""
+        if isinstance(error, self.openai.APIStatusError):
+            if error.status_code != 429 and error.status_code < 500:
+                return None
+            retry_after = error.response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), BACKOFF_MAX)
+                except ValueError:
+                    pass
+        elif not isinstance(error, self.openai.APIConnectionError):
+            return None
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    async def acomplete(self, prompt: str, timeout: float | None = None, **options) -> str:
+        """Content of the chat completion for one user prompt; options go to chat.completions.create."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self.stats["requests"] += 1
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise TimeoutError(f"SambaNova request missed its {timeout}s deadline")
+                self.stats["attempts"] += 1
+                response = await asyncio.wait_for(self.request(prompt, options), remaining)
+                return response.choices[0].message.content
+            except asyncio.TimeoutError:
+                self.stats["failures"] += 1
+                raise TimeoutError(f"SambaNova request missed its {timeout}s deadline") from None
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.stats["failures"] += 1
+                    raise
+            attempt += 1
+            self.stats["retries"] += 1
+            # the slot is free while waiting, other requests go ahead
+            await asyncio.sleep(delay)
+
+    async def request(self, prompt: str, options: dict):
+        async with self.semaphore:
+            return await self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                **options
+            )
+
+    def submit(self, prompt: str, **options) -> Future:
+        return asyncio.run_coroutine_threadsafe(self.acomplete(prompt, **options), self.loop)
+
+    def complete(self, prompt: str, **options) -> str:
+        return self.submit(prompt, **options).result()
+
+    def complete_many(self, prompts: list, **options) -> list:
+        """All prompts in flight at once (up to the concurrency limit); a failed one leaves its exception in the list."""
+        futures = [self.submit(prompt, **options) for prompt in prompts]
+        return [future.exception() or future.result() for future in futures]
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_sambanova_client() -> SambaNovaClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            from dotenv import load_dotenv
+
+            # .env is read once, when the first description needs the client
+            load_dotenv()
+            _default_client = SambaNovaClient(
+                api_key=os.getenv("SAMBANOVA_API_KEY"),
+                base_url=os.getenv("SAMBANOVA_BASE_URL", DEFAULT_BASE_URL),
+                model=os.getenv("SAMBANOVA_MODEL", DEFAULT_MODEL),
+                concurrency=int(os.getenv("SAMBANOVA_CONCURRENCY", DEFAULT_CONCURRENCY)),
+                timeout=float(os.getenv("SAMBANOVA_TIMEOUT", DEFAULT_TIMEOUT)),
+                max_retries=int(os.getenv("SAMBANOVA_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+            )
+        return _default_client
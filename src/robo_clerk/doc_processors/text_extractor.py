@@ -1,11 +1,241 @@
+from bisect import bisect_right
 import re
 import json
+from dataclasses import dataclass
 from typing import List
 
 from robo_clerk.doc_processors.types import Feature
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import read_text, to_bytes
 
+# Letters names, places and occupations are written with
+LETTERS = "A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż"
+LOWERCASE = "a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż"
+WORDS = f"[{LETTERS}\\s]"
+CAPITALISED = f"[A-Z][{LOWERCASE}]+"
 
+SENTENCE_END = re.compile(r"[.!?]+")
+LIST_SEPARATOR = re.compile(r" and |, ")
+# The only characters outside ASCII that IGNORECASE matches with ASCII
+# letters; with these folded, lowercasing keeps every offset in place
+IGNORECASE_FOLDS = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A compiled pattern with what is known about where its matches can be.
+
+    triggers: literals one of which every match contains, with no sentence
+    end between the start of the match and the trigger, so a match starts
+    in a sentence holding a trigger (lowercase for ignorecase rules; no
+    triggers means the whole text).
+    tail: a pattern every match ends with, reaching at least as far as the
+    match does, so no match ends past the furthest tail.
+    """
+    pattern: re.Pattern
+    triggers: tuple = ()
+    tail: re.Pattern | None = None
+    ignorecase: bool = False
+
+
+def rule(pattern: str, *triggers, tail: str | None = None, ignorecase=False) -> Rule:
+    return Rule(
+        re.compile(pattern, re.IGNORECASE if ignorecase else 0),
+        triggers,
+        # as a lookahead it finds overlapping occurrences too
+        re.compile(f"(?=({tail}))") if tail else None,
+        ignorecase,
+    )
+
+
+class Description:
+    """
+    A description split into sentences once. Every rule is only run from
+    the first sentence holding one of its triggers up to the end of its last
+    tail, which finds the same matches as running it over the whole text.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = None
+        self.sentence_starts = [0]
+        self.sentence_starts.extend(match.end() for match in SENTENCE_END.finditer(text))
+        # trigger -> offset of the first sentence holding it, None if there is none
+        self.trigger_sentences = {}
+        self.folded_trigger_sentences = {}
+        self.tail_ends = {}
+
+    def start(self, rule: Rule) -> int | None:
+        """Offset of the first sentence the rule can match in, None if no sentence holds a trigger."""
+        if not rule.triggers:
+            return 0
+        if rule.ignorecase:
+            if self.folded is None:
+                self.folded = self.text.translate(IGNORECASE_FOLDS).lower()
+            text, trigger_sentences = self.folded, self.folded_trigger_sentences
+        else:
+            text, trigger_sentences = self.text, self.trigger_sentences
+        start = None
+        for trigger in rule.triggers:
+            if trigger in trigger_sentences:
+                sentence = trigger_sentences[trigger]
+            else:
+                # triggers hold no sentence end, so the first occurrence is in the first sentence holding one
+                offset = text.find(trigger)
+                sentence = None if offset < 0 else self.sentence_starts[bisect_right(self.sentence_starts, offset) - 1]
+                trigger_sentences[trigger] = sentence
+            if sentence is not None and (start is None or sentence < start):
+                start = sentence
+        return start
+
+    def end(self, rule: Rule) -> int | None:
+        """Offset no match of the rule ends after, None if its tail is nowhere in the text."""
+        if rule.tail is None:
+            return len(self.text)
+        if rule.tail not in self.tail_ends:
+            self.tail_ends[rule.tail] = max((match.end(1) for match in rule.tail.finditer(self.text)), default=None)
+        return self.tail_ends[rule.tail]
+
+    def search(self, rule: Rule) -> re.Match | None:
+        start = self.start(rule)
+        end = None if start is None else self.end(rule)
+        return None if end is None else rule.pattern.search(self.text, start, end)
+
+    def finditer(self, rule: Rule):
+        start = self.start(rule)
+        end = None if start is None else self.end(rule)
+        return iter(()) if end is None else rule.pattern.finditer(self.text, start, end)
+
+    def findall(self, rule: Rule) -> list:
+        start = self.start(rule)
+        end = None if start is None else self.end(rule)
+        return [] if end is None else rule.pattern.findall(self.text, start, end)
+
+
+# Try multiple patterns for full name extraction
+NAME_RULES = [
+    rule(f"({WORDS}+) is (\\d+) years old", " years old"),
+    rule(f"({WORDS}+) and the RM", " and the RM"),
+    rule(f"({WORDS}+) and (\\w+) have been", " have been"),
+    rule(f"The RM (?:is|was|has) .* ({WORDS}+)'s", "The RM "),
+    rule(f"introduced to ({WORDS}+) at", "introduced to "),
+    rule(f"({WORDS}+) brings a wealth of", " brings a wealth of"),
+    rule(f"({WORDS}+) is currently", " is currently"),
+    rule(f"({WORDS}+) has been", " has been"),
+    rule(f"({WORDS}+) crossed paths", " crossed paths"),
+    rule(f"({WORDS}+) launched his career", " launched his career"),
+]
+# Look for common 3-part name pattern, then 2-part names
+THREE_PART_NAME = rule(f"({CAPITALISED} {CAPITALISED} {CAPITALISED})")
+TWO_PART_NAME = rule(f"({CAPITALISED} {CAPITALISED})(?!\\w)")
+
+AGE_RULES = [
+    rule(r"is (\d+) years old", " years old"),
+    rule(r"is a (\d+) year old", " year old"),
+    rule(r"is a (\d+)-year-old", "-year-old"),
+    rule(r"is a (\d+) year old \w+", " year old"),
+    rule(r"(\d+) year old \w+ from", " year old"),
+]
+
+# (rule, group holding the country)
+COUNTRY_RULES = [
+    (rule(r"from ([A-Za-z\s]+)\.(?!\w)", "from "), 1),
+    (rule(r"comes from ([A-Za-z\s]+)\.(?!\w)", "comes from "), 1),
+    (rule(r"comes from ([A-Za-z\s]+)(?=\s)", "comes from "), 1),
+    (rule(r"from ([A-Za-z\s]+)(?=\s|\.|$)", "from "), 1),
+    (rule(r"(\d+) year old .+ from ([A-Za-z\s]+)", " year old"), 2),
+]
+# Standardize country names
+COUNTRY_STANDARDIZATION = {
+    "Czech": "Czech Republic",
+    "USA": "United States",
+    "UK": "United Kingdom",
+    "UAE": "United Arab Emirates"
+}
+
+PROPERTY_CITY = rule(f"(?:apartment|property|townhouse|flat|house|condo|villa) (?:located |situated |)in ({WORDS}+?)(?:,|\\.|\\s|$)", " in ")
+LOCATION_LIST = rule(r"locations across ([^\.]+)", "locations across ")
+CITY_RULES = [
+    rule(f"retreat in ({WORDS}+)[,\\.]", "retreat in "),
+    rule(f"conference in ({WORDS}+)[,\\.]", "conference in "),
+    rule(f"in ({WORDS}+)\\. They", "in "),
+    rule(f"lives in ({WORDS}+)", "lives in "),
+    rule(f"residing in ({WORDS}+)", "residing in "),
+]
+
+# Checked in this order, the first that matches wins
+MARITAL_STATUS_RULES = [
+    (rule(r"currently divorced", "currently divorced", ignorecase=True), "Divorced"),
+    (rule(r"currently widowed", "currently widowed", ignorecase=True), "Widowed"),
+    (rule(r"(married|tied the knot|have been married)", "married", "tied the knot", ignorecase=True), "Married"),
+    (rule(r"currently single", "currently single", ignorecase=True), "Single"),
+]
+
+CHILDREN_COUNT = rule(r"(?:has|have) (\d+) (?:kids|children)", "has ", "have ")
+CHILDREN_NAMES = rule(r"called ([^\.]+)", "called ")
+PARENTS_OF = rule(r"parents of (\d+) children: ([^\.]+)", "parents of ")
+
+SECONDARY_EDUCATION_RULES = [
+    rule(r"(?:received|earned|completed) (?:his|her) secondary (?:school|education) (?:diploma |)from ([^\.]+) in (\d{4})", " secondary "),
+    rule(r"graduated from ([^\.]+) in (\d{4})", "graduated from "),
+    rule(r"finished secondary school at ([^\.]+) in (\d{4})", "finished secondary school at "),
+]
+UNIVERSITY_RULES = [
+    rule(r"earned (?:his|her) (?:degree|additionally degree) from ([^\.]+) in (\d{4})", "earned "),
+    rule(r"graduated from ([^\.]+) (?:with|in) .* in (\d{4})", "graduated from "),
+    rule(r"study at ([^\.]+) until (\d{4})", "study at "),
+    rule(r"attended ([^,\.]+) (?:and|until|which he|which she) graduated in (\d{4})", "attended "),
+]
+
+# Every "from <year> to <year or word>" at its longest
+YEAR_RANGE = r"from \d{4} to \w+"
+
+# Try to find current/last occupation: (rule, group holding the occupation)
+OCCUPATION_RULES = [
+    (rule(f"retired ({WORDS}+) from", "retired "), 1),
+    (rule(f"(\\d+) year old retired ({WORDS}+) from", " year old retired "), 2),
+    (rule(f"(\\d+) year old ({WORDS}+) from", " year old "), 2),
+    (rule(f"position of ({WORDS}+) (?:at|from) ([^,\\.]+).*?from (\\d{{4}}) to (\\d{{4}}|\\w+)", "position of ", tail=YEAR_RANGE), 1),
+    (rule(f"role of ({WORDS}+) at", "role of "), 1),
+]
+
+# Look for all job positions mentioned
+POSITION_RULES = [
+    rule(f"as (?:a|an) ({WORDS}+) at ([^,\\.]+).*?from (\\d{{4}}) to (\\d{{4}}|\\w+)", "as a", tail=YEAR_RANGE),
+    rule(f"position of ({WORDS}+) (?:at|from) ([^,\\.]+).*?from (\\d{{4}}) to (\\d{{4}}|\\w+)", "position of ", tail=YEAR_RANGE),
+    rule(f"worked as (?:a|an) ({WORDS}+) (?:at|from) ([^,\\.]+).*?from (\\d{{4}}) to (\\d{{4}}|\\w+)", "worked as a", tail=YEAR_RANGE),
+]
+# Also check for positions without explicit years
+POSITION_WITHOUT_YEARS_RULES = [
+    rule(f"worked as (?:a|an) ({WORDS}+) at ([^,\\.]+)", "worked as a"),
+    rule(f"position of ({WORDS}+) at ([^,\\.]+)", "position of "),
+    rule(f"role as (?:a|an) ({WORDS}+) at ([^,\\.]+)", "role as a"),
+]
+
+SALARY = rule(r"(?:earned|remuneration of|compensated with|salary of) (\d+) ([A-Z]{3}) p\.A\.",
+              "earned ", "remuneration of ", "compensated with ", "salary of ")
+SAVINGS_RULES = [
+    rule(r"saved (?:approximately |)(\d+) ([A-Z]{3})", "saved "),
+    rule(r"saving (\d+) ([A-Z]{3})", "saving "),
+    rule(r"saved[^0-9]+(\d+) ([A-Z]{3})", "saved"),
+]
+
+# Properties with locations and values
+PROPERTY = rule(f"(?:has|purchased|owns|bought) (?:a |)([{LOWERCASE}\\s]+) (?:located |situated |)in ({WORDS}+),?[^,\\.]+?(?:worth|valued at) ([0-9,.]+) ([A-Z]{{3}})",
+                "has ", "purchased ", "owns ", "bought ")
+STUNNING_PROPERTIES = rule(r"comprises (\d+) stunning properties[^\.]+ across ([^\.]+)", "comprises ")
+
+INHERITANCE_RULES = [
+    rule(f"(?:inheritance|inherited|received) (?:a |an |of |)(?:significant sum of |sum of |)(\\d+) ([A-Z]{{3}}) from (?:her|his) (?:late |)([a-z]+),\\s*(?:a |an |)(?:renowned |respected |prominent |well-known |)({WORDS}+?)[,\\.].*?in (\\d{{4}})",
+         "inheritance ", "inherited ", "received "),
+    rule(f"inheritance of (\\d+) ([A-Z]{{3}}) from (?:her|his) (?:late |)([a-z]+).*?({WORDS}+?)(?:,|\\.) in (\\d{{4}})", "inheritance of "),
+]
+
+
+@tracing.traced("txt.extract_client_info_from_text")
 def extract_client_info_from_text(text):
+    description = Description(text)
     result = {
         "client_info": {
             "account_name": "",
@@ -58,23 +288,9 @@ def extract_client_info_from_text(text):
     }
 
     # EXTRACT NAME
-    # Try multiple patterns for full name extraction
-    name_patterns = [
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) is (\d+) years old",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) and the RM",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) and (\w+) have been",
-        r"The RM (?:is|was|has) .* ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)'s",
-        r"introduced to ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) brings a wealth of",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) is currently",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) has been",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) crossed paths",
-        r"([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) launched his career"
-    ]
-
     full_name = None
-    for pattern in name_patterns:
-        match = re.search(pattern, text)
+    for name_rule in NAME_RULES:
+        match = description.search(name_rule)
         if match:
             full_name = match.group(1).strip()
             break
@@ -82,7 +298,7 @@ def extract_client_info_from_text(text):
     # If still not found, try to find repeated names in the text
     if not full_name:
         # Look for common 3-part name pattern
-        potential_names = re.findall(r'([A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+)', text)
+        potential_names = description.findall(THREE_PART_NAME)
         if potential_names:
             # Find the most frequently occurring name
             name_counts = {}
@@ -91,7 +307,7 @@ def extract_client_info_from_text(text):
             full_name = max(name_counts, key=name_counts.get)
         else:
             # Try 2-part names
-            potential_names = re.findall(r'([A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+ [A-Z][a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż]+)(?!\w)', text)
+            potential_names = description.findall(TWO_PART_NAME)
             if potential_names:
                 name_counts = {}
                 for name in potential_names:
@@ -114,57 +330,30 @@ def extract_client_info_from_text(text):
                 result["client_info"]["account_holder_surname"] = name_parts[-1]
 
     # EXTRACT AGE
-    age_patterns = [
-        r"is (\d+) years old",
-        r"is a (\d+) year old",
-        r"is a (\d+)-year-old",
-        r"is a (\d+) year old \w+",
-        r"(\d+) year old \w+ from"
-    ]
-
-    for pattern in age_patterns:
-        match = re.search(pattern, text)
+    for age_rule in AGE_RULES:
+        match = description.search(age_rule)
         if match:
             result["client_info"]["age"] = match.group(1)
             break
 
     # EXTRACT COUNTRY
-    country_patterns = [
-        r"from ([A-Za-z\s]+)\.(?!\w)",
-        r"comes from ([A-Za-z\s]+)\.(?!\w)",
-        r"comes from ([A-Za-z\s]+)(?=\s)",
-        r"from ([A-Za-z\s]+)(?=\s|\.|$)",
-        r"(\d+) year old .+ from ([A-Za-z\s]+)"
-    ]
-
-    for pattern in country_patterns:
-        match = re.search(pattern, text)
+    for country_rule, group in COUNTRY_RULES:
+        match = description.search(country_rule)
         if match:
-            if "year old" in pattern and len(match.groups()) > 1:
-                country = match.group(2).strip()
-            else:
-                country = match.group(1).strip()
-
-            # Standardize country names
-            country_standardization = {
-                "Czech": "Czech Republic",
-                "USA": "United States",
-                "UK": "United Kingdom",
-                "UAE": "United Arab Emirates"
-            }
-            result["client_info"]["country"] = country_standardization.get(country, country)
+            country = match.group(group).strip()
+            result["client_info"]["country"] = COUNTRY_STANDARDIZATION.get(country, country)
             break
 
     # EXTRACT CITY
     # Try to find cities from property locations first
-    property_city_matches = re.findall(r"(?:apartment|property|townhouse|flat|house|condo|villa) (?:located |situated |)in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)(?:,|\.|\s|$)", text)
+    property_city_matches = description.findall(PROPERTY_CITY)
     property_cities = [city.strip() for city in property_city_matches]
 
     # Also look for cities mentioned in location lists
-    location_matches = re.findall(r"locations across ([^\.]+)", text)
+    location_matches = description.findall(LOCATION_LIST)
     for match in location_matches:
         # Split by 'and' or commas
-        locations = re.split(r' and |, ', match)
+        locations = LIST_SEPARATOR.split(match)
         property_cities.extend([loc.strip() for loc in locations])
 
     # If we found property cities, use the first one as the client's city
@@ -172,79 +361,53 @@ def extract_client_info_from_text(text):
         result["client_info"]["city"] = property_cities[0]
     else:
         # Otherwise try direct city mentions
-        city_patterns = [
-            r"retreat in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)[,\.]",
-            r"conference in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)[,\.]",
-            r"in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)\. They",
-            r"lives in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)",
-            r"residing in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+)"
-        ]
-
-        for pattern in city_patterns:
-            match = re.search(pattern, text)
+        for city_rule in CITY_RULES:
+            match = description.search(city_rule)
             if match:
                 result["client_info"]["city"] = match.group(1).strip()
                 break
 
     # EXTRACT MARITAL STATUS
-    if re.search(r"currently divorced", text, re.IGNORECASE):
-        result["client_info"]["marital_status"] = "Divorced"
-    elif re.search(r"currently widowed", text, re.IGNORECASE):
-        result["client_info"]["marital_status"] = "Widowed"
-    elif re.search(r"(married|tied the knot|have been married)", text, re.IGNORECASE):
-        result["client_info"]["marital_status"] = "Married"
-    elif re.search(r"currently single", text, re.IGNORECASE):
-        result["client_info"]["marital_status"] = "Single"
+    for marital_status_rule, marital_status in MARITAL_STATUS_RULES:
+        if description.search(marital_status_rule):
+            result["client_info"]["marital_status"] = marital_status
+            break
 
     # EXTRACT CHILDREN
-    children_pattern1 = re.search(r"(?:has|have) (\d+) (?:kids|children)", text)
+    children_pattern1 = description.search(CHILDREN_COUNT)
     if children_pattern1:
         # Try to find child names
-        child_names_match = re.search(r"called ([^\.]+)", text)
+        child_names_match = description.search(CHILDREN_NAMES)
         if child_names_match:
             names_text = child_names_match.group(1)
             # Split names by 'and' or commas
-            names = re.split(r' and |, ', names_text)
+            names = LIST_SEPARATOR.split(names_text)
             result["client_info"]["children"] = [name.strip() for name in names]
         else:
             # Just record the number
             result["client_info"]["children"] = [f"Child {i+1}" for i in range(int(children_pattern1.group(1)))]
     elif "parents of" in text.lower():
-        children_match = re.search(r"parents of (\d+) children: ([^\.]+)", text)
+        children_match = description.search(PARENTS_OF)
         if children_match:
             names_text = children_match.group(2)
             # Split names by 'and' or commas
-            names = re.split(r' and |, ', names_text)
+            names = LIST_SEPARATOR.split(names_text)
             result["client_info"]["children"] = [name.strip() for name in names]
     elif "does not have any children" in text.lower():
         result["client_info"]["children"] = []
 
     # EXTRACT EDUCATION
     # Secondary education
-    secondary_edu_patterns = [
-        r"(?:received|earned|completed) (?:his|her) secondary (?:school|education) (?:diploma |)from ([^\.]+) in (\d{4})",
-        r"graduated from ([^\.]+) in (\d{4})",
-        r"finished secondary school at ([^\.]+) in (\d{4})"
-    ]
-
-    for pattern in secondary_edu_patterns:
-        match = re.search(pattern, text)
+    for secondary_education_rule in SECONDARY_EDUCATION_RULES:
+        match = description.search(secondary_education_rule)
         if match:
             result["client_info"]["education"]["secondary_school"] = match.group(1).strip()
             result["client_info"]["education"]["secondary_graduation_year"] = match.group(2)
             break
 
     # University education - multiple universities possible
-    university_patterns = [
-        r"earned (?:his|her) (?:degree|additionally degree) from ([^\.]+) in (\d{4})",
-        r"graduated from ([^\.]+) (?:with|in) .* in (\d{4})",
-        r"study at ([^\.]+) until (\d{4})",
-        r"attended ([^,\.]+) (?:and|until|which he|which she) graduated in (\d{4})"
-    ]
-
-    # Find all universities
-    for pattern in university_patterns:
-        for match in re.finditer(pattern, text):
+    for university_rule in UNIVERSITY_RULES:
+        for match in description.finditer(university_rule):
             university = match.group(1).strip()
             year = match.group(2)
 
@@ -254,37 +417,19 @@ def extract_client_info_from_text(text):
                 result["client_info"]["education"]["university_graduation_years"].append(year)
 
     # EXTRACT OCCUPATION
-    # Try to find current/last occupation
-    occupation_patterns = [
-        r"retired ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
-        r"(\d+) year old retired ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
-        r"(\d+) year old ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) from",
-        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
-        r"role of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at"
-    ]
-
-    for pattern in occupation_patterns:
-        match = re.search(pattern, text)
-        if match and not result["client_info"]["occupation"]:
-            if "year old retired" in pattern:
-                result["client_info"]["occupation"] = match.group(2).strip()
-            elif "year old" in pattern and "retired" not in pattern:
-                result["client_info"]["occupation"] = match.group(2).strip()
-            else:
-                result["client_info"]["occupation"] = match.group(1).strip()
+    for occupation_rule, group in OCCUPATION_RULES:
+        # a match can strip down to nothing, the next rule gets a go then
+        if result["client_info"]["occupation"]:
+            break
+        match = description.search(occupation_rule)
+        if match:
+            result["client_info"]["occupation"] = match.group(group).strip()
 
     # EXTRACT CAREER HISTORY
-    # Look for all job positions mentioned
-    position_patterns = [
-        r"as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
-        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)",
-        r"worked as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:at|from) ([^,\.]+).*?from (\d{4}) to (\d{4}|\w+)"
-    ]
-
     career_entries = []
 
-    for pattern in position_patterns:
-        for match in re.finditer(pattern, text):
+    for position_rule in POSITION_RULES:
+        for match in description.finditer(position_rule):
             position = match.group(1).strip()
             company = match.group(2).strip()
             start_year = match.group(3)
@@ -298,14 +443,8 @@ def extract_client_info_from_text(text):
             })
 
     # Also check for positions without explicit years
-    simpler_patterns = [
-        r"worked as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)",
-        r"position of ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)",
-        r"role as (?:a|an) ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) at ([^,\.]+)"
-    ]
-
-    for pattern in simpler_patterns:
-        for match in re.finditer(pattern, text):
+    for position_rule in POSITION_WITHOUT_YEARS_RULES:
+        for match in description.finditer(position_rule):
             position = match.group(1).strip()
             company = match.group(2).strip()
 
@@ -323,20 +462,14 @@ def extract_client_info_from_text(text):
         result["client_info"]["career_history"] = career_entries
 
     # EXTRACT LAST SALARY
-    salary_match = re.search(r"(?:earned|remuneration of|compensated with|salary of) (\d+) ([A-Z]{3}) p\.A\.", text)
+    salary_match = description.search(SALARY)
     if salary_match:
         result["client_info"]["last_salary"]["amount"] = salary_match.group(1)
         result["client_info"]["last_salary"]["currency"] = salary_match.group(2)
 
     # EXTRACT SAVINGS
-    savings_patterns = [
-        r"saved (?:approximately |)(\d+) ([A-Z]{3})",
-        r"saving (\d+) ([A-Z]{3})",
-        r"saved[^0-9]+(\d+) ([A-Z]{3})"
-    ]
-
-    for pattern in savings_patterns:
-        match = re.search(pattern, text)
+    for savings_rule in SAVINGS_RULES:
+        match = description.search(savings_rule)
         if match:
             result["client_info"]["savings"]["amount"] = match.group(1)
             result["client_info"]["savings"]["currency"] = match.group(2)
@@ -344,32 +477,27 @@ def extract_client_info_from_text(text):
 
     # EXTRACT REAL ESTATE
     # Method 1: Look for properties with locations and values
-    property_patterns = [
-        r"(?:has|purchased|owns|bought) (?:a |)([a-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+) (?:located |situated |)in ([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+),?[^,\.]+?(?:worth|valued at) ([0-9,.]+) ([A-Z]{3})"
-    ]
-
-    for pattern in property_patterns:
-        for match in re.finditer(pattern, text):
-            property_type = match.group(1).strip()
-            location = match.group(2).strip()
-            value = match.group(3).replace(',', '')
-            currency = match.group(4)
-
-            result["client_info"]["real_estate"].append({
-                "type": property_type,
-                "location": location,
-                "value": value,
-                "currency": currency
-            })
+    for match in description.finditer(PROPERTY):
+        property_type = match.group(1).strip()
+        location = match.group(2).strip()
+        value = match.group(3).replace(',', '')
+        currency = match.group(4)
+
+        result["client_info"]["real_estate"].append({
+            "type": property_type,
+            "location": location,
+            "value": value,
+            "currency": currency
+        })
 
     # Method 2: Look for the "stunning properties" pattern
-    property_count_match = re.search(r"comprises (\d+) stunning properties[^\.]+ across ([^\.]+)", text)
+    property_count_match = description.search(STUNNING_PROPERTIES)
     if property_count_match:
         count = int(property_count_match.group(1))
         locations_text = property_count_match.group(2)
 
         # Split locations by 'and' or commas
-        locations = re.split(r' and |, ', locations_text)
+        locations = LIST_SEPARATOR.split(locations_text)
 
         for i, location in enumerate(locations[:count]):  # Limit to the number mentioned
             result["client_info"]["real_estate"].append({
@@ -380,13 +508,8 @@ def extract_client_info_from_text(text):
             })
 
     # EXTRACT INHERITANCE DETAILS
-    inheritance_patterns = [
-        r"(?:inheritance|inherited|received) (?:a |an |of |)(?:significant sum of |sum of |)(\d+) ([A-Z]{3}) from (?:her|his) (?:late |)([a-z]+),\s*(?:a |an |)(?:renowned |respected |prominent |well-known |)([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)[,\.].*?in (\d{4})",
-        r"inheritance of (\d+) ([A-Z]{3}) from (?:her|his) (?:late |)([a-z]+).*?([A-Za-zÀ-ÖØ-öø-ÿĄąĆćĘęŁłŃńÓóŚśŹźŻż\s]+?)(?:,|\.) in (\d{4})"
-    ]
-
-    for pattern in inheritance_patterns:
-        match = re.search(pattern, text)
+    for inheritance_rule in INHERITANCE_RULES:
+        match = description.search(inheritance_rule)
         if match:
             result["client_info"]["inheritance_details"]["amount"] = match.group(1)
             result["client_info"]["inheritance_details"]["currency"] = match.group(2)
@@ -468,25 +591,27 @@ def extract_client_info_from_text(text):
     return result
 
 
-def process_text_file(file_path):
+def process_text_file(file_path, data=None):
     """
-    Process a text file and extract client information.
+    Process a text file (or its in-memory bytes) and extract client information.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text_content = file.read()
+        text_content = read_text(file_path, data)
         return extract_client_info_from_text(text_content)
     except Exception as e:
         print(f"Error processing text file: {e}")
         return {"error": str(e)}
 
 class TXTProcessor:
-    def __init__(self, file_path):
+    VERSION = "1"
+
+    def __init__(self, file_path, buffer=None):
         self.file_path = file_path
+        self.data = to_bytes(buffer) if buffer is not None else None
 
 
     def extract_client_info(self) -> List[Feature]:
-        data = process_text_file(self.file_path)["client_info"]
+        data = process_text_file(self.file_path, self.data)["client_info"]
         features: List[Feature] = [Feature(key=key, value=value, source=self.file_path) for key, value in data.items()]
         return features
         
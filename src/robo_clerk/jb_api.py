@@ -1,39 +1,22 @@
 import requests
-import base64
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from robo_clerk.utils import tracing
+from robo_clerk.utils.file import decode_client_documents, save_documents
 
 @dataclass
 class GameSession:
     session_id: str
     player_id: str
     client_id: str
+    # base64 documents of the current client, as sent by the API
+    client_data: dict = field(default_factory=dict, repr=False)
 
-def detect_file_extension(decoded_bytes):
-    if decoded_bytes.startswith(b'\x89PNG'):
-        return '.png'
-    elif decoded_bytes.startswith(b'PK') and b'word/' in decoded_bytes:
-        return '.docx'
-    elif decoded_bytes.startswith(b'%PDF'):
-        return '.pdf'
-    elif all(chr(b).isprintable() or chr(b).isspace() for b in decoded_bytes[:100]):
-        return '.txt'
-    else:
-        return '.txt'  # Just assume txt format
-
+@tracing.traced("jb_api.save_client_data")
 def process_client_data(client_data, save_dir="downloads"):
-    os.makedirs(save_dir, exist_ok=True)
-    for base_filename, b64_content in client_data.items():
-        try:
-            decoded = base64.b64decode(b64_content)
-            ext = detect_file_extension(decoded)
-            filename = f"{base_filename}{ext}" if not base_filename.endswith(ext) else base_filename
-            file_path = os.path.join(save_dir, filename)
-            with open(file_path, "wb") as f:
-                f.write(decoded)
-            print(f"Saved file: {file_path}")
-        except Exception as e:
-            print(f"Failed to save file {base_filename}: {e}")
+    save_documents(decode_client_documents(client_data), save_dir)
+
 
 def JB_start_game(api_url, api_key, player_name, save_dir="downloads"):
     headers = {
@@ -44,22 +27,25 @@ def JB_start_game(api_url, api_key, player_name, save_dir="downloads"):
         "player_name": player_name
     }
 
-    response = requests.post(f"{api_url}/start", json=payload, headers=headers)
+    with tracing.span("jb_api.start") as span:
+        response = requests.post(f"{api_url}/start", json=payload, headers=headers)
+        span["status_code"] = response.status_code
 
     if response.status_code != 200:
         raise Exception(f"API call failed: {response.status_code} - {response.text}")
 
     data = response.json()
 
-    # Save files from client_data.data if present
+    # Save files from client_data.data if present, save_dir=None keeps them in memory only
     client_data = data.get("client_data", {})
-    if client_data:
+    if client_data and save_dir is not None:
       process_client_data(client_data, save_dir)
 
     return GameSession(
         session_id=data.get("session_id", ""),
         player_id=data.get("player_id", ""),
-        client_id=data.get("client_id", "")
+        client_id=data.get("client_id", ""),
+        client_data=client_data
     )
 
 def JB_send_decision(api_url, api_key, game_session: GameSession, decision: str, save_dir="downloads"):
@@ -73,7 +59,9 @@ def JB_send_decision(api_url, api_key, game_session: GameSession, decision: str,
       "client_id": game_session.client_id
     }
 
-    response = requests.post(f"{api_url}/decision", json=payload, headers=headers)
+    with tracing.span("jb_api.decision", decision=decision) as span:
+        response = requests.post(f"{api_url}/decision", json=payload, headers=headers)
+        span["status_code"] = response.status_code
     data = response.json()
     status = data.get("status", '')
     score = data.get("score", '')
@@ -83,7 +71,9 @@ def JB_send_decision(api_url, api_key, game_session: GameSession, decision: str,
     
     if not gameover:
       client_data = data.get("client_data", '')
-      process_client_data(client_data, save_dir)
+      game_session.client_data = client_data or {}
+      if save_dir is not None:
+        process_client_data(client_data, save_dir)
       return True, data.get("client_id", "")
     return False, ""
     
\ No newline at end of file
@@ -1,13 +1,19 @@
 import os
 from dotenv import load_dotenv
-from robo_clerk.decider.judge import Decision, handcrafted_decision, manual_decision
-from robo_clerk.doc_processors.doc_master import process_documents
+from robo_clerk.decider.judge import Decision, handcrafted_decision_from_data, manual_decision
+from robo_clerk.doc_processors.doc_master import process_client_documents
+from robo_clerk.doc_processors.extraction_cache import get_extraction_cache
 from robo_clerk.jb_api import JB_send_decision, JB_start_game
+from robo_clerk.utils import tracing
 import time
 
 # Load the .env file from the project root
 load_dotenv()
 
+# Documents are processed in memory; set ROBO_CLERK_AUDIT=1 to also keep them
+# (downloads/) and the extracted features (data/client_data.json) on disk.
+AUDIT = os.getenv("ROBO_CLERK_AUDIT", "") not in ("", "0")
+
 def make_decision(manual: bool = True) -> Decision:
     if manual:
         return manual_decision()
@@ -18,17 +24,18 @@ def get_in_out_folders(suffix=""):
 def play_game():
     api_key = os.getenv("API_KEY")
     api_url = os.getenv("API_URL")
-    input_folder_path, output_folder_path = get_in_out_folders()
-    game_session = JB_start_game(api_url=api_url, api_key=api_key, player_name="Smiling Monkeys", save_dir=input_folder_path)
+    input_folder_path, output_folder_path = get_in_out_folders() if AUDIT else (None, None)
+    game_session = JB_start_game(api_url=api_url, api_key=api_key, player_name="Smiling Monkeys", save_dir=None)
     while True:
-        process_documents(input_folder_path, output_folder_path)
-        input_folder_path, output_folder_path = get_in_out_folders()
-        decision, _ = handcrafted_decision("data/client_data.json")
-        # decision = manual_decision()
-        # time.sleep(1)
-        print(f"DECISION: {decision.value}")
-        print(game_session)
-        success, client_id = JB_send_decision(api_url, api_key, game_session, decision=decision.value, save_dir=input_folder_path)
+        with tracing.span("game.client", client_id=game_session.client_id):
+            client_data = process_client_documents(game_session.client_data, output_folder_path, save_dir=input_folder_path,
+                                                   parallel=True, cache=get_extraction_cache())
+            decision, _ = handcrafted_decision_from_data(client_data)
+            # decision = manual_decision()
+            # time.sleep(1)
+            print(f"DECISION: {decision.value}")
+            print(game_session)
+            success, client_id = JB_send_decision(api_url, api_key, game_session, decision=decision.value, save_dir=None)
         game_session.client_id = client_id
         if success:
             print("✅ Good move! Keep going...\n")
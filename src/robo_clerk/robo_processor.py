@@ -1,6 +1,11 @@
+import argparse
 import os
+from robo_clerk.batch import run_batch
 from robo_clerk.decider.judge import Decision
 from robo_clerk.doc_processors.doc_master import process_documents
+from robo_clerk.doc_processors.extraction_cache import get_extraction_cache
+from robo_clerk.doc_processors.llm_cache import get_llm_cache
+from robo_clerk.utils.jsonl_sink import FEATURES_FILE
 from robo_clerk.utils.file import get_file_name, list_files_in_folder, list_folders_in_folder
 
 
@@ -14,12 +19,37 @@ def get_client_id_from_folder(folder_name):
     print(id)
     return int(id)
 
-def process_test_data():
-    for folder in list_folders_in_folder("./test_data"):
+def process_test_data_serial(input_folder="./test_data", output_folder="out"):
+    cache = get_extraction_cache()
+    for folder in list_folders_in_folder(input_folder):
         client_id = get_client_id_from_folder(folder_name=folder)
         print(client_id, get_result(client_id=client_id).value)
 
-        process_documents(folder, "out", output_file=f"client_data_{client_id}.json")
-        
+        process_documents(folder, output_folder, output_file=f"client_data_{client_id}.json", cache=cache)
+    print(f"extraction cache: {cache.stats()}")
+    if get_llm_cache() is not None:
+        print(f"LLM cache: {get_llm_cache().stats()}")
+
+def process_test_data(input_folder="./test_data", output_folder="out", workers=None, resume=True, manifest_path=None, sink_path=None):
+    folders = sorted(list_folders_in_folder(input_folder))
+    print(f"processing {len(folders)} client folders from {input_folder}")
+    run_batch(folders, output_folder, workers=workers, manifest_path=manifest_path, resume=resume, sink_path=sink_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract features for every client folder of a corpus")
+    parser.add_argument("--input", default="./test_data", help="folder holding one sub folder per client")
+    parser.add_argument("--output", default="out", help="where client_data_<id>.json files are written")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--manifest", default=None, help="checkpoint manifest (default: <output>/.manifest.jsonl)")
+    parser.add_argument("--no-resume", action="store_true", help="reprocess clients already in the manifest")
+    parser.add_argument("--sink", default=None, help=f"stream features into this JSONL file instead of one JSON per client (e.g. out/{FEATURES_FILE})")
+    parser.add_argument("--serial", action="store_true", help="process folders one by one in this process")
+    args = parser.parse_args()
+
+    if args.serial:
+        process_test_data_serial(args.input, args.output)
+    else:
+        process_test_data(args.input, args.output, workers=args.workers, resume=not args.no_resume, manifest_path=args.manifest, sink_path=args.sink)
+
 if __name__ == "__main__":
-    process_test_data()
\ No newline at end of file
+    main()
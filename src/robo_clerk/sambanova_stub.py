@@ -0,0 +1,179 @@
+"""
+OpenAI-compatible stand-in for the SambaNova API, to run the description
+processor and measure the client's throughput and retries offline.
+
+POST /v1/chat/completions answers after --latency seconds with the regex
+extractor's reading of the description in the prompt, laid out the way the
+extraction prompt asks for. --rate-limit and --error-rate make that share
+of requests fail with 429 (with Retry-After) and 503, and requests beyond
+--max-in-flight get a 429 like a real rate limiter would send.
+GET /v1/stats returns the counters.
+
+    robo-sambanova-stub --port 8090
+    SAMBANOVA_BASE_URL=http://localhost:8090/v1 SAMBANOVA_API_KEY=stub robo-clerk
+"""
+
+import argparse
+import http.server
+import json
+import random
+import re
+import threading
+import time
+
+from robo_clerk.doc_processors.hybrid_text import extraction_from_client_info
+from robo_clerk.doc_processors.text_extractor import extract_client_info_from_text
+
+PORT = 8090
+DESCRIPTION_IN_PROMPT = re.compile(r"Client Description:\s*(.*?)\s*Extraction Rules:", re.DOTALL)
+
+
+def completion_content(prompt: str) -> str:
+    """The description in the prompt, extracted by the regex extractor into the prompt's JSON layout."""
+    match = DESCRIPTION_IN_PROMPT.search(prompt)
+    info = extract_client_info_from_text(match.group(1) if match else prompt)["client_info"]
+    # fenced like the model tends to answer
+    return "```json\n" + json.dumps(extraction_from_client_info(info), indent=2) + "\n```"
+
+
+class StubState:
+    def __init__(self, latency=0.2, rate_limit=0.0, error_rate=0.0, max_in_flight=16, retry_after=1, seed=None):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {"requests": 0, "completions": 0, "rate_limited": 0, "errors": 0, "max_in_flight": 0}
+
+    def admit(self) -> int | None:
+        """None to serve the request, otherwise the error status to answer with."""
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.in_flight >= self.max_in_flight or self.random.random() < self.rate_limit:
+                self.stats["rate_limited"] += 1
+                return 429
+            if self.random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+            return None
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.stats["completions"] += 1
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients keep their pooled connections open
+    protocol_version = "HTTP/1.1"
+    state: StubState = None
+
+    def send_json(self, status: int, content: dict, headers: dict | None = None):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up (deadline) before the answer came
+            pass
+
+    def send_error_json(self, status: int, message: str, error_type: str, headers: dict | None = None):
+        self.send_json(status, {"error": {"message": message, "type": error_type, "code": status}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/stats":
+            with self.state.lock:
+                self.send_json(200, dict(self.state.stats, in_flight=self.state.in_flight))
+        elif self.path.rstrip("/") == "/v1/models":
+            self.send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self.send_error_json(404, f"{self.path} not found", "not_found_error")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self.send_error_json(404, f"{self.path} not found", "not_found_error")
+            return
+        try:
+            request = json.loads(body)
+            prompt = "\n".join(message["content"] for message in request["messages"] if message.get("role") == "user")
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_error_json(400, f"bad request: {e}", "invalid_request_error")
+            return
+
+        status = self.state.admit()
+        if status == 429:
+            self.send_error_json(429, "rate limit exceeded", "rate_limit_error", {"Retry-After": str(self.state.retry_after)})
+            return
+        if status is not None:
+            self.send_error_json(status, "service unavailable", "server_error")
+            return
+        try:
+            time.sleep(self.state.latency)
+            content = completion_content(prompt)
+        finally:
+            self.state.release()
+        self.send_json(200, {
+            "id": f"stub-{time.monotonic_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()), "total_tokens": len(prompt.split()) + len(content.split())},
+        })
+
+    def log_message(self, format, *args):
+        # one line per request drowns the benchmark output
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def create_stub_server(port=PORT, host="127.0.0.1", **settings) -> StubServer:
+    """A stub server with its own state, port 0 picks a free one; call serve_forever (or start_stub_server)."""
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState(**settings)})
+    return StubServer((host, port), handler)
+
+
+def start_stub_server(port=0, **settings) -> StubServer:
+    """A stub server answering from a background thread, for benchmarks; stop it with shutdown()."""
+    server = create_stub_server(port, **settings)
+    threading.Thread(target=server.serve_forever, name="sambanova-stub", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible SambaNova stub for offline runs")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="concurrent requests before 429s")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = create_stub_server(args.port, args.host, latency=args.latency, rate_limit=args.rate_limit,
+                                error_rate=args.error_rate, max_in_flight=args.max_in_flight,
+                                retry_after=args.retry_after, seed=args.seed)
+    print(f"SambaNova stub on http://{args.host}:{server.server_address[1]}/v1")
+    with server:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
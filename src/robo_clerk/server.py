@@ -5,9 +5,40 @@ import os
 import random
 
 from robo_clerk.decider import judge
+from robo_clerk.utils.jsonl_sink import FEATURES_FILE, INDEX_SUFFIX, JSONLFeatureReader
 
 PORT = 8000
 JSON_FOLDER = "out"
+FEATURES_PATH = os.path.join(JSON_FOLDER, FEATURES_FILE)
+
+_features_reader = None
+_features_index_mtime = None
+
+
+def get_features_reader():
+    """Reader over the batch JSONL sink, reloaded when the index changes."""
+    global _features_reader, _features_index_mtime
+    if not os.path.exists(FEATURES_PATH):
+        return None
+    index_path = FEATURES_PATH + INDEX_SUFFIX
+    mtime = os.path.getmtime(index_path) if os.path.exists(index_path) else None
+    if _features_reader is None or mtime != _features_index_mtime:
+        _features_reader = JSONLFeatureReader(FEATURES_PATH)
+        _features_index_mtime = mtime
+    return _features_reader
+
+
+def load_random_client():
+    reader = get_features_reader()
+    if reader is not None and len(reader) > 0:
+        return reader.get(random.choice(reader.client_ids()))["features"]
+
+    files = [f for f in os.listdir(JSON_FOLDER) if f.endswith(".json")]
+    if not files:
+        return None
+    random_file = random.choice(files)
+    with open(os.path.join(JSON_FOLDER, random_file), "r") as f:
+        return json.load(f)
 
 
 class RandomPoemHandler(http.server.SimpleHTTPRequestHandler):
@@ -32,8 +63,8 @@ class RandomPoemHandler(http.server.SimpleHTTPRequestHandler):
             self.wfile.write(json.dumps({"error": "Only /next-client is supported"}).encode())
             return
 
-        files = [f for f in os.listdir(JSON_FOLDER) if f.endswith(".json")]
-        if not files:
+        content = load_random_client()
+        if content is None:
             self.send_response(404)
             self.send_cors_headers()
             self.send_header('Content-Type', 'application/json')
@@ -41,13 +72,9 @@ class RandomPoemHandler(http.server.SimpleHTTPRequestHandler):
             self.wfile.write(json.dumps({"error": "No poems found"}).encode())
             return
 
-        random_file = random.choice(files)
-        with open(os.path.join(JSON_FOLDER, random_file), "r") as f:
-            content = json.load(f)
-
         try:
             # If you're using the judge module
-            decision, result = judge.handcrafted_decision(os.path.join(JSON_FOLDER, random_file))
+            decision, result = judge.handcrafted_decision_from_data(content)
             content = {**content, **result}
             content["decision"] = decision.value
         except:
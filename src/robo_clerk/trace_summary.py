@@ -0,0 +1,61 @@
+import argparse
+import json
+import math
+import os
+from collections import defaultdict
+
+from robo_clerk.utils.tracing import TRACE_FILE_ENV
+
+
+def percentile(sorted_values, fraction):
+    # nearest rank on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def load_durations(trace_path):
+    durations = defaultdict(list)
+    with open(trace_path, "r") as trace_file:
+        for line in trace_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            durations[record["name"]].append(record["duration_ms"])
+    return durations
+
+
+def summarize(trace_path):
+    rows = []
+    for name, values in load_durations(trace_path).items():
+        values.sort()
+        rows.append({
+            "stage": name,
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print p50/p95/p99 per stage of a trace file")
+    parser.add_argument("trace_file", nargs="?", default=os.getenv(TRACE_FILE_ENV, "trace.jsonl"))
+    args = parser.parse_args()
+
+    rows = summarize(args.trace_file)
+    print(f"{'stage':<42} {'count':>7} {'total ms':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        print(
+            f"{row['stage']:<42} {row['count']:>7} {row['total_ms']:>11.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import json
+import os
+import time
+
+from robo_clerk.utils.file import write_json_atomic
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class DiskCache:
+    """
+    JSON values on disk, one file per key, bounded by total size.
+
+    A file's mtime is its last access time: hits touch the file and the
+    least recently used entries are deleted once max_bytes is exceeded,
+    down to EVICTION_TARGET of the budget so eviction does not run on every put.
+
+    With a ttl (seconds) values are stored with their write time and an
+    entry older than that is a miss, and is deleted, when it is looked up.
+    """
+
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float | None = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+        # key -> (size, last access); built on the first write
+        self._index = None
+        self._total_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r") as cache_file:
+                value = json.load(cache_file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if self.ttl:
+            if not isinstance(value, dict) or time.time() - value.get("stored_at", 0) > self.ttl:
+                self.misses += 1
+                self.expired += 1
+                self._remove(key)
+                return None
+            value = value.get("value")
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if self._index is not None and key in self._index:
+            self._index[key] = (self._index[key][0], time.time())
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        path = self._path(key)
+        if self.ttl:
+            value = {"stored_at": time.time(), "value": value}
+        write_json_atomic(path, value, indent=None)
+        self.stores += 1
+
+        self._load_index()
+        size = os.path.getsize(path)
+        previous_size, _ = self._index.get(key, (0, 0))
+        self._index[key] = (size, time.time())
+        self._total_bytes += size - previous_size
+        self._evict()
+
+    def _remove(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        if self._index is not None and key in self._index:
+            self._total_bytes -= self._index.pop(key)[0]
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp_") or not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                self._index[entry.name[:-len(".json")]] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * self.EVICTION_TARGET
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
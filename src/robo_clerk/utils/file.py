@@ -1,5 +1,9 @@
+import base64
 from enum import Enum
+import io
+import json
 import os
+import tempfile
 
 class FileType(Enum):
     DOCX = 'docx'
@@ -29,4 +33,90 @@ def list_files_in_folder(folder_path: str):
             yield full_path
 
 def get_file_name(file_path: str) -> str:
-    return os.path.basename(file_path)
\ No newline at end of file
+    return os.path.basename(file_path)
+
+def current_umask() -> int:
+    # the umask can only be read by setting it; done once at import, before any threads write
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# mkstemp creates its files 0600, the written file gets the mode open() would give it
+FILE_MODE = 0o666 & ~current_umask()
+
+def write_json_atomic(file_path: str, data, indent=2):
+    """
+    Write JSON to a temp file in the destination folder and rename it over the
+    target, so readers never see a half-written file.
+    """
+    folder = os.path.dirname(file_path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(data, tmp_file, indent=indent)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def to_bytes(buffer) -> bytes:
+    """Bytes of an in-memory document given as bytes or a file-like object."""
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        return bytes(buffer)
+    if hasattr(buffer, "getvalue"):
+        return buffer.getvalue()
+    buffer.seek(0)
+    return buffer.read()
+
+def document_source(file_path: str, data: bytes | None = None):
+    """What to hand a parser that takes a path or a file-like object: the in-memory bytes if given."""
+    if data is not None:
+        return io.BytesIO(data)
+    return file_path
+
+def read_text(file_path: str, data: bytes | None = None) -> str:
+    if data is not None:
+        # decoded like text-mode open below, newlines included
+        return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8").read()
+    with open(file_path, "r", encoding="utf-8") as file:
+        return file.read()
+
+def detect_file_extension(decoded_bytes):
+    if decoded_bytes.startswith(b'\x89PNG'):
+        return '.png'
+    elif decoded_bytes.startswith(b'PK') and b'word/' in decoded_bytes:
+        return '.docx'
+    elif decoded_bytes.startswith(b'%PDF'):
+        return '.pdf'
+    elif all(chr(b).isprintable() or chr(b).isspace() for b in decoded_bytes[:100]):
+        return '.txt'
+    else:
+        return '.txt'  # Just assume txt format
+
+def decode_client_documents(client_data: dict) -> dict:
+    """File name -> bytes for the base64 documents of a game API response."""
+    documents = {}
+    for base_filename, b64_content in client_data.items():
+        try:
+            decoded = base64.b64decode(b64_content)
+        except Exception as e:
+            print(f"Failed to decode file {base_filename}: {e}")
+            continue
+        ext = detect_file_extension(decoded)
+        filename = f"{base_filename}{ext}" if not base_filename.endswith(ext) else base_filename
+        documents[filename] = decoded
+    return documents
+
+def save_documents(documents: dict, save_dir="downloads"):
+    os.makedirs(save_dir, exist_ok=True)
+    for filename, decoded in documents.items():
+        try:
+            file_path = os.path.join(save_dir, filename)
+            with open(file_path, "wb") as f:
+                f.write(decoded)
+            print(f"Saved file: {file_path}")
+        except Exception as e:
+            print(f"Failed to save file {filename}: {e}")
@@ -0,0 +1,150 @@
+import json
+import os
+
+FEATURES_FILE = "features.jsonl"
+INDEX_SUFFIX = ".idx"
+
+
+def truncate_torn_tail(path: str):
+    """Drop a trailing line without "\n" left by an interrupted write."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as data_file:
+        size = data_file.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        data_file.seek(size - 1)
+        if data_file.read(1) == b"\n":
+            return
+        position = size
+        while position > 0:
+            chunk_start = max(0, position - 4096)
+            data_file.seek(chunk_start)
+            chunk = data_file.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                data_file.truncate(chunk_start + newline + 1)
+                return
+            position = chunk_start
+        data_file.truncate(0)
+
+
+class JSONLFeatureSink:
+    """
+    Append-only JSONL file with one compact line per client, plus an index
+    file of "<client_id>\\t<byte offset>" lines so a single client can be read
+    back with one seek.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # appending after a torn line would corrupt the next record
+        truncate_torn_tail(self.path)
+        truncate_torn_tail(self.index_path)
+        self._data_file = open(self.path, "ab")
+        self._index_file = open(self.index_path, "a")
+
+    def write(self, client_id, features: dict, timing: dict | None = None):
+        line = json.dumps({"client_id": str(client_id), "features": features, "timing": timing or {}}, separators=(",", ":"))
+        offset = self._data_file.tell()
+        self._data_file.write(line.encode("utf-8") + b"\n")
+        self._data_file.flush()
+        self._index_file.write(f"{client_id}\t{offset}\n")
+        self._index_file.flush()
+
+    def close(self):
+        self._data_file.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONLFeatureReader:
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.offsets = self._load_index()
+
+    def _load_index(self) -> dict:
+        offsets = {}
+        if not os.path.exists(self.index_path):
+            return self._rebuild_index()
+        with open(self.index_path, "r") as index_file:
+            for line in index_file:
+                client_id, _, offset = line.rstrip("\n").partition("\t")
+                if offset:
+                    # the latest line for a client wins, like a dict update
+                    offsets[client_id] = int(offset)
+        return offsets
+
+    def _rebuild_index(self) -> dict:
+        offsets = {}
+        for offset, record in self._scan():
+            offsets[record["client_id"]] = offset
+        return offsets
+
+    def _scan(self):
+        with open(self.path, "rb") as data_file:
+            offset = 0
+            for line in data_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn last line of an interrupted run
+                    record = None
+                if record is not None:
+                    yield offset, record
+                offset += len(line)
+
+    def client_ids(self):
+        return list(self.offsets)
+
+    def get(self, client_id) -> dict | None:
+        offset = self.offsets.get(str(client_id))
+        if offset is None:
+            return None
+        with open(self.path, "rb") as data_file:
+            data_file.seek(offset)
+            try:
+                record = json.loads(data_file.readline())
+            except ValueError:
+                record = None
+        if record is None or record["client_id"] != str(client_id):
+            # stale or damaged index, fall back to a full scan
+            self.offsets = self._rebuild_index()
+            offset = self.offsets.get(str(client_id))
+            if offset is None:
+                return None
+            with open(self.path, "rb") as data_file:
+                data_file.seek(offset)
+                record = json.loads(data_file.readline())
+        return record
+
+    def scan(self):
+        """Every record in file order, the history: a client written twice shows up twice."""
+        for _, record in self._scan():
+            yield record
+
+    def __iter__(self):
+        """The latest record of every client, as len() counts them, in file order."""
+        with open(self.path, "rb") as data_file:
+            for client_id, offset in sorted(self.offsets.items(), key=lambda item: item[1]):
+                data_file.seek(offset)
+                try:
+                    record = json.loads(data_file.readline())
+                except ValueError:
+                    record = None
+                if record is None or record["client_id"] != client_id:
+                    # stale or damaged index, get rebuilds it
+                    record = self.get(client_id)
+                if record is not None:
+                    yield record
+
+    def __len__(self):
+        return len(self.offsets)
@@ -0,0 +1,106 @@
+"""
+Lightweight spans for timing pipeline stages.
+
+Tracing is off unless ROBO_CLERK_TRACE_FILE is set (or set_trace_file is
+called); spans are then appended to that file as JSON lines with trace,
+span and parent ids. `poetry run robo-trace-summary` prints percentiles
+per stage.
+"""
+
+from contextlib import contextmanager
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+TRACE_FILE_ENV = "ROBO_CLERK_TRACE_FILE"
+
+_trace_file = os.getenv(TRACE_FILE_ENV) or None
+# (trace_id, span_id) of the innermost open span
+_current = contextvars.ContextVar("robo_clerk_span", default=None)
+_write_lock = threading.Lock()
+
+
+def set_trace_file(path: str | None):
+    """Enable (or disable with None) tracing; worker processes started later inherit it."""
+    global _trace_file
+    _trace_file = path
+    if path:
+        os.environ[TRACE_FILE_ENV] = path
+    else:
+        os.environ.pop(TRACE_FILE_ENV, None)
+
+
+def enabled() -> bool:
+    return _trace_file is not None
+
+
+def current_context():
+    """The open span, to hand to work running in another process."""
+    return _current.get()
+
+
+@contextmanager
+def attach(context):
+    """Continue a trace started elsewhere, e.g. in the parent of a pool worker."""
+    token = _current.set(context)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _write(record: dict):
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        with open(_trace_file, "a") as trace_file:
+            trace_file.write(line)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    if _trace_file is None:
+        yield attributes
+        return
+
+    parent = _current.get()
+    trace_id = parent[0] if parent else uuid.uuid4().hex[:16]
+    span_id = uuid.uuid4().hex[:16]
+    token = _current.set((trace_id, span_id))
+    start_time = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        # callers may add attributes to the yielded dict while the span is open
+        yield attributes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        _write({
+            "name": name,
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent[1] if parent else None,
+            "start": start_time,
+            "duration_ms": round(duration_ms, 3),
+            "pid": os.getpid(),
+            "error": error,
+            "attributes": attributes,
+        })
+
+
+def traced(name: str):
+    """Decorator form of span for whole functions and methods."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
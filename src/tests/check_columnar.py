@@ -0,0 +1,109 @@
+"""
+judge_table against judge_many on clients with missing, empty and None fields.
+
+Usage from project root:
+    poetry run python3 src/tests/check_columnar.py
+
+Every client of a seeded random corpus is judged one by one with judge_many
+and as a column table with judge_table. The check fails if a decision or a
+result differs, or if judge_table raises on a client judge_many accepts.
+"""
+
+import random
+import sys
+
+from robo_clerk.decider.columnar import ClientTable, judge_table
+from robo_clerk.decider.judge import POLITICALLY_EXPOSED, Judge
+
+CLIENTS = 2000
+SEED = 0
+
+BASE = {
+    "name_account.pdf": "Anna Müller",
+    "account_name_account.pdf": "Anna Muller",
+    "account_holder_name_account.pdf": "Anna",
+    "account_holder_surname_account.pdf": "Müller",
+    "first_name_profile.docx": "Anna",
+    "last_name_profile.docx": "Muller",
+    "email_account.pdf": "anna.mueller@example.ch",
+    "email_profile.docx": "anna.mueller@example.ch",
+    "passport_number_account.pdf": "CH1234567",
+    "birth_date_passport.png": "14-Mar-1985",
+    "date_of_birth_profile.docx": "1985-03-14",
+    "issue_date_passport.png": "02-Feb-2020",
+    "id_issue_date_profile.docx": "2020-02-02",
+    "expiry_date_passport.png": "01-Feb-2030",
+    "id_expiry_date_profile.docx": "2030-02-01",
+    "country_account.pdf": "Switzerland",
+    "country_of_domicile_profile.docx": "Schweiz",
+    "citizenship_passport.png": "Swiss/SCHWEIZ",
+    "nationality_profile.docx": "Swiss",
+    "postal_code_account.pdf": "8001",
+    "building_number_account.pdf": "12",
+    "address_profile.docx": "Bahnhofstrasse 12, 8001 Zürich",
+    POLITICALLY_EXPOSED: "no",
+}
+
+# what a field of another client, or a badly read one, looks like
+OTHER_VALUES = {
+    "email_account.pdf": ["anna.mueller@example", "jan@example.com"],
+    "passport_number_account.pdf": ["ch1234567", "C1234567"],
+    "birth_date_passport.png": ["14/03/1985", "31-Feb-1985", "14-mar-1985", "1985 Mar 14"],
+    "country_account.pdf": ["Austria", "Australia", "CHE", "Suisse"],
+    "nationality_profile.docx": ["Austrian", "German", "Swis"],
+    POLITICALLY_EXPOSED: ["yes", ""],
+}
+
+
+def make_clients(count, seed):
+    generator = random.Random(seed)
+    clients = []
+    for _ in range(count):
+        client = dict(BASE)
+        for key in BASE:
+            draw = generator.random()
+            if draw < 0.15:
+                del client[key]
+            elif draw < 0.18:
+                # unfilled PDF form fields and OCR misses
+                client[key] = None
+            elif draw < 0.23:
+                client[key] = ""
+            elif draw < 0.35 and key in OTHER_VALUES:
+                client[key] = generator.choice(OTHER_VALUES[key])
+        clients.append(client)
+    return clients
+
+
+def main():
+    judge = Judge()
+    clients = []
+    skipped = 0
+    for client in make_clients(CLIENTS, SEED):
+        # None where a rule does not expect it stops the per-client judge too
+        try:
+            judge.decide(client)
+        except (AttributeError, TypeError):
+            skipped += 1
+            continue
+        clients.append(client)
+
+    failures = []
+    expected = Judge().judge_many(clients)
+    try:
+        verdict = judge_table(ClientTable.from_clients(enumerate(clients)))
+    except Exception as e:
+        failures.append(f"judge_table raised {e!r}")
+    else:
+        for index, decided in enumerate(expected):
+            if verdict.decision(index) != decided:
+                failures.append(f"client {index} judged differently: {decided[0].value} vs {verdict.decision(index)[0].value}")
+
+    print(f"{len(clients)} clients compared, {skipped} that judge_many rejects as input skipped")
+    for failure in failures[:20]:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
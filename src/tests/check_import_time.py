@@ -0,0 +1,73 @@
+"""
+Cold start budget for the CLI and server entry points.
+
+Usage from project root:
+    poetry run python3 src/tests/check_import_time.py
+
+Every entry module is imported in a fresh interpreter. The check fails if one
+of them pulls in a heavy extraction dependency at import time, or if the best
+of a few runs is over the time budget (IMPORT_BUDGET_SECONDS, default 0.3s).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ENTRY_MODULES = [
+    "robo_clerk.server",
+    "robo_clerk.robo_clerk",
+    "robo_clerk.robo_processor",
+    "robo_clerk.doc_processors.doc_master",
+    "robo_clerk.decider.judge",
+]
+
+# Only the processors may import these, and only once a file of their type shows up
+HEAVY_MODULES = ["PyPDF2", "pdfplumber", "docx", "PIL", "pytesseract", "openai", "nltk"]
+
+BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "0.3"))
+RUNS = 3
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module):
+    env = dict(os.environ)
+    src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_path, env.get("PYTHONPATH")]))
+    best = None
+    heavy = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = result["seconds"] if best is None else min(best, result["seconds"])
+        heavy = result["heavy"]
+    return best, heavy
+
+
+def main():
+    failures = []
+    for module in ENTRY_MODULES:
+        seconds, heavy = measure(module)
+        print(f"{module}: {seconds * 1000:.1f} ms")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at start-up")
+        if seconds > BUDGET_SECONDS:
+            failures.append(f"{module} takes {seconds:.3f}s to import (budget {BUDGET_SECONDS}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,22 @@
 import os
+import sys
+import time
 from robo_clerk.decider import judge
+from robo_clerk.decider.columnar import ClientTable, judge_table, read_archive
 from robo_clerk.robo_processor import get_result
-from robo_clerk.utils.file import list_files_in_folder
 import json
 
 
-def get_client_id_from_file(file_name):
-    id = file_name.split("_")[-1].split(".")[0]
-    return int(id)
-
 def write_results(result, destination_path):
     with open(destination_path, "w") as result_file:
         result_file.write(json.dumps(result, indent=2))
 
+# Pass a JSONL sink written by `robo-processor --sink` to read the archive sequentially,
+# and --columnar to load it as columns and judge them with judge_table
+arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+archive = arguments[0] if arguments else "out_archive_2"
+columnar = "--columnar" in sys.argv
+
 correct = 0
 false_positive = 0
 false_negative = 0
@@ -21,10 +25,22 @@ false_positive_folder = "out_false_positive"
 os.makedirs(false_negative_folder, exist_ok=True)
 os.makedirs(false_positive_folder, exist_ok=True)
 
-for file_name in list_files_in_folder("out_archive_2"):
-    client_id = get_client_id_from_file(file_name)
-    decision, result = judge.handcrafted_decision(file_name)
-    
+start = time.perf_counter()
+if columnar:
+    table = ClientTable.from_archive(archive)
+    verdict = judge_table(table)
+    client_ids = table.client_ids.tolist()
+    decisions = verdict.decisions
+    result_of = verdict.result
+else:
+    clients = list(read_archive(archive))
+    decided = judge.judge_many(customer_data for _, customer_data in clients)
+    client_ids = [client_id for client_id, _ in clients]
+    decisions = [decision for decision, _ in decided]
+    result_of = lambda index: decided[index][1]
+print(f"Judged {len(client_ids)} clients in {time.perf_counter() - start:.2f}s")
+
+for index, (client_id, decision) in enumerate(zip(client_ids, decisions)):
     negative_result = (decision == judge.Decision.Reject)
     
     known_result = get_result(client_id)
@@ -32,15 +48,15 @@ for file_name in list_files_in_folder("out_archive_2"):
         correct += 1 
     if known_result == judge.Decision.Reject and not negative_result:
         false_positive += 1
-        write_results(result=result, destination_path=os.path.join(false_positive_folder, f"result_{client_id}.json"))
+        write_results(result=result_of(index), destination_path=os.path.join(false_positive_folder, f"result_{client_id}.json"))
     if known_result == judge.Decision.Accept and not negative_result:
         correct += 1 
     if known_result == judge.Decision.Accept and negative_result:
         false_negative += 1
-        write_results(result=result, destination_path=os.path.join(false_negative_folder, f"result_{client_id}.json"))
+        write_results(result=result_of(index), destination_path=os.path.join(false_negative_folder, f"result_{client_id}.json"))
         
 print(f"Correct: {correct}")
 print(f"False positive: {false_positive}")
 print(f"False negative: {false_negative}")
 
-print(f"percentage: {(correct*100)/(correct+false_negative+false_positive)}%")
\ No newline at end of file
+print(f"percentage: {(correct*100)/(correct+false_negative+false_positive)}%")